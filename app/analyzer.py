@@ -1,50 +1,260 @@
 import re
-from typing import Dict, List, Set
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.counting import (
+    COUNTER_BACKENDS,
+    DEFAULT_SPACESAVING_CAPACITY,
+    SpaceSaving,
+)
 
 
 # Generic URL regex (not WhatsApp-specific)
 URL_REGEX = r"(?:(?:https?|ftp):\/\/)?[\w/\-?=%.]+\.[\w/\-?=%.]+"
 
+# Codepoints in common emoji ranges, each matched as an individual token
+EMOJI_PATTERN = (
+    r"[\U0001F300-\U0001F5FF"  # symbols & pictographs
+    r"\U0001F600-\U0001F64F"   # emoticons
+    r"\U0001F680-\U0001F6FF"   # transport & map symbols
+    r"\U0001F700-\U0001F77F"   # alchemical symbols
+    r"\U0001F780-\U0001F7FF"   # Geometric Shapes Extended
+    r"\U0001F800-\U0001F8FF"   # Supplemental Arrows-C
+    r"\U0001F900-\U0001F9FF"   # Supplemental Symbols and Pictographs
+    r"\U0001FA00-\U0001FA6F"   # Chess Symbols, etc.
+    r"\U0001FA70-\U0001FAFF"   # Symbols and Pictographs Extended-A
+    r"\U00002700-\U000027BF"   # Dingbats
+    r"\U00002600-\U000026FF"   # Misc symbols
+    r"]"
+)
+
+# Words and emojis in one pass; the group that matched tells which kind a token is
+TOKEN_REGEX = rf"(?P<word>\w+)|(?P<emoji>{EMOJI_PATTERN})"
+
+# Upper bound for token length (words and emojis alike)
+MAX_WORD_LENGTH = 45
+
+# Number of messages handed to a worker process at a time in parallel mode
+DEFAULT_CHUNK_SIZE = 20000
+
+_URL_RE = re.compile(URL_REGEX)
+_TOKEN_RE = re.compile(TOKEN_REGEX)
+
 
 def remove_urls(text: str) -> str:
-    urls = re.findall(URL_REGEX, text)
-    for url in urls:
-        text = text.replace(url, "")
-    return text
+    return _URL_RE.sub("", text)
 
 
 def tokenize(words: str) -> List[str]:
     """
     Tokenize text into words and individual emojis.
-    - Words: sequences of [A-Za-z0-9_] (\w)
+    - Words: sequences of [A-Za-z0-9_] (\\w)
     - Emojis: codepoints in common emoji ranges
     """
-    emoji_pattern = (
-        r"[\U0001F300-\U0001F5FF"  # symbols & pictographs
-        r"\U0001F600-\U0001F64F"   # emoticons
-        r"\U0001F680-\U0001F6FF"   # transport & map symbols
-        r"\U0001F700-\U0001F77F"   # alchemical symbols
-        r"\U0001F780-\U0001F7FF"   # Geometric Shapes Extended
-        r"\U0001F800-\U0001F8FF"   # Supplemental Arrows-C
-        r"\U0001F900-\U0001F9FF"   # Supplemental Symbols and Pictographs
-        r"\U0001FA00-\U0001FA6F"   # Chess Symbols, etc.
-        r"\U0001FA70-\U0001FAFF"   # Symbols and Pictographs Extended-A
-        r"\U00002700-\U000027BF"   # Dingbats
-        r"\U00002600-\U000026FF"   # Misc symbols
-        r"]"
-    )
-    pattern = re.compile(rf"\w+|{emoji_pattern}")
-    return pattern.findall(words)
+    return [m.group() for m in _TOKEN_RE.finditer(words)]
+
+
+# Counters collected by an Analyzer with stats enabled
+STAT_KEYS = (
+    "messages",
+    "tokens_seen",
+    "dropped_too_short",
+    "dropped_too_long",
+    "dropped_blocklist_word",
+    "dropped_blocklist_regex",
+)
+
+
+def new_stats() -> Dict[str, float]:
+    return {key: 0 for key in STAT_KEYS}
+
+
+def merge_stats(target: Dict[str, float], partial: Dict[str, float]) -> Dict[str, float]:
+    for key, value in partial.items():
+        target[key] = target.get(key, 0) + value
+    return target
+
+
+class Analyzer:
+    """
+    Reusable token pipeline holding the counting rules.
+    All patterns are compiled once; emoji vs. word classification comes from the
+    named group of the token match instead of a second regex per token.
+    Instances are picklable so they can be shipped to worker processes.
+    """
+
+    def __init__(
+        self,
+        min_word_length: int,
+        blocklist_words: Optional[Set[str]] = None,
+        blocklist_regex: Optional[List[re.Pattern]] = None,
+        max_word_length: int = MAX_WORD_LENGTH,
+    ):
+        self.min_word_length = min_word_length
+        self.max_word_length = max_word_length
+        self.blocklist_words: Set[str] = blocklist_words or set()
+        self.blocklist_regex: List[re.Pattern] = blocklist_regex or []
+        # Filter statistics (see new_stats); None keeps the uninstrumented fast path
+        self.stats: Optional[Dict[str, float]] = None
+
+    def tokens(self, text: str) -> Iterator[str]:
+        """
+        Yield the tokens of a single message that pass all filters.
+        """
+        blocked = self.is_regex_blocked
+        for token in self.candidate_tokens(text):
+            if not blocked(token):
+                yield token
+
+    def is_regex_blocked(self, token: str) -> bool:
+        return any(p.search(token) for p in self.blocklist_regex)
+
+    def candidate_tokens(self, text: str) -> Iterator[str]:
+        """
+        Yield tokens passing all rules except the regex blocklist, which callers
+        should apply once per distinct token (see apply_regex_blocklist).
+        """
+        if self.stats is not None:
+            yield from self._candidate_tokens_with_stats(text)
+            return
+        if not text:
+            return
+        min_len = self.min_word_length
+        max_len = self.max_word_length
+        blocklist_words = self.blocklist_words
+        for word, emoji in _TOKEN_RE.findall(_URL_RE.sub("", text).lower()):
+            if word:
+                # enforce length constraints (emojis bypass the minimum length)
+                if len(word) < min_len or len(word) > max_len:
+                    continue
+                token = word
+            else:
+                token = emoji
+            if token in blocklist_words:
+                continue
+            yield token
+
+    def token_runs(self, text: str) -> Iterator[List[str]]:
+        """
+        Yield the tokens of candidate_tokens grouped into runs of adjacent words, for
+        phrase counting: a dropped token ends a run, and every emoji is a run of its own.
+        """
+        if not text:
+            return
+        min_len = self.min_word_length
+        max_len = self.max_word_length
+        blocklist_words = self.blocklist_words
+        run: List[str] = []
+        for word, emoji in _TOKEN_RE.findall(_URL_RE.sub("", text).lower()):
+            if word and min_len <= len(word) <= max_len and word not in blocklist_words:
+                run.append(word)
+                continue
+            if run:
+                yield run
+                run = []
+            if emoji and emoji not in blocklist_words:
+                yield [emoji]
+        if run:
+            yield run
+
+    def _candidate_tokens_with_stats(self, text: str) -> Iterator[str]:
+        # Same rules as candidate_tokens, counting every token dropped per reason
+        stats = self.stats
+        stats["messages"] += 1
+        if not text:
+            return
+        for word, emoji in _TOKEN_RE.findall(_URL_RE.sub("", text).lower()):
+            stats["tokens_seen"] += 1
+            if word:
+                if len(word) < self.min_word_length:
+                    stats["dropped_too_short"] += 1
+                    continue
+                if len(word) > self.max_word_length:
+                    stats["dropped_too_long"] += 1
+                    continue
+                token = word
+            else:
+                token = emoji
+            if token in self.blocklist_words:
+                stats["dropped_blocklist_word"] += 1
+                continue
+            yield token
+
+    def count(
+        self, texts: Iterable[str], counts: Optional[Dict[str, int]] = None
+    ) -> Dict[str, int]:
+        """
+        Count tokens over an iterable of message texts, optionally adding to counts.
+        The regex blocklist is applied once per distinct token after counting
+        rather than once per occurrence.
+        """
+        if counts is None:
+            counts = {}
+        get = counts.get
+        tokens = self.candidate_tokens
+        for msg in texts:
+            for w in tokens(msg):
+                counts[w] = get(w, 0) + 1
+        return self.apply_regex_blocklist(counts)
+
+    def count_with_backend(
+        self,
+        texts: Iterable[str],
+        backend: str = "dict",
+        capacity: int = DEFAULT_SPACESAVING_CAPACITY,
+    ) -> Dict[str, int]:
+        """
+        Count with one of COUNTER_BACKENDS and return a plain dict:
+        - dict: exact, one dict entry per distinct token
+        - spacesaving: approximate heavy hitters within capacity monitored tokens
+        """
+        if backend == "dict":
+            return self.count(texts)
+        tokens = self.candidate_tokens
+        if backend == "spacesaving":
+            # Blocked tokens must not take monitoring slots, so the regex blocklist is
+            # checked before counting, memoized per distinct token
+            summary = SpaceSaving(capacity)
+            blocked = lru_cache(maxsize=65536)(self.is_regex_blocked)
+            for msg in texts:
+                for w in tokens(msg):
+                    if not (self.blocklist_regex and blocked(w)):
+                        summary.add(w)
+                    elif self.stats is not None:
+                        self.stats["dropped_blocklist_regex"] += 1
+            return summary.to_dict()
+        raise ValueError(
+            f"Unsupported counter backend '{backend}'. Supported: {', '.join(COUNTER_BACKENDS)}"
+        )
+
+    def apply_regex_blocklist(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """
+        Remove (in place) every token matching the regex blocklist and return counts.
+        """
+        if self.blocklist_regex:
+            blocked = self.is_regex_blocked
+            for w in [w for w in counts if blocked(w)]:
+                if self.stats is not None:
+                    self.stats["dropped_blocklist_regex"] += counts[w]
+                del counts[w]
+        return counts
 
 
 def word_counts_from_texts(
-    texts: List[str],
+    texts: Iterable[str],
     min_word_length: int,
     blocklist_words: Set[str],
     blocklist_regex: List[re.Pattern],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = "dict",
+    capacity: int = DEFAULT_SPACESAVING_CAPACITY,
+    stats: Optional[Dict[str, float]] = None,
 ) -> Dict[str, int]:
     """
-    Compute word frequencies from a list of message texts.
+    Compute word frequencies from an iterable of message texts (consumed lazily).
     Generic processing steps:
     - Strips URLs
     - Lowercases
@@ -52,33 +262,140 @@ def word_counts_from_texts(
     - Applies min/max length constraints (emojis bypass the minimum length)
     - Filters by blocklist words and regex patterns
     Note: Any source-specific cleanup (e.g., placeholders) should be done by the respective strategy.
+    With workers > 1 the texts are sharded into chunks of chunk_size messages and counted
+    in a process pool; the result (including key order) is identical to the serial path.
+    backend selects the counter (see Analyzer.count_with_backend); the "spacesaving"
+    backend is approximate and keeps at most capacity tokens.
+    If a stats dict (see new_stats) is given, filter statistics are added to it.
+    """
+    analyzer = Analyzer(min_word_length, blocklist_words, blocklist_regex)
+    analyzer.stats = stats
+    if workers > 1:
+        return _parallel_word_counts(texts, analyzer, workers, chunk_size, backend, capacity)
+    return analyzer.count_with_backend(texts, backend, capacity)
+
+
+def word_counts_from_ranges(
+    strategy: Any,
+    input_source: str,
+    min_word_length: int,
+    blocklist_words: Set[str],
+    blocklist_regex: List[re.Pattern],
+    workers: int,
+    backend: str = "dict",
+    capacity: int = DEFAULT_SPACESAVING_CAPACITY,
+    ranges_per_worker: int = 4,
+    stats: Optional[Dict[str, float]] = None,
+) -> Dict[str, int]:
+    """
+    Parse and count in parallel: the strategy splits the input into message-aligned
+    byte ranges (see InputSourceStrategy.split_byte_ranges) and every worker process
+    parses and counts its ranges directly from the file, so neither the raw nor the
+    decoded input passes through this process. Exact results equal the serial path.
     """
-    def is_emoji(token: str) -> bool:
-        try:
-            return bool(re.search(r"[\U0001F300-\U0001FAFF\U00002700-\U000027BF\U00002600-\U000026FF]", token))
-        except re.error:
-            # Fallback if unicode ranges aren't supported
-            return False
+    from concurrent.futures import ProcessPoolExecutor
 
+    analyzer = Analyzer(min_word_length, blocklist_words, blocklist_regex)
+    analyzer.stats = stats
+    ranges = strategy.split_byte_ranges(input_source, max(1, workers * ranges_per_worker))
     counts: Dict[str, int] = {}
-    for msg in texts:
-        if not msg:
-            continue
-        temp = remove_urls(msg)
-        temp = temp.lower()
-        words = tokenize(temp)
-        for w in words:
-            L = len(w)
-            # enforce length constraints (45 upper bound)
-            if not is_emoji(w):
-                if L < min_word_length or L > 45:
-                    continue
+    summary = SpaceSaving(capacity) if backend == "spacesaving" else None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _count_range, strategy, input_source, start, end, analyzer, backend, capacity
+            )
+            for start, end in ranges
+        ]
+        # Merge in range order to keep first-occurrence key order
+        for future in futures:
+            partial, partial_stats = future.result()
+            if stats is not None:
+                merge_stats(stats, partial_stats)
+            if summary is None:
+                merge_counts(counts, partial)
             else:
-                if L > 45:
-                    continue
-            if w in blocklist_words:
-                continue
-            if any(p.search(w) for p in blocklist_regex):
-                continue
-            counts[w] = counts.get(w, 0) + 1
-    return counts
+                for w, c in partial.items():
+                    summary.add(w, c)
+    return counts if summary is None else summary.to_dict()
+
+
+def _count_range(
+    strategy: Any,
+    input_source: str,
+    start: int,
+    end: int,
+    analyzer: Analyzer,
+    backend: str,
+    capacity: int,
+) -> Tuple[Dict[str, int], Optional[Dict[str, float]]]:
+    texts = strategy.iter_texts_in_range(input_source, start, end)
+    return _count_chunk(analyzer, texts, backend, capacity)
+
+
+def _count_chunk(
+    analyzer: Analyzer, texts: Iterable[str], backend: str, capacity: int
+) -> Tuple[Dict[str, int], Optional[Dict[str, float]]]:
+    # Runs in a worker process; the pickled analyzer carries a copy of the caller's
+    # stats, so collection restarts from zero and the partial stats are returned
+    if analyzer.stats is not None:
+        analyzer.stats = new_stats()
+    return analyzer.count_with_backend(texts, backend, capacity), analyzer.stats
+
+
+def merge_counts(target: Dict[str, int], partial: Dict[str, int]) -> Dict[str, int]:
+    """
+    Add the counts of partial into target (in place) and return target.
+    Keys new to target are appended in partial's order.
+    """
+    for w, c in partial.items():
+        target[w] = target.get(w, 0) + c
+    return target
+
+
+def _chunks(texts: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parallel_word_counts(
+    texts: Iterable[str],
+    analyzer: Analyzer,
+    workers: int,
+    chunk_size: int,
+    backend: str = "dict",
+    capacity: int = DEFAULT_SPACESAVING_CAPACITY,
+) -> Dict[str, int]:
+    # Partial results are merged strictly in submission order so the merged dict keeps
+    # first-occurrence key order, exactly like the serial path. At most 2 * workers
+    # chunks are in flight, which keeps memory bounded for streamed inputs.
+    # Imported lazily: the process pool machinery is noticeably slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    counts: Dict[str, int] = {}
+    # Approximate partial summaries are folded into one bounded summary instead
+    summary = SpaceSaving(capacity) if backend == "spacesaving" else None
+
+    def merge(result: Tuple[Dict[str, int], Optional[Dict[str, float]]]) -> None:
+        partial, partial_stats = result
+        if analyzer.stats is not None:
+            merge_stats(analyzer.stats, partial_stats)
+        if summary is None:
+            merge_counts(counts, partial)
+        else:
+            for w, c in partial.items():
+                summary.add(w, c)
+
+    pending: Deque[Any] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in _chunks(texts, max(1, chunk_size)):
+            pending.append(pool.submit(_count_chunk, analyzer, chunk, backend, capacity))
+            if len(pending) >= 2 * workers:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    return counts if summary is None else summary.to_dict()
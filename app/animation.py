@@ -0,0 +1,182 @@
+"""
+Time-lapse word clouds: one frame per month or week of a chat, showing the counts up to
+that period (cumulative) or of the last few periods (sliding window).
+
+Counts per period come from one pass over the messages (see app.grouping); frames are
+derived from them by adding (and, for a window, subtracting) one period at a time.
+Frame layouts are computed in order so words keep their place from frame to frame
+(see app.fast_layout.generate_incremental); once fixed, frames are drawn in parallel.
+"""
+import datetime
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.cache import AnalysisCache
+from app.counting import top_counts
+from app.layout import DEFAULT_LAYOUT_QUALITY, DEFAULT_RENDER_SEED
+from app.metrics import Metrics
+
+ANIMATION_MODES = ("cumulative", "window")
+ANIMATION_PERIODS = ("month", "week")
+
+# Periods summed per frame in "window" mode
+DEFAULT_ANIMATION_WINDOW = 3
+
+# Display time of a GIF frame in milliseconds
+DEFAULT_FRAME_DURATION = 500
+
+# WordCloud of a render worker process, set once by the pool initializer
+_worker_wc: Any = None
+
+
+def period_range(labels: Sequence[str], period: str) -> List[str]:
+    """
+    All period labels ("YYYY-MM" or "YYYY-Www", see app.grouping.group_labels) from the
+    earliest to the latest of labels, including periods without messages.
+    """
+    if period not in ANIMATION_PERIODS:
+        raise ValueError(
+            f"Unsupported animation period '{period}'. "
+            f"Supported: {', '.join(ANIMATION_PERIODS)}"
+        )
+    if not labels:
+        return []
+    first, last = min(labels), max(labels)
+    result = []
+    if period == "month":
+        year, month = map(int, first.split("-"))
+        while True:
+            label = f"{year:04d}-{month:02d}"
+            result.append(label)
+            if label >= last:
+                return result
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    day = datetime.date.fromisocalendar(int(first[:4]), int(first[6:]), 1)
+    while True:
+        year, week, _ = day.isocalendar()
+        label = f"{year}-W{week:02d}"
+        result.append(label)
+        if label >= last:
+            return result
+        day += datetime.timedelta(days=7)
+
+
+def frame_counts(
+    period_counts: Dict[str, Dict[str, int]],
+    period: str,
+    mode: str = "cumulative",
+    window: int = DEFAULT_ANIMATION_WINDOW,
+    max_words: Optional[int] = None,
+) -> List[Tuple[str, Dict[str, int]]]:
+    """
+    (period, counts) per frame from the counts of each period: the counts of all periods
+    up to the frame's ("cumulative") or of the last window periods ("window"), limited
+    to the max_words most frequent words. Periods without messages get a frame too.
+    """
+    if mode not in ANIMATION_MODES:
+        raise ValueError(
+            f"Unsupported animation mode '{mode}'. Supported: {', '.join(ANIMATION_MODES)}"
+        )
+    if window < 1:
+        raise ValueError("The animation window must be at least 1 period")
+    periods = period_range(list(period_counts), period)
+    running: Dict[str, int] = {}
+    frames = []
+    for i, label in enumerate(periods):
+        for token, count in period_counts.get(label, {}).items():
+            running[token] = running.get(token, 0) + count
+        if mode == "window" and i >= window:
+            for token, count in period_counts.get(periods[i - window], {}).items():
+                remaining = running[token] - count
+                if remaining:
+                    running[token] = remaining
+                else:
+                    del running[token]
+        frames.append((label, top_counts(running, max_words) if max_words else dict(running)))
+    return frames
+
+
+def frame_path(output_path: str, index: int) -> str:
+    # output/chat.gif -> output/chat_0000.png, numbered for e.g. ffmpeg -i chat_%04d.png
+    stem, _ = os.path.splitext(output_path)
+    return f"{stem}_{index:04d}.png"
+
+
+def _init_worker(options: Dict[str, Any], cache: Optional[AnalysisCache] = None) -> None:
+    global _worker_wc
+    from app.wordcloud import build_wordcloud
+
+    _worker_wc = build_wordcloud(
+        options["background_color"], options.get("shape_path"), options.get("font_path"),
+        options.get("palette"), options.get("shape_width"),
+        options.get("seed", DEFAULT_RENDER_SEED), cache,
+    )
+
+
+def _render_frame(layout: List[Tuple], output_path: str) -> str:
+    _worker_wc.layout_ = layout
+    _worker_wc.to_image().save(output_path, format="PNG", optimize=True)
+    return output_path
+
+
+def render_animation(
+    frames: List[Dict[str, int]],
+    output_path: str,
+    options: Dict[str, Any],
+    workers: int = 1,
+    duration: int = DEFAULT_FRAME_DURATION,
+    metrics: Optional[Metrics] = None,
+    cache: Optional[AnalysisCache] = None,
+) -> List[str]:
+    """
+    Render frames (counts per frame) with the render options of generate_wordcloud and
+    return the written PNG paths (see frame_path). Words are placed by the fast engine
+    incrementally; with output_path ending in .gif, the frames are also assembled into
+    an animated GIF showing each frame for duration milliseconds. Frames are not
+    render cached; cache only stores the prepared mask.
+    """
+    metrics = metrics or Metrics(enabled=False)
+    # Imported here so option parsing works without the rendering stack
+    from app.fast_layout import generate_incremental
+    from app.wordcloud import build_wordcloud
+
+    wc = build_wordcloud(
+        options["background_color"], options.get("shape_path"), options.get("font_path"),
+        options.get("palette"), options.get("shape_width"),
+        options.get("seed", DEFAULT_RENDER_SEED), cache,
+    )
+    with metrics.stage("layout"):
+        layouts = generate_incremental(
+            wc, frames, options.get("layout_quality", DEFAULT_LAYOUT_QUALITY)
+        )
+    paths = [frame_path(output_path, i) for i in range(len(frames))]
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    with metrics.stage("render"):
+        if workers <= 1:
+            _init_worker(options, cache)
+            for layout, path in zip(layouts, paths):
+                _render_frame(layout, path)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(paths)), initializer=_init_worker,
+                initargs=(options, cache),
+            ) as pool:
+                list(pool.map(_render_frame, layouts, paths))
+
+    if output_path.lower().endswith(".gif"):
+        from PIL import Image
+
+        def load(path: str) -> Image.Image:
+            # Copied into memory so only one frame file is open at a time
+            with Image.open(path) as image:
+                return image.copy()
+
+        with metrics.stage("write_gif"):
+            load(paths[0]).save(
+                output_path, save_all=True, append_images=(load(p) for p in paths[1:]),
+                duration=duration, loop=0,
+            )
+    return paths
@@ -0,0 +1,131 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.cache import AnalysisCache
+from app.counting import top_counts
+from app.layout import DEFAULT_LAYOUT_QUALITY, DEFAULT_RENDER_SEED
+
+
+# Render options a job may set; anything missing falls back to the CLI defaults
+JOB_OPTIONS = (
+    "output",
+    "max_word_number",
+    "background_color",
+    "shape_path",
+    "shape_width",
+    "font_path",
+    "palette",
+    "layout",
+    "layout_quality",
+    "seed",
+)
+
+# Counts and render cache shared by all jobs of a worker process, set once by the
+# pool initializer
+_worker_counts: Dict[str, int] = {}
+_worker_cache: Optional[AnalysisCache] = None
+
+
+def load_job_spec(path: str) -> List[Dict[str, Any]]:
+    """
+    Load render jobs from a JSON or TOML file (chosen by extension).
+    The file holds a "jobs" list (TOML: [[jobs]] tables); a JSON file may also be a plain list.
+    Each job needs an "output" path and may set any other option from JOB_OPTIONS.
+    """
+    if path.lower().endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            spec: Any = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf8") as f:
+            spec = json.load(f)
+    jobs = spec.get("jobs") if isinstance(spec, dict) else spec
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError(f"Job spec {path} must contain a non-empty 'jobs' list")
+    for i, job in enumerate(jobs):
+        if not isinstance(job, dict) or not job.get("output"):
+            raise ValueError(f"Job #{i} in {path} needs an 'output' path")
+        unknown = set(job) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(
+                f"Job #{i} in {path} has unknown option(s): {', '.join(sorted(unknown))}"
+            )
+    return jobs
+
+
+def _init_worker(counts: Dict[str, int], cache: Optional[AnalysisCache] = None) -> None:
+    global _worker_counts, _worker_cache
+    _worker_counts = counts
+    _worker_cache = cache
+
+
+def _render_job(job: Dict[str, Any]) -> str:
+    # Imported here so spec loading works without the rendering stack
+    from app.wordcloud import generate_wordcloud
+
+    generate_wordcloud(
+        job.get("counts", _worker_counts),
+        job["output"],
+        job["max_word_number"],
+        background_color=job["background_color"],
+        shape_path=job.get("shape_path"),
+        shape_width=job.get("shape_width"),
+        font_path=job.get("font_path"),
+        palette=job.get("palette"),
+        layout=job.get("layout", "wordcloud"),
+        layout_quality=job.get("layout_quality", DEFAULT_LAYOUT_QUALITY),
+        seed=job.get("seed", DEFAULT_RENDER_SEED),
+        cache=_worker_cache,
+    )
+    return job["output"]
+
+
+def render_jobs(
+    word_count: Dict[str, int],
+    jobs: List[Dict[str, Any]],
+    defaults: Dict[str, Any],
+    workers: int = 1,
+    cache: Optional[AnalysisCache] = None,
+) -> List[Tuple[str, Optional[str]]]:
+    """
+    Render every job from one set of counts and return (output, error or None) per job.
+    Counts are trimmed to the largest max_word_number once and handed to each worker
+    process a single time; masks are cached per worker (see load_mask), so jobs sharing
+    a shape only load it once per process. A failing job does not stop the others.
+    Jobs built in code may carry their own "counts" (e.g. one group each), which are
+    then used instead of word_count. With a cache, unchanged jobs are served from it
+    (see app.wordcloud.render_png).
+    """
+    resolved = [{**defaults, **job} for job in jobs]
+    shared = [job["max_word_number"] for job in resolved if "counts" not in job]
+    counts = top_counts(word_count, max(shared)) if shared else {}
+    for job in resolved:
+        if "counts" in job:
+            job["counts"] = top_counts(job["counts"], job["max_word_number"])
+    for job in resolved:
+        os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+
+    results: List[Tuple[str, Optional[str]]] = []
+    if workers <= 1:
+        _init_worker(counts, cache)
+        for job in resolved:
+            try:
+                results.append((_render_job(job), None))
+            except Exception as e:
+                results.append((job["output"], str(e)))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(resolved)), initializer=_init_worker,
+        initargs=(counts, cache),
+    ) as pool:
+        futures = [(job["output"], pool.submit(_render_job, job)) for job in resolved]
+        for output, future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((output, str(e)))
+    return results
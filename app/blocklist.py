@@ -1,6 +1,6 @@
 import os
 import re
-from typing import List, Set, Optional
+from typing import Dict, List, Set, Optional
 from app.analyzer import tokenize as analyzer_tokenize
 
 
@@ -35,10 +35,49 @@ def load_blocklist_words(path: Optional[str]) -> Set[str]:
     return set(tokens)
 
 
+# Constructs whose meaning depends on the pattern's own group numbering or on
+# pattern-global state; such patterns are kept out of the combined alternation.
+_UNMERGEABLE_REGEX = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|^\(\?[aiLmsux]+\)")
+
+
+def combine_regex_patterns(patterns: List[re.Pattern]) -> List[re.Pattern]:
+    """
+    Combine patterns into as few compiled alternations as possible, so a token is
+    checked with one search instead of one search per pattern.
+    Patterns are grouped by flags; patterns using backreferences, conditionals or
+    global inline flags stay separate. If a combined group fails to compile
+    (e.g. duplicate group names), it is split in halves until each part compiles.
+    The result matches a token exactly when any of the input patterns does.
+    """
+    if len(patterns) <= 1:
+        return list(patterns)
+    separate: List[re.Pattern] = []
+    by_flags: Dict[int, List[re.Pattern]] = {}
+    for p in patterns:
+        if isinstance(p.pattern, str) and not _UNMERGEABLE_REGEX.search(p.pattern):
+            by_flags.setdefault(p.flags, []).append(p)
+        else:
+            separate.append(p)
+    combined: List[re.Pattern] = []
+    for flags, group in by_flags.items():
+        combined.extend(_compile_alternation(group, flags))
+    return combined + separate
+
+
+def _compile_alternation(group: List[re.Pattern], flags: int) -> List[re.Pattern]:
+    if len(group) == 1:
+        return group
+    try:
+        return [re.compile("|".join(f"(?:{p.pattern})" for p in group), flags)]
+    except re.error:
+        mid = len(group) // 2
+        return _compile_alternation(group[:mid], flags) + _compile_alternation(group[mid:], flags)
+
+
 def load_blocklist_regex(path: Optional[str]) -> List[re.Pattern]:
     """
     Load a regex blocklist file, one pattern per non-empty, non-comment line.
-    Returns a list of compiled regex patterns.
+    Returns a list of compiled regex patterns, combined via combine_regex_patterns.
     """
     patterns: List[re.Pattern] = []
     if not path:
@@ -54,4 +93,4 @@ def load_blocklist_regex(path: Optional[str]) -> List[re.Pattern]:
             patterns.append(re.compile(line))
         except re.error as e:
             print(f"Invalid regex in {path}: {line} ({e})")
-    return patterns
\ No newline at end of file
+    return combine_regex_patterns(patterns)
@@ -0,0 +1,311 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import struct
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "word_cloud")
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Bytes hashed from the start and the end of an input file for its fingerprint
+FINGERPRINT_SAMPLE_BYTES = 1024 * 1024
+
+# Bump when the on-disk record format or the counting rules change
+CACHE_FORMAT_VERSION = 1
+
+# Render options naming files, keyed by the file's fingerprint instead of its path
+RENDER_FILE_OPTIONS = ("shape_path", "font_path")
+
+# Render options that only change colors, not where words are placed
+RENDER_COLOR_OPTIONS = ("palette", "background_color")
+
+# File suffixes of cache entries: gzip records, and uncompressed prepared masks that
+# are memory-mapped (see app.masks)
+ENTRY_SUFFIXES = (".bin.gz", ".npy")
+
+_MESSAGE_HEADER = struct.Struct("<I")
+_COUNT_HEADER = struct.Struct("<QI")
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+    """
+    Fingerprint a file by size, mtime and a hash of its first and last
+    FINGERPRINT_SAMPLE_BYTES, so multi-GB exports don't have to be read in full.
+    Returns None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    h = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        h.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if stat.st_size > 2 * FINGERPRINT_SAMPLE_BYTES:
+            f.seek(-FINGERPRINT_SAMPLE_BYTES, os.SEEK_END)
+            h.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return h.hexdigest()
+
+
+def blocklist_fingerprint(blocklist_words: Set[str], blocklist_regex: List[re.Pattern]) -> str:
+    h = hashlib.sha256()
+    for w in sorted(blocklist_words):
+        h.update(w.encode("utf8") + b"\0")
+    h.update(b"\1")
+    for p in blocklist_regex:
+        h.update(f"{p.flags}:{p.pattern}".encode("utf8") + b"\0")
+    return h.hexdigest()
+
+
+def _key(*parts: object) -> str:
+    raw = "\0".join(str(p) for p in (CACHE_FORMAT_VERSION,) + parts)
+    return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent cache of parsed message streams and final word counts.
+    Entries are gzip-compressed, length-prefixed binary records, one file per key.
+    - messages entries are keyed on the input fingerprint and strategy name
+    - counts entries additionally on min_word_length and the blocklist contents
+    - checkpoint entries (see app.incremental) on the input path and counting options
+    - render entries (PNG bytes) and layout entries (placed words) on the rendered
+      counts and render options, see render_keys
+    - mask entries (uncompressed .npy) on the shape's content and size, see app.masks
+    The directory is kept below max_bytes by evicting least recently used entries
+    (hits refresh an entry's mtime).
+    """
+
+    def __init__(
+        self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def messages_key(input_fingerprint: str, strategy_name: str) -> str:
+        return _key("messages", input_fingerprint, strategy_name.lower())
+
+    @staticmethod
+    def counts_key(
+        input_fingerprint: str,
+        strategy_name: str,
+        min_word_length: int,
+        blocklist_words: Set[str],
+        blocklist_regex: List[re.Pattern],
+        variant: str = "",
+    ) -> str:
+        # variant distinguishes counts that differ for the same input, e.g. approximate ones
+        return _key(
+            "counts",
+            input_fingerprint,
+            strategy_name.lower(),
+            min_word_length,
+            blocklist_fingerprint(blocklist_words, blocklist_regex),
+            variant,
+        )
+
+    @staticmethod
+    def checkpoint_key(
+        input_path: str,
+        strategy_name: str,
+        min_word_length: int,
+        blocklist_words: Set[str],
+        blocklist_regex: List[re.Pattern],
+    ) -> str:
+        # Keyed on the file's location rather than its content, since the content grows
+        return _key(
+            "checkpoint",
+            os.path.abspath(input_path),
+            strategy_name.lower(),
+            min_word_length,
+            blocklist_fingerprint(blocklist_words, blocklist_regex),
+        )
+
+    @staticmethod
+    def render_keys(counts: Dict[str, int], options: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        (render key, layout key) of a word cloud of counts (the words actually shown,
+        in order) with the given render options. Shape and font files are keyed by
+        their fingerprint, so edited files miss; the layout key leaves out the options
+        in RENDER_COLOR_OPTIONS, so a recolored cloud reuses the placement.
+        """
+        resolved = dict(options)
+        for name in RENDER_FILE_OPTIONS:
+            if resolved.get(name):
+                resolved[name] = file_fingerprint(resolved[name]) or resolved[name]
+        counts_hash = hashlib.sha256(
+            json.dumps(list(counts.items()), ensure_ascii=False).encode("utf8")
+        ).hexdigest()
+        layout_options = {k: v for k, v in resolved.items() if k not in RENDER_COLOR_OPTIONS}
+        return (
+            _key("render", counts_hash, json.dumps(resolved, sort_keys=True)),
+            _key("layout", counts_hash, json.dumps(layout_options, sort_keys=True)),
+        )
+
+    def get_render(self, key: str) -> Optional[bytes]:
+        path = self._hit(key, "render")
+        if path is None:
+            return None
+        with gzip.open(path, "rb") as f:
+            return f.read()
+
+    def put_render(self, key: str, png: bytes) -> None:
+        with self._writing(key, "render") as f:
+            f.write(png)
+
+    def get_layout(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._hit(key, "layout")
+        if path is None:
+            return None
+        with gzip.open(path, "rb") as f:
+            return json.loads(f.read().decode("utf8"))
+
+    def put_layout(self, key: str, layout: Dict[str, Any]) -> None:
+        with self._writing(key, "layout") as f:
+            f.write(json.dumps(layout, ensure_ascii=False).encode("utf8"))
+
+    def get_mask(self, key: str) -> Optional[str]:
+        """
+        Path of a stored prepared mask (.npy, to be memory-mapped), or None on a miss.
+        """
+        return self._hit(key, "mask", ".npy")
+
+    def writing_mask(self, key: str) -> ContextManager[IO[bytes]]:
+        """
+        Binary file to write a prepared mask (.npy) into; published once closed.
+        """
+        return self._writing(key, "mask", ".npy")
+
+    def get_counts(self, key: str) -> Optional[Dict[str, int]]:
+        path = self._hit(key, "counts")
+        if path is None:
+            return None
+        with gzip.open(path, "rb") as f:
+            return self._read_counts(f)
+
+    def put_counts(self, key: str, counts: Dict[str, int]) -> None:
+        with self._writing(key, "counts") as f:
+            self._write_counts(f, counts)
+
+    def get_checkpoint(self, key: str) -> Optional[Tuple[Dict[str, Any], Dict[str, int]]]:
+        """
+        Return (metadata, counts) of a stored checkpoint, or None on a miss.
+        """
+        path = self._hit(key, "checkpoint")
+        if path is None:
+            return None
+        with gzip.open(path, "rb") as f:
+            (size,) = _MESSAGE_HEADER.unpack(f.read(_MESSAGE_HEADER.size))
+            meta = json.loads(f.read(size).decode("utf8"))
+            return meta, self._read_counts(f)
+
+    def put_checkpoint(self, key: str, meta: Dict[str, Any], counts: Dict[str, int]) -> None:
+        with self._writing(key, "checkpoint") as f:
+            data = json.dumps(meta).encode("utf8")
+            f.write(_MESSAGE_HEADER.pack(len(data)))
+            f.write(data)
+            self._write_counts(f, counts)
+
+    def iter_messages(self, key: str) -> Optional[Iterator[str]]:
+        """
+        Return a generator over the cached messages for key, or None on a miss.
+        """
+        path = self._hit(key, "messages")
+        if path is None:
+            return None
+        return self._read_messages(path)
+
+    def record_messages(self, key: str, texts: Iterable[str]) -> Iterator[str]:
+        """
+        Pass texts through while writing them to the cache. The entry is only
+        published once the input has been consumed completely.
+        """
+        with self._writing(key, "messages") as f:
+            for text in texts:
+                data = text.encode("utf8")
+                f.write(_MESSAGE_HEADER.pack(len(data)))
+                f.write(data)
+                yield text
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries until the cache fits into max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_SUFFIXES):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def _path(self, key: str, kind: str, suffix: str = ".bin.gz") -> str:
+        return os.path.join(self.directory, f"{kind}-{key}{suffix}")
+
+    def _hit(self, key: str, kind: str, suffix: str = ".bin.gz") -> Optional[str]:
+        path = self._path(key, kind, suffix)
+        if not os.path.exists(path):
+            return None
+        # Refresh recency for LRU eviction
+        os.utime(path)
+        return path
+
+    @contextmanager
+    def _writing(self, key: str, kind: str, suffix: str = ".bin.gz") -> Iterator[IO[bytes]]:
+        # Write to a temp file and publish atomically, so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            opener = gzip.open if suffix.endswith(".gz") else open
+            with opener(tmp_path, "wb") as f:
+                yield f
+            os.replace(tmp_path, self._path(key, kind, suffix))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    @staticmethod
+    def _read_counts(f: IO[bytes]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        while True:
+            header = f.read(_COUNT_HEADER.size)
+            if not header:
+                break
+            count, size = _COUNT_HEADER.unpack(header)
+            counts[f.read(size).decode("utf8")] = count
+        return counts
+
+    @staticmethod
+    def _write_counts(f: IO[bytes], counts: Dict[str, int]) -> None:
+        for w, c in counts.items():
+            data = w.encode("utf8")
+            f.write(_COUNT_HEADER.pack(c, len(data)))
+            f.write(data)
+
+    @staticmethod
+    def _read_messages(path: str) -> Iterator[str]:
+        with gzip.open(path, "rb") as f:
+            while True:
+                header = f.read(_MESSAGE_HEADER.size)
+                if not header:
+                    break
+                (size,) = _MESSAGE_HEADER.unpack(header)
+                yield f.read(size).decode("utf8")
@@ -0,0 +1,84 @@
+import heapq
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+# Counting backends accepted by word_counts_from_texts
+COUNTER_BACKENDS = ("dict", "spacesaving")
+
+# Default number of monitored tokens for the Space-Saving backend
+DEFAULT_SPACESAVING_CAPACITY = 10000
+
+
+def top_counts(word_count: Dict[str, int], n: int) -> Dict[str, int]:
+    """
+    The n most frequent entries in O(len * log n), ordered exactly like
+    sorted(..., reverse=True)[:n] (ties keep their original order).
+    """
+    return dict(heapq.nlargest(n, word_count.items(), key=lambda item: item[1]))
+
+
+class SpaceSaving:
+    """
+    Approximate heavy-hitters counter (Space-Saving, Metwally et al.) monitoring at
+    most capacity tokens, so memory stays bounded for unbounded inputs.
+    Every token with a true frequency above total / capacity is guaranteed to be
+    monitored; a reported count overestimates the true count by at most error(token).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SPACESAVING_CAPACITY):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        # Lazy min-heap of (count, token); stale entries are skipped when popped
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, token: str, n: int = 1) -> None:
+        self.total += n
+        counts = self._counts
+        if token in counts:
+            counts[token] += n
+        elif len(counts) < self.capacity:
+            counts[token] = n
+            self._errors[token] = 0
+        else:
+            victim, minimum = self._pop_min()
+            del counts[victim]
+            del self._errors[victim]
+            counts[token] = minimum + n
+            self._errors[token] = minimum
+        heapq.heappush(self._heap, (counts[token], token))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, t) for t, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, tokens: Iterable[str]) -> None:
+        for token in tokens:
+            self.add(token)
+
+    def _pop_min(self) -> Tuple[str, int]:
+        heap = self._heap
+        counts = self._counts
+        while True:
+            c, token = heapq.heappop(heap)
+            if counts.get(token) == c:
+                return token, c
+
+    def error(self, token: str) -> int:
+        return self._errors.get(token, 0)
+
+    def discard(self, token: str) -> None:
+        if token in self._counts:
+            del self._counts[token]
+            del self._errors[token]
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return iter(self._counts.items())
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def top_k(self, k: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(k, self._counts.items(), key=lambda item: item[1])
@@ -0,0 +1,114 @@
+"""
+Suppression of repeated messages (forwarded chain messages, boilerplate) before counting.
+
+Message bodies are normalized (lowercased tokens, see app.analyzer.tokenize, so
+whitespace, punctuation and case don't matter) and hashed. The hashes of the first
+exact_size distinct bodies are kept in a set; beyond that, new hashes go into a Bloom
+filter, which bounds memory at the cost of a small false positive rate (a message
+wrongly taken for a repeat). Short messages ("ok", "😂") are never suppressed, as
+their repeats are ordinary word usage.
+"""
+import hashlib
+import math
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from app.analyzer import tokenize
+
+# Distinct bodies tracked exactly before switching to the Bloom filter
+DEFAULT_DEDUP_EXACT_SIZE = 500000
+
+# Bodies the Bloom filter is sized for, and its false positive rate at that size
+DEFAULT_BLOOM_CAPACITY = 10000000
+DEFAULT_BLOOM_ERROR_RATE = 0.001
+
+# Messages with fewer tokens are never suppressed
+DEFAULT_DEDUP_MIN_TOKENS = 4
+
+DEDUP_STAT_KEYS = (
+    "dedup_messages_checked",
+    "dedup_messages_suppressed",
+    "dedup_tokens_suppressed",
+)
+
+
+class BloomFilter:
+    """
+    Bloom filter over 128-bit hashes, using double hashing for the bit positions.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, digest: bytes) -> bool:
+        """
+        Add a 16-byte digest; True if it was (probably) present already.
+        """
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        size = self.size
+        present = True
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                present = False
+                bits[position >> 3] |= mask
+        return present
+
+
+class Deduplicator:
+    """
+    Stateful filter remembering the message bodies seen so far (see module docstring).
+    stats holds DEDUP_STAT_KEYS counters.
+    """
+
+    def __init__(
+        self,
+        exact_size: int = DEFAULT_DEDUP_EXACT_SIZE,
+        min_tokens: int = DEFAULT_DEDUP_MIN_TOKENS,
+        bloom_capacity: int = DEFAULT_BLOOM_CAPACITY,
+        bloom_error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+    ):
+        self.exact_size = exact_size
+        self.min_tokens = min_tokens
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._exact: Set[bytes] = set()
+        # Allocated once the exact set is full
+        self._bloom: Optional[BloomFilter] = None
+        self.stats: Dict[str, float] = {key: 0 for key in DEDUP_STAT_KEYS}
+
+    def seen(self, text: str) -> bool:
+        """
+        True if text repeats an earlier message; otherwise it is remembered.
+        """
+        tokens = tokenize(text.lower())
+        if len(tokens) < self.min_tokens:
+            return False
+        self.stats["dedup_messages_checked"] += 1
+        digest = hashlib.blake2b(" ".join(tokens).encode("utf8"), digest_size=16).digest()
+        if digest in self._exact:
+            duplicate = True
+        elif len(self._exact) < self.exact_size:
+            self._exact.add(digest)
+            duplicate = False
+        else:
+            if self._bloom is None:
+                self._bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+            duplicate = self._bloom.add(digest)
+        if duplicate:
+            self.stats["dedup_messages_suppressed"] += 1
+            self.stats["dedup_tokens_suppressed"] += len(tokens)
+        return duplicate
+
+    def filter(self, texts: Iterable[str]) -> Iterator[str]:
+        """
+        Yield the texts that don't repeat an earlier one (consumed lazily).
+        """
+        seen = self.seen
+        for text in texts:
+            if not seen(text):
+                yield text
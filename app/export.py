@@ -0,0 +1,21 @@
+import csv
+import json
+import os
+from typing import Dict
+
+
+def write_counts(counts: Dict[str, int], path: str) -> None:
+    """
+    Write word frequencies, most frequent first, as CSV (word,count) if path ends
+    with .csv, otherwise as a JSON object. Needs no rendering dependencies.
+    """
+    ordered = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["word", "count"])
+            writer.writerows(ordered)
+    else:
+        with open(path, "w", encoding="utf8") as f:
+            json.dump(dict(ordered), f, ensure_ascii=False, indent=2)
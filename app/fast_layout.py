@@ -0,0 +1,379 @@
+"""
+Vectorized layout engine for WordCloud objects.
+
+The wordcloud library places words one font size step at a time, scanning a full
+resolution integral image of the canvas for every attempt. This engine keeps the
+occupancy in a pyramid of coarse grids (a cell is occupied if any of its pixels is),
+searches the coarsest grid first with NumPy integral images and only falls back to
+finer grids when no coarse spot is left. Text extents are measured once per word,
+font size and orientation.
+
+The result is written to the WordCloud's layout_/words_ like generate_from_frequencies
+does, so to_image, to_file and recolor work unchanged. generate_incremental lays out a
+sequence of frames (see app.animation), keeping words where they were in the previous
+frame whenever they still fit.
+"""
+import random
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.layout import DEFAULT_LAYOUT_QUALITY, LAYOUT_QUALITY
+
+# Scratch surface for measuring text extents
+_measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+@lru_cache(maxsize=512)
+def _font(font_path: str, size: int, orientation: Optional[int]) -> Any:
+    return ImageFont.TransposedFont(ImageFont.truetype(font_path, size), orientation=orientation)
+
+
+@lru_cache(maxsize=65536)
+def text_extent(
+    font_path: str, size: int, orientation: Optional[int], word: str
+) -> Tuple[int, int]:
+    """
+    Height and width in pixels of word drawn at size (cached per word, size and orientation).
+    """
+    box = _measure.textbbox((0, 0), word, font=_font(font_path, size, orientation), anchor="lt")
+    return box[3], box[2]
+
+
+def _coarsen(occupied: np.ndarray, cell: int) -> np.ndarray:
+    # Cells partially outside the array count as occupied, so free windows of the
+    # coarse grid always lie inside the canvas
+    height, width = occupied.shape
+    rows, cols = -(-height // cell), -(-width // cell)
+    padded = np.ones((rows * cell, cols * cell), dtype=bool)
+    padded[:height, :width] = occupied
+    return padded.reshape(rows, cell, cols, cell).any(axis=(1, 3))
+
+
+class OccupancyPyramid:
+    """
+    Occupied pixels of the canvas plus coarse grids of it, one per cell size.
+    """
+
+    def __init__(self, occupied: np.ndarray, cells: List[int]):
+        self.occupied = occupied
+        self.grids = {cell: occupied if cell == 1 else _coarsen(occupied, cell) for cell in cells}
+
+    def find(self, cell: int, height: int, width: int, rng: random.Random):
+        """
+        Random top-left pixel (row, col) of a free height x width box on the grid of
+        the given cell size, or None if there is none.
+        """
+        grid = self.grids[cell]
+        box_rows, box_cols = -(-height // cell), -(-width // cell)
+        rows, cols = grid.shape
+        if box_rows > rows or box_cols > cols:
+            return None
+        integral = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+        np.cumsum(grid, axis=0, dtype=np.int32, out=integral[1:, 1:])
+        np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+        window = (
+            integral[box_rows:, box_cols:] - integral[:-box_rows, box_cols:]
+            - integral[box_rows:, :-box_cols] + integral[:-box_rows, :-box_cols]
+        )
+        free = np.flatnonzero(window == 0)
+        if not free.size:
+            return None
+        row, col = divmod(int(free[rng.randrange(free.size)]), window.shape[1])
+        return row * cell, col * cell
+
+    def update(self, top: int, left: int, region: np.ndarray) -> None:
+        """
+        Mark the True pixels of region, placed at (top, left), as occupied.
+        """
+        height, width = region.shape
+        self.occupied[top:top + height, left:left + width] |= region
+        for cell, grid in self.grids.items():
+            if cell == 1:
+                continue
+            row, col = top // cell, left // cell
+            end_row, end_col = -(-(top + height) // cell), -(-(left + width) // cell)
+            block = self.occupied[row * cell:end_row * cell, col * cell:end_col * cell]
+            coarse = _coarsen(block, cell)
+            grid[row:row + coarse.shape[0], col:col + coarse.shape[1]] |= coarse
+
+
+def _boolean_mask(mask: np.ndarray) -> np.ndarray:
+    # Same convention as the wordcloud library: pure white pixels are masked out
+    if mask.ndim == 2:
+        return mask == 255
+    return np.all(mask[:, :, :3] == 255, axis=-1)
+
+
+# Relative font size change below which a word keeps its size in the next frame of
+# generate_incremental, so rounding noise doesn't make words jitter
+RESIZE_TOLERANCE = 0.1
+
+# Word orientations: horizontal, vertical
+_ROTATIONS = (None, Image.ROTATE_90)
+
+
+def _random_state(wc: Any) -> random.Random:
+    if isinstance(wc.random_state, random.Random):
+        return wc.random_state
+    return random.Random(wc.random_state)
+
+
+def _pyramid(wc: Any, settings: Dict[str, float]) -> Tuple[OccupancyPyramid, List[int]]:
+    # Empty canvas (apart from the mask) and the cell sizes searched, coarsest first
+    if wc.mask is not None:
+        occupied = _boolean_mask(wc.mask).copy()
+    else:
+        occupied = np.zeros((wc.height, wc.width), dtype=bool)
+    cell, min_cell = int(settings["cell"]), int(settings["min_cell"])
+    cells = []
+    while cell >= min_cell:
+        cells.append(cell)
+        cell //= 2
+    return OccupancyPyramid(occupied, cells), cells
+
+
+def _relative_scaling(wc: Any) -> float:
+    return 0.5 if wc.relative_scaling == "auto" else wc.relative_scaling
+
+
+def _fit(
+    wc: Any,
+    pyramid: OccupancyPyramid,
+    cells: List[int],
+    word: str,
+    font_size: int,
+    settings: Dict[str, float],
+    rng: random.Random,
+) -> Optional[Tuple[int, Optional[int], Tuple[int, int], Tuple[int, int]]]:
+    """
+    Find a free spot for word, trying both orientations (the drawn one first) at each
+    font size before shrinking it. Returns (font size, orientation, (row, col),
+    (box height, box width)), or None if the word does not fit at the minimum font size.
+    """
+    preferred = _ROTATIONS[0] if rng.random() < wc.prefer_horizontal else _ROTATIONS[1]
+    orientation = preferred
+    tried_other_orientation = False
+    while font_size >= wc.min_font_size:
+        box_height, box_width = text_extent(wc.font_path, font_size, orientation, word)
+        box_height += wc.margin
+        box_width += wc.margin
+        for level in cells:
+            position = pyramid.find(level, box_height, box_width, rng)
+            if position is not None:
+                return font_size, orientation, position, (box_height, box_width)
+        if not tried_other_orientation and wc.prefer_horizontal < 1:
+            orientation = _ROTATIONS[1] if orientation is None else _ROTATIONS[0]
+            tried_other_orientation = True
+        else:
+            font_size = min(font_size - wc.font_step, int(font_size * settings["shrink"]))
+            orientation = preferred
+            tried_other_orientation = False
+    return None
+
+
+def _place(
+    wc: Any,
+    frequencies: List[Tuple[str, float]],
+    font_size: int,
+    settings: Dict[str, float],
+    rng: random.Random,
+    with_colors: bool = True,
+) -> List[Tuple]:
+    pyramid, cells = _pyramid(wc, settings)
+    height, width = pyramid.occupied.shape
+    canvas = Image.new("L", (width, height))
+    draw = ImageDraw.Draw(canvas)
+    relative_scaling = _relative_scaling(wc)
+
+    layout: List[Tuple] = []
+    last_freq = 1.0
+    for word, freq in frequencies:
+        if freq == 0:
+            continue
+        if relative_scaling != 0:
+            font_size = int(round((relative_scaling * (freq / last_freq)
+                                   + (1 - relative_scaling)) * font_size))
+        fit = _fit(wc, pyramid, cells, word, font_size, settings, rng)
+        if fit is None:
+            # Nothing fits anymore, smaller words would not either
+            break
+        font_size, orientation, position, (box_height, box_width) = fit
+
+        top, left = position[0] + wc.margin // 2, position[1] + wc.margin // 2
+        draw.text((left, top), word, fill="white", font=_font(wc.font_path, font_size, orientation))
+        right = min(left + box_width, width)
+        bottom = min(top + box_height, height)
+        region = np.asarray(canvas.crop((left, top, right, bottom))) > 0
+        pyramid.update(top, left, region)
+
+        color = None
+        if with_colors:
+            color = wc.color_func(
+                word, font_size=font_size, position=(top, left), orientation=orientation,
+                random_state=rng, font_path=wc.font_path,
+            )
+        layout.append(((word, freq), font_size, (top, left), orientation, color))
+        last_freq = freq
+    return layout
+
+
+def generate_fast(wc: Any, frequencies: Dict[str, float], quality: str = DEFAULT_LAYOUT_QUALITY):
+    """
+    Lay out frequencies on wc with the vectorized engine; drop-in replacement for
+    wc.generate_from_frequencies(frequencies) honoring the same WordCloud options
+    (size, mask, font, margin, font sizes, rotation, color function).
+    """
+    settings = _settings(quality)
+    normalized = _normalized(wc, frequencies)
+    rng = _random_state(wc)
+    max_font_size = wc.max_font_size or _max_font_size(wc, normalized, settings, rng)
+    wc.words_ = dict(normalized)
+    wc.layout_ = _place(wc, normalized, max_font_size, settings, rng)
+    return wc
+
+
+def _settings(quality: str) -> Dict[str, float]:
+    if quality not in LAYOUT_QUALITY:
+        raise ValueError(
+            f"Unknown layout quality '{quality}' (choose from {', '.join(LAYOUT_QUALITY)})"
+        )
+    return LAYOUT_QUALITY[quality]
+
+
+def _normalized(wc: Any, frequencies: Dict[str, float]) -> List[Tuple[str, float]]:
+    # The wc.max_words most frequent words, frequencies scaled so the top one is 1
+    ordered = sorted(frequencies.items(), key=lambda item: item[1], reverse=True)
+    if not ordered:
+        raise ValueError(f"We need at least 1 word to plot a word cloud, got {len(ordered)}.")
+    ordered = ordered[:wc.max_words]
+    max_frequency = float(ordered[0][1])
+    return [(word, freq / max_frequency) for word, freq in ordered]
+
+
+def _max_font_size(
+    wc: Any, normalized: List[Tuple[str, float]], settings: Dict[str, float], rng: random.Random
+) -> int:
+    # Like the wordcloud library: size the two largest words on an empty canvas
+    # starting from the canvas height and use their harmonic mean
+    height = wc.mask.shape[0] if wc.mask is not None else wc.height
+    trial = _place(wc, normalized[:2], height, settings, rng, with_colors=False)
+    sizes = [entry[1] for entry in trial]
+    if not sizes:
+        raise ValueError("Couldn't find space to draw. Either the canvas is too small "
+                         "or too much of the image is masked out.")
+    return sizes[0] if len(sizes) == 1 else int(2 * sizes[0] * sizes[1] / (sizes[0] + sizes[1]))
+
+
+def _glyph(
+    font_path: str, size: int, orientation: Optional[int], word: str, height: int, width: int
+) -> np.ndarray:
+    # Pixels of word drawn alone into a height x width box, as _place draws it
+    image = Image.new("L", (width, height))
+    ImageDraw.Draw(image).text((0, 0), word, fill="white", font=_font(font_path, size, orientation))
+    return np.asarray(image) > 0
+
+
+def generate_incremental(
+    wc: Any,
+    frames: List[Dict[str, float]],
+    quality: str = DEFAULT_LAYOUT_QUALITY,
+) -> List[List[Tuple]]:
+    """
+    Lay out a sequence of frames (frequencies per frame) on wc and return one layout
+    (in the format of wc.layout_) per frame; empty frames get an empty layout.
+    The font size of a frame's top word is the same in all frames. Words of the
+    previous frame keep their spot (their center, if their size changed by more than
+    RESIZE_TOLERANCE) if it is still free, words keeping their size first; only new
+    words and words that no longer fit there are placed anew, largest first.
+    """
+    settings = _settings(quality)
+    rng = _random_state(wc)
+    relative_scaling = _relative_scaling(wc)
+    normalized_frames = [_normalized(wc, frequencies) if frequencies else []
+                         for frequencies in frames]
+    # Sized on the frame with the most words, so it fits the densest frame
+    densest = max(normalized_frames, key=len)
+    if not densest:
+        raise ValueError("We need at least 1 word to plot a word cloud, got 0.")
+    max_font_size = wc.max_font_size or _max_font_size(wc, densest, settings, rng)
+
+    layouts: List[List[Tuple]] = []
+    # Placed words of the previous frame: font size, position, orientation, and the
+    # target font size (the placed one may be smaller, see _fit)
+    previous: Dict[str, Tuple[int, Tuple[int, int], Optional[int], int]] = {}
+    for normalized in normalized_frames:
+        if not normalized:
+            # Words keep their spots across empty frames
+            layouts.append([])
+            continue
+        # Target font sizes, as _place computes them before shrinking words to fit
+        targets: Dict[str, int] = {}
+        sizes: Dict[str, int] = {}
+        font_size, last_freq = max_font_size, 1.0
+        for word, freq in normalized:
+            if relative_scaling != 0:
+                font_size = int(round((relative_scaling * (freq / last_freq)
+                                       + (1 - relative_scaling)) * font_size))
+            targets[word] = sizes[word] = font_size
+            last_freq = freq
+            if word in previous:
+                old_size, _, _, old_target = previous[word]
+                if abs(font_size - old_target) <= RESIZE_TOLERANCE * old_target:
+                    targets[word], sizes[word] = old_target, old_size
+
+        pyramid, cells = _pyramid(wc, settings)
+        height, width = pyramid.occupied.shape
+        placed: Dict[str, Tuple[int, Tuple[int, int], Optional[int], int]] = {}
+
+        def occupy(word, size, orientation, top, left, box_height, box_width) -> bool:
+            bottom, right = min(top + box_height, height), min(left + box_width, width)
+            if top < 0 or left < 0 or bottom <= top or right <= left:
+                return False
+            region = _glyph(wc.font_path, size, orientation, word, box_height, box_width)
+            region = region[:bottom - top, :right - left]
+            if (pyramid.occupied[top:bottom, left:right] & region).any():
+                return False
+            pyramid.update(top, left, region)
+            placed[word] = (size, (top, left), orientation, targets[word])
+            return True
+
+        kept = [word for word, _ in normalized
+                if word in previous and sizes[word] >= wc.min_font_size]
+        # Words keeping their size can't collide with each other
+        kept.sort(key=lambda word: sizes[word] != previous[word][0])
+        for word in kept:
+            old_size, (top, left), orientation, _ = previous[word]
+            old_height, old_width = text_extent(wc.font_path, old_size, orientation, word)
+            box_height, box_width = text_extent(wc.font_path, sizes[word], orientation, word)
+            top += (old_height - box_height) // 2
+            left += (old_width - box_width) // 2
+            occupy(word, sizes[word], orientation, top, left,
+                   box_height + wc.margin, box_width + wc.margin)
+
+        for word, _ in normalized:
+            if word in placed:
+                continue
+            fit = _fit(wc, pyramid, cells, word, sizes[word], settings, rng)
+            if fit is None:
+                # As in _place: nothing fits anymore, smaller words would not either
+                break
+            size, orientation, position, (box_height, box_width) = fit
+            occupy(word, size, orientation, position[0] + wc.margin // 2,
+                   position[1] + wc.margin // 2, box_height, box_width)
+
+        layout = []
+        for word, freq in normalized:
+            if word not in placed:
+                continue
+            size, position, orientation, _ = placed[word]
+            color = wc.color_func(
+                word, font_size=size, position=position, orientation=orientation,
+                random_state=rng, font_path=wc.font_path,
+            )
+            layout.append(((word, freq), size, position, orientation, color))
+        layouts.append(layout)
+        previous = placed
+    return layouts
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import platform
+
+
+def detect_default_emoji_font():
+    """
+    Return the path of an emoji-capable default font for this platform, or None.
+    """
+    try:
+        system = platform.system().lower()
+    except Exception:
+        system = ""
+    candidates = []
+    if "windows" in system:
+        # Windows default: Segoe UI Emoji
+        candidates.append(r"C:\Windows\Fonts\seguiemj.ttf")
+    else:
+        # Ubuntu/Linux: try Symbola bundled with wordcloud (if present), then common system paths
+        try:
+            # Locate the package without importing it (and numpy/PIL/matplotlib with it)
+            spec = importlib.util.find_spec("wordcloud")
+            if spec is not None and spec.origin:
+                d = os.path.dirname(spec.origin)
+                candidates.append(os.path.join(d, "fonts", "Symbola", "Symbola.ttf"))
+        except Exception:
+            pass
+        candidates.extend([
+            "/usr/share/fonts/truetype/ttf-symbola/Symbola.ttf",
+            "/usr/share/fonts/truetype/ancient-scripts/Symbola.ttf",
+            "/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf",
+        ])
+    for p in candidates:
+        if p and os.path.exists(p):
+            return p
+    return None
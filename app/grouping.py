@@ -0,0 +1,172 @@
+import datetime
+from array import array
+from itertools import product
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from app.analyzer import Analyzer
+
+
+GROUP_DIMENSIONS = ("author", "month", "week", "range")
+
+# Separator between dimension values in a group label, e.g. "Alice/2020-01"
+GROUP_SEPARATOR = "/"
+
+# Token ids occupy the low bits of a cell key, group ids the high bits
+_TOKEN_BITS = 32
+
+
+class DateRange(NamedTuple):
+    label: str
+    start: datetime.date
+    end: datetime.date  # inclusive
+
+
+def parse_date_range(spec: str) -> DateRange:
+    """
+    Parse a "LABEL:START:END" range with ISO dates (END inclusive), e.g. "q1:2020-01-01:2020-03-31".
+    """
+    try:
+        label, start, end = spec.rsplit(":", 2)
+        date_range = DateRange(
+            label, datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+        )
+    except ValueError:
+        raise ValueError(f"Invalid date range '{spec}'. Expected LABEL:YYYY-MM-DD:YYYY-MM-DD")
+    if not label or date_range.start > date_range.end:
+        raise ValueError(f"Invalid date range '{spec}'. Needs a label and START <= END")
+    return date_range
+
+
+def group_labels(
+    message: Any, dimensions: Sequence[str], date_ranges: Sequence[DateRange] = ()
+) -> List[str]:
+    """
+    Return the group labels a message belongs to: one value per dimension, combined
+    across dimensions. Messages without a timestamp belong to no time-based group;
+    a message may fall into several (overlapping) date ranges.
+    """
+    timestamp: Optional[datetime.datetime] = message.timestamp
+    values: List[List[str]] = []
+    for dimension in dimensions:
+        if dimension == "author":
+            values.append([message.username])
+        elif timestamp is None:
+            return []
+        elif dimension == "month":
+            values.append([timestamp.strftime("%Y-%m")])
+        elif dimension == "week":
+            year, week, _ = timestamp.isocalendar()
+            values.append([f"{year}-W{week:02d}"])
+        elif dimension == "range":
+            day = timestamp.date()
+            values.append([r.label for r in date_ranges if r.start <= day <= r.end])
+        else:
+            raise ValueError(
+                f"Unsupported group dimension '{dimension}'. "
+                f"Supported: {', '.join(GROUP_DIMENSIONS)}"
+            )
+    return [GROUP_SEPARATOR.join(combo) for combo in product(*values)]
+
+
+class GroupedCounts:
+    """
+    Word counts for many groups stored as one columnar table instead of a dict per group.
+    Tokens and group labels are interned once; after finalize() the table consists of
+    three parallel arrays (group id, token id, count) sorted by group, plus per-group
+    offsets, so a group's counts can be materialized on demand for rendering.
+    """
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.groups: List[str] = []
+        self._token_ids: Dict[str, int] = {}
+        self._group_ids: Dict[str, int] = {}
+        self._cells: Dict[int, int] = {}
+        self.group_column = array("I")
+        self.token_column = array("I")
+        self.count_column = array("Q")
+        self._offsets = array("Q", [0])
+
+    def add(self, group: str, token: str) -> None:
+        group_id = self._group_ids.get(group)
+        if group_id is None:
+            group_id = self._group_ids[group] = len(self.groups)
+            self.groups.append(group)
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            token_id = self._token_ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        key = (group_id << _TOKEN_BITS) | token_id
+        self._cells[key] = self._cells.get(key, 0) + 1
+
+    def finalize(self, analyzer: Optional[Analyzer] = None) -> "GroupedCounts":
+        """
+        Build the columnar arrays, dropping tokens blocked by the analyzer's regex
+        blocklist (evaluated once per distinct token). Within a group, rows keep the
+        first-occurrence order of the tokens.
+        """
+        blocked = set()
+        if analyzer is not None and analyzer.blocklist_regex:
+            blocked = {i for i, t in enumerate(self.tokens) if analyzer.is_regex_blocked(t)}
+        mask = (1 << _TOKEN_BITS) - 1
+        # Stable sort by group id keeps insertion (first-occurrence) order inside each group
+        for key in sorted(self._cells, key=lambda k: k >> _TOKEN_BITS):
+            token_id = key & mask
+            if token_id in blocked:
+                continue
+            self.group_column.append(key >> _TOKEN_BITS)
+            self.token_column.append(token_id)
+            self.count_column.append(self._cells[key])
+        self._cells = {}
+        offsets = [0] * (len(self.groups) + 1)
+        for group_id in self.group_column:
+            offsets[group_id + 1] += 1
+        for i in range(len(self.groups)):
+            offsets[i + 1] += offsets[i]
+        self._offsets = array("Q", offsets)
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.groups)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def counts_for(self, group: str) -> Dict[str, int]:
+        group_id = self._group_ids[group]
+        start, end = self._offsets[group_id], self._offsets[group_id + 1]
+        tokens = self.tokens
+        return {
+            tokens[t]: c
+            for t, c in zip(self.token_column[start:end], self.count_column[start:end])
+        }
+
+
+def grouped_word_counts(
+    messages: Iterable[Any],
+    analyzer: Analyzer,
+    dimensions: Sequence[str],
+    date_ranges: Sequence[DateRange] = (),
+) -> GroupedCounts:
+    """
+    Count words per group (author, month, week, custom date range or combinations
+    such as author + month) in a single pass over structured messages.
+    """
+    for dimension in dimensions:
+        if dimension not in GROUP_DIMENSIONS:
+            raise ValueError(
+                f"Unsupported group dimension '{dimension}'. "
+                f"Supported: {', '.join(GROUP_DIMENSIONS)}"
+            )
+    if "range" in dimensions and not date_ranges:
+        raise ValueError("Grouping by 'range' needs at least one date range")
+    table = GroupedCounts()
+    add = table.add
+    for message in messages:
+        labels = group_labels(message, dimensions, date_ranges)
+        if not labels:
+            continue
+        for token in analyzer.candidate_tokens(message.message):
+            for label in labels:
+                add(label, token)
+    return table.finalize(analyzer)
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.analyzer import merge_counts, word_counts_from_texts
+from app.cache import AnalysisCache
+from app.strategies.base import InputSourceStrategy
+
+
+# Bytes before the checkpoint offset (and at the file start) that must be unchanged
+# for a checkpoint to be reused
+ANCHOR_BYTES = 4096
+
+
+def _anchor_hash(path: str, offset: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(min(ANCHOR_BYTES, offset)))
+        f.seek(max(0, offset - ANCHOR_BYTES))
+        h.update(f.read(offset - max(0, offset - ANCHOR_BYTES)))
+    return h.hexdigest()
+
+
+def _valid_offset(path: str, meta: Dict) -> Optional[int]:
+    offset = meta.get("offset")
+    if not isinstance(offset, int) or offset < 0 or os.path.getsize(path) < offset:
+        return None
+    if meta.get("anchor") != _anchor_hash(path, offset):
+        return None
+    return offset
+
+
+def incremental_word_counts(
+    strategy: InputSourceStrategy,
+    input_source: str,
+    cache: AnalysisCache,
+    min_word_length: int,
+    blocklist_words: Set[str],
+    blocklist_regex: List[re.Pattern],
+    input_type: str,
+    workers: int = 1,
+) -> Dict[str, int]:
+    """
+    Count words of an append-only export, parsing only what was added since the last run.
+    The checkpoint stores the byte offset where the *last* message starts together with
+    the counts of all messages before it. The last message is always re-parsed, so
+    continuation lines appended to it after the checkpoint are picked up correctly.
+    If the file no longer matches the checkpoint (truncated or rewritten), the whole
+    file is parsed again.
+    """
+    key = cache.checkpoint_key(
+        input_source, input_type, min_word_length, blocklist_words, blocklist_regex
+    )
+    offset = 0
+    counts: Dict[str, int] = {}
+    checkpoint = cache.get_checkpoint(key)
+    if checkpoint is not None:
+        meta, checkpoint_counts = checkpoint
+        valid = _valid_offset(input_source, meta)
+        if valid is not None:
+            offset, counts = valid, checkpoint_counts
+
+    # Hold back the most recent message; everything before it is final
+    last: List[Tuple[int, str]] = []
+
+    def complete_texts() -> Iterator[str]:
+        for message_offset, text in strategy.iter_texts_with_offsets(input_source, offset):
+            if last:
+                yield last[0][1]
+            last[:] = [(message_offset, text)]
+
+    tail = word_counts_from_texts(
+        complete_texts(), min_word_length, blocklist_words, blocklist_regex, workers=workers
+    )
+    merge_counts(counts, tail)
+    if not last:
+        return counts
+
+    last_offset, last_text = last[0]
+    cache.put_checkpoint(
+        key, {"offset": last_offset, "anchor": _anchor_hash(input_source, last_offset)}, counts
+    )
+    return merge_counts(
+        counts,
+        word_counts_from_texts([last_text], min_word_length, blocklist_words, blocklist_regex),
+    )
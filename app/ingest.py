@@ -0,0 +1,182 @@
+import glob
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.analyzer import merge_stats, word_counts_from_texts
+from app.cache import AnalysisCache, file_fingerprint
+from app.counting import DEFAULT_SPACESAVING_CAPACITY
+from app.dedup import Deduplicator
+from app.strategies import get_strategy
+
+# Compressed files picked up when a directory is given as input, besides the input
+# type's own file_suffixes (see InputSourceStrategy)
+COMPRESSED_SUFFIXES = (".zip", ".gz", ".bz2", ".xz", ".zst")
+
+# (path, counts, error message); counts is None if the file failed
+FileResult = Tuple[str, Optional[Dict[str, int]], Optional[str]]
+
+
+def expand_inputs(sources: List[str], input_type: str = "whatsapp") -> List[str]:
+    """
+    Resolve input arguments into files, keeping argument order and dropping duplicates:
+    - directories are searched recursively for files of input_type (its strategy's
+      file_suffixes) and compressed files (COMPRESSED_SUFFIXES)
+    - arguments containing *, ? or [ are expanded as (recursive) glob patterns
+    - anything else is taken as a file path as is
+    Directory and glob matches are sorted.
+    """
+    files: List[str] = []
+    seen: Set[str] = set()
+
+    def add(path: str) -> None:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            files.append(path)
+
+    for source in sources:
+        if os.path.isdir(source):
+            suffixes = get_strategy(input_type).file_suffixes + COMPRESSED_SUFFIXES
+            matches = []
+            for root, dirs, names in os.walk(source):
+                dirs.sort()
+                matches.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(suffixes)
+                )
+            for path in sorted(matches):
+                add(path)
+        elif glob.has_magic(source):
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path):
+                    add(path)
+        else:
+            add(source)
+    return files
+
+
+def _count_file(
+    path: str,
+    input_type: str,
+    min_word_length: int,
+    blocklist_words: Set[str],
+    blocklist_regex: List[re.Pattern],
+    backend: str,
+    capacity: int,
+    dedup: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, int], Dict[str, float]]:
+    # Runs in a worker process: parse and count one whole file
+    strategy = get_strategy(input_type)
+    texts = strategy.iter_texts(path)
+    deduplicator = Deduplicator(**dedup) if dedup is not None else None
+    if deduplicator is not None:
+        texts = deduplicator.filter(texts)
+    counts = word_counts_from_texts(
+        texts, min_word_length, blocklist_words, blocklist_regex,
+        backend=backend, capacity=capacity,
+    )
+    return counts, deduplicator.stats if deduplicator is not None else {}
+
+
+def ingest_files(
+    paths: List[str],
+    input_type: str,
+    min_word_length: int,
+    blocklist_words: Set[str],
+    blocklist_regex: List[re.Pattern],
+    workers: int = 1,
+    backend: str = "dict",
+    capacity: int = DEFAULT_SPACESAVING_CAPACITY,
+    cache: Optional[AnalysisCache] = None,
+    variant: str = "",
+    progress: Callable[[str], None] = print,
+    dedup: Optional[Dict[str, Any]] = None,
+    stats: Optional[Dict[str, float]] = None,
+) -> List[FileResult]:
+    """
+    Count words of every file separately and return one FileResult per path, in order.
+    Cache lookups (fingerprinting, reading entries) run in a thread pool; files
+    without cached counts are parsed in a pool of `workers` processes, one file per
+    task. A file that fails to open or parse is reported through progress and in its
+    result, and does not stop the others.
+    With dedup (Deduplicator keyword arguments), repeated messages are suppressed
+    within each parsed file; the suppression counters are added to stats if given.
+    """
+    results: List[Optional[FileResult]] = [None] * len(paths)
+    keys: List[Optional[str]] = [None] * len(paths)
+    done = 0
+
+    def finish(index: int, counts: Optional[Dict[str, int]], error: Optional[str]) -> None:
+        nonlocal done
+        done += 1
+        path = paths[index]
+        results[index] = (path, counts, error)
+        if error is None:
+            progress(f"[{done}/{len(paths)}] {path}: {len(counts)} distinct words")
+        else:
+            progress(f"[{done}/{len(paths)}] {path} failed: {error}")
+
+    def lookup(path: str) -> Tuple[Optional[str], Optional[Dict[str, int]]]:
+        try:
+            fingerprint = file_fingerprint(path)
+        except OSError:
+            # Reported when the file is parsed
+            fingerprint = None
+        if fingerprint is None:
+            return None, None
+        key = cache.counts_key(
+            fingerprint, input_type, min_word_length, blocklist_words, blocklist_regex,
+            variant=variant,
+        )
+        return key, cache.get_counts(key)
+
+    pending = list(range(len(paths)))
+    if cache is not None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(32, 4 * max(1, workers))) as threads:
+            lookups = list(threads.map(lookup, paths))
+        pending = []
+        for index, (key, counts) in enumerate(lookups):
+            keys[index] = key
+            if counts is not None:
+                finish(index, counts, None)
+            else:
+                pending.append(index)
+
+    def store(index: int, result: Tuple[Dict[str, int], Dict[str, float]]) -> None:
+        counts, file_stats = result
+        if stats is not None:
+            merge_stats(stats, file_stats)
+        if cache is not None and keys[index] is not None:
+            cache.put_counts(keys[index], counts)
+        finish(index, counts, None)
+
+    options = (
+        input_type, min_word_length, blocklist_words, blocklist_regex, backend, capacity, dedup,
+    )
+    if workers <= 1 or len(pending) <= 1:
+        for index in pending:
+            try:
+                result = _count_file(paths[index], *options)
+            except Exception as e:
+                finish(index, None, str(e) or type(e).__name__)
+            else:
+                store(index, result)
+        return results
+
+    # Imported here so serial runs don't pay for the process pool machinery
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = {pool.submit(_count_file, paths[index], *options): index for index in pending}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                finish(index, None, str(e) or type(e).__name__)
+            else:
+                store(index, result)
+    return results
@@ -0,0 +1,37 @@
+from typing import Any, Dict
+
+# "wordcloud" is the library's own placement, "fast" the vectorized engine in app.fast_layout
+LAYOUT_ENGINES = ("wordcloud", "fast")
+
+# Quality/speed presets of the fast engine. cell: grid cell size (px) searched first;
+# min_cell: finest grid searched before the font size is reduced; shrink: factor applied
+# to the font size when a word does not fit
+LAYOUT_QUALITY: Dict[str, Dict[str, float]] = {
+    "draft": {"cell": 8, "min_cell": 4, "shrink": 0.85},
+    "balanced": {"cell": 8, "min_cell": 2, "shrink": 0.93},
+    "fine": {"cell": 4, "min_cell": 1, "shrink": 0.97},
+}
+DEFAULT_LAYOUT_QUALITY = "balanced"
+
+# Seed of word placement and palette colors; the same seed, counts and options
+# always produce the same image
+DEFAULT_RENDER_SEED = 42
+
+
+def layout_wordcloud(
+    wc: Any,
+    frequencies: Dict[str, float],
+    engine: str = "wordcloud",
+    quality: str = DEFAULT_LAYOUT_QUALITY,
+):
+    """
+    Generate the layout of wc from frequencies with the given engine; returns wc.
+    """
+    if engine == "wordcloud":
+        return wc.generate_from_frequencies(frequencies)
+    if engine == "fast":
+        # Imported here so option parsing works without numpy/PIL
+        from app.fast_layout import generate_fast
+
+        return generate_fast(wc, frequencies, quality)
+    raise ValueError(f"Unknown layout engine '{engine}' (choose from {', '.join(LAYOUT_ENGINES)})")
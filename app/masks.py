@@ -0,0 +1,94 @@
+"""
+Mask preparation: shape image -> thresholded uint8 mask at the target size.
+
+Prepared masks are stored as .npy entries of the AnalysisCache keyed by the image's
+content hash, the target width and the threshold (so they count towards its size
+limit), and loaded memory-mapped, so repeated renders with the same shape skip
+decoding, resizing and thresholding. SVG shapes are rasterized at the requested
+width (needs the optional cairosvg package).
+"""
+import hashlib
+import io
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from app.cache import AnalysisCache
+
+# Pixels at least this bright are masked out; 255 keeps the wordcloud library's rule
+# of masking pure white only
+DEFAULT_MASK_THRESHOLD = 255
+
+# Bump when the preparation steps change
+MASK_FORMAT_VERSION = 2
+
+
+def mask_key(shape_path: str, width: Optional[int], threshold: int) -> str:
+    h = hashlib.sha256(f"{MASK_FORMAT_VERSION}:{width}:{threshold}:".encode())
+    with open(shape_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _rasterize_svg(shape_path: str, width: Optional[int]) -> Image.Image:
+    try:
+        import cairosvg
+    except (ImportError, OSError) as e:
+        # OSError: cairosvg is installed but the cairo library is missing
+        raise RuntimeError("Rasterizing SVG shapes needs cairosvg and the cairo library") from e
+    png = cairosvg.svg2png(url=shape_path, output_width=width)
+    return Image.open(io.BytesIO(png))
+
+
+def _load_image(shape_path: str, width: Optional[int]) -> Image.Image:
+    if shape_path.lower().endswith(".svg"):
+        image = _rasterize_svg(shape_path, width)
+    else:
+        image = Image.open(shape_path)
+        if width and image.width != width:
+            height = max(1, round(image.height * width / image.width))
+            # Box filter averages the covered pixels when downsampling; thresholding follows
+            image = image.resize((width, height), Image.BOX)
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        # Transparent areas are outside the shape, like white ones
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image.convert("RGBA"))
+    return image.convert("L")
+
+
+def prepare_mask(
+    image: Image.Image, threshold: int = DEFAULT_MASK_THRESHOLD
+) -> np.ndarray:
+    """
+    Threshold a grayscale image into a mask of 0 (drawable) and 255 (masked out).
+    """
+    return np.where(np.asarray(image) >= threshold, 255, 0).astype(np.uint8)
+
+
+def load_prepared_mask(
+    shape_path: str,
+    width: Optional[int] = None,
+    threshold: int = DEFAULT_MASK_THRESHOLD,
+    cache: Optional[AnalysisCache] = None,
+) -> np.ndarray:
+    """
+    Prepared mask of shape_path scaled to width (keeping the aspect ratio; None keeps
+    the image's own size). Served memory-mapped from cache if prepared before; without
+    a cache nothing is written to disk.
+    """
+    key = None
+    if cache is not None:
+        key = mask_key(shape_path, width, threshold)
+        path = cache.get_mask(key)
+        if path is not None:
+            try:
+                return np.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                pass
+    mask = prepare_mask(_load_image(shape_path, width), threshold)
+    if key is not None:
+        with cache.writing_mask(key) as f:
+            np.save(f, mask)
+    return mask
@@ -0,0 +1,115 @@
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident set size of this process so far in MB, or None where unsupported.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Metrics:
+    """
+    Collects per-stage timings (wall, CPU, peak RSS after the stage) and counters of a run.
+    A disabled instance records nothing, so call sites don't need to branch.
+    Optionally profiles one stage with cProfile and dumps the stats to a file.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        profile_stage: Optional[str] = None,
+        pstats_path: Optional[str] = None,
+    ):
+        self.enabled = enabled
+        self.profile_stage = profile_stage
+        self.pstats_path = pstats_path
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        profiler = None
+        if self.pstats_path and name == self.profile_stage:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - wall, time.process_time() - cpu)
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.pstats_path)
+
+    def timed_iter(self, name: str, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Pass items through, accumulating the time spent producing them as stage name.
+        Used for lazily consumed stages such as parsing, which interleave with counting.
+        """
+        if not self.enabled:
+            yield from items
+            return
+        it = iter(items)
+        wall = cpu = 0.0
+        try:
+            while True:
+                w, c = time.perf_counter(), time.process_time()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    wall += time.perf_counter() - w
+                    cpu += time.process_time() - c
+                yield item
+        finally:
+            self._record(name, wall, cpu)
+
+    def set(self, name: str, value: Any) -> None:
+        if self.enabled:
+            self.counters[name] = value
+
+    def update(self, values: Dict[str, Any]) -> None:
+        if self.enabled:
+            for name, value in values.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def _record(self, name: str, wall: float, cpu: float) -> None:
+        entry = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0})
+        entry["wall_s"] += wall
+        entry["cpu_s"] += cpu
+        entry["peak_rss_mb"] = peak_rss_mb()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": self.stages, "counters": self.counters}
+
+    def write_json(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def report(self) -> str:
+        lines: List[str] = [f"{'stage':<20} {'wall':>9} {'cpu':>9} {'peak RSS':>11}"]
+        for name, s in self.stages.items():
+            rss = "n/a" if s["peak_rss_mb"] is None else f"{s['peak_rss_mb']:.1f} MB"
+            lines.append(f"{name:<20} {s['wall_s']:>8.3f}s {s['cpu_s']:>8.3f}s {rss:>11}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<32} {value}")
+        return "\n".join(lines)
@@ -0,0 +1,148 @@
+"""
+Phrase (n-gram) counting with collocation scoring.
+
+Phrases are the n-grams of adjacent words that pass the Analyzer's rules (see
+Analyzer.token_runs), so they never span a dropped word or an emoji. Unigram counts
+stay exact, while each n-gram size is counted with a Space-Saving counter of bounded
+capacity that prunes low-frequency candidates as it goes. A phrase is kept if its
+guaranteed count reaches min_count and its pointwise mutual information
+    PMI = log2(P(w1 ... wn) / (P(w1) * ... * P(wn)))
+reaches min_pmi, which separates collocations ("happy birthday") from words that
+merely co-occur because both are frequent.
+"""
+import math
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.analyzer import Analyzer
+from app.counting import SpaceSaving
+
+# Phrases tracked per n-gram size
+DEFAULT_NGRAM_CAPACITY = 50000
+DEFAULT_MIN_NGRAM_COUNT = 3
+DEFAULT_MIN_PMI = 3.0
+MAX_NGRAM_SIZE = 5
+
+
+def parse_ngram_sizes(value: str) -> Tuple[int, ...]:
+    """
+    Parse a comma-separated list of n-gram sizes such as "2,3"; 1 adds single words.
+    """
+    try:
+        sizes = sorted({int(part) for part in value.split(",") if part.strip()})
+    except ValueError:
+        raise ValueError(f"Invalid n-gram sizes '{value}', expected e.g. '2,3'")
+    if not sizes or sizes[0] < 1 or sizes[-1] > MAX_NGRAM_SIZE:
+        raise ValueError(f"n-gram sizes must be between 1 and {MAX_NGRAM_SIZE}")
+    return tuple(sizes)
+
+
+class PhraseCounter:
+    """
+    Counts words exactly and n-grams of the given sizes (> 1) approximately in
+    bounded memory, then scores the n-grams by PMI (see module docstring).
+    """
+
+    def __init__(
+        self,
+        analyzer: Analyzer,
+        sizes: Iterable[int] = (2,),
+        capacity: int = DEFAULT_NGRAM_CAPACITY,
+    ):
+        self.analyzer = analyzer
+        self.unigrams: Dict[str, int] = {}
+        self.ngrams = {n: SpaceSaving(capacity) for n in sorted(set(sizes)) if n > 1}
+        self.total = 0
+        # Regex blocklist decision per distinct word
+        self._blocked: Dict[str, bool] = {}
+
+    def add(self, text: str) -> None:
+        unigrams = self.unigrams
+        for run in self._runs(text):
+            for token in run:
+                unigrams[token] = unigrams.get(token, 0) + 1
+            self.total += len(run)
+            for n, counter in self.ngrams.items():
+                for i in range(len(run) - n + 1):
+                    counter.add(" ".join(run[i:i + n]))
+
+    def update(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+    def _runs(self, text: str) -> Iterator[List[str]]:
+        # Apply the regex blocklist, which also ends a run
+        if not self.analyzer.blocklist_regex:
+            yield from self.analyzer.token_runs(text)
+            return
+        blocked = self._blocked
+        for run in self.analyzer.token_runs(text):
+            part: List[str] = []
+            for token in run:
+                is_blocked = blocked.get(token)
+                if is_blocked is None:
+                    is_blocked = blocked[token] = self.analyzer.is_regex_blocked(token)
+                if not is_blocked:
+                    part.append(token)
+                elif part:
+                    yield part
+                    part = []
+            if part:
+                yield part
+
+    def pmi(self, phrase: str, count: int) -> float:
+        words = phrase.split(" ")
+        # P(phrase) / prod P(word) = count * total^(n-1) / prod count(word)
+        score = math.log2(count) + (len(words) - 1) * math.log2(self.total)
+        return score - sum(math.log2(self.unigrams[w]) for w in words)
+
+    def scored_phrases(
+        self, min_count: int = DEFAULT_MIN_NGRAM_COUNT, min_pmi: float = DEFAULT_MIN_PMI
+    ) -> List[Tuple[str, int, float]]:
+        """
+        (phrase, count, PMI) of every phrase passing both thresholds, most frequent first.
+        count is the guaranteed (lower bound) count of the approximate counter.
+        """
+        phrases = []
+        for counter in self.ngrams.values():
+            for phrase, count in counter.items():
+                count -= counter.error(phrase)
+                if count < min_count:
+                    continue
+                score = self.pmi(phrase, count)
+                if score >= min_pmi:
+                    phrases.append((phrase, count, score))
+        phrases.sort(key=lambda item: (-item[1], -item[2]))
+        return phrases
+
+    def counts(
+        self,
+        min_count: int = DEFAULT_MIN_NGRAM_COUNT,
+        min_pmi: float = DEFAULT_MIN_PMI,
+        include_unigrams: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Phrase frequencies for generate_wordcloud, optionally followed by the word counts.
+        """
+        counts = {phrase: count for phrase, count, _ in self.scored_phrases(min_count, min_pmi)}
+        if include_unigrams:
+            for word, count in self.unigrams.items():
+                counts[word] = counts.get(word, 0) + count
+        return counts
+
+
+def phrase_counts(
+    texts: Iterable[str],
+    analyzer: Analyzer,
+    sizes: Iterable[int] = (2,),
+    min_count: int = DEFAULT_MIN_NGRAM_COUNT,
+    min_pmi: float = DEFAULT_MIN_PMI,
+    capacity: int = DEFAULT_NGRAM_CAPACITY,
+) -> Dict[str, int]:
+    """
+    Count the phrases of the given n-gram sizes in texts (consumed lazily) and return
+    those passing min_count and min_pmi; size 1 adds the plain word counts.
+    """
+    sizes = tuple(sizes)
+    counter = PhraseCounter(analyzer, sizes, capacity)
+    counter.update(texts)
+    return counter.counts(min_count, min_pmi, include_unigrams=1 in sizes)
@@ -0,0 +1,133 @@
+"""
+Token normalization applied to word counts: Unicode folding (NFKC + casefold),
+emoji skin tone/hair modifier stripping, a user alias map and optional stemming
+(needs the snowballstemmer package).
+
+Normalization is a function of the token alone, so it runs once per distinct token
+of the counts (memoized across calls in a bounded cache) and the counts of tokens
+with the same normalized form are summed; its cost grows with the vocabulary, not
+with the corpus.
+"""
+import os
+import unicodedata
+from typing import Dict, Optional, Set
+
+# Distinct tokens whose normalized form is remembered
+DEFAULT_MEMO_SIZE = 200000
+
+# Skin tone modifiers and hair components; the tokenizer yields them as separate tokens
+EMOJI_MODIFIERS = frozenset(
+    [chr(c) for c in range(0x1F3FB, 0x1F400)] + [chr(c) for c in range(0x1F9B0, 0x1F9B4)]
+)
+
+
+def load_alias_map(path: Optional[str]) -> Dict[str, str]:
+    """
+    Load an alias file with one "canonical: alias, alias, ..." line per canonical
+    token (lines starting with # are comments). Returns {alias: canonical}, lowercased.
+    """
+    aliases: Dict[str, str] = {}
+    if not path:
+        return aliases
+    if not os.path.exists(path):
+        print(f"Alias file not found: {path}")
+        return aliases
+    with open(path, "r", encoding="utf8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            canonical, sep, rest = line.partition(":")
+            if not sep:
+                print(f"Invalid alias line in {path}: {line}")
+                continue
+            canonical = canonical.strip().lower()
+            for alias in rest.split(","):
+                if alias.strip():
+                    aliases[alias.strip().lower()] = canonical
+    return aliases
+
+
+def _stemmer(language: str):
+    try:
+        import snowballstemmer
+    except ImportError as e:
+        raise RuntimeError("Stemming needs the snowballstemmer package") from e
+    try:
+        return snowballstemmer.stemmer(language.lower())
+    except KeyError:
+        raise ValueError(
+            f"Unsupported stemming language '{language}', expected one of "
+            f"{', '.join(sorted(snowballstemmer.algorithms()))}"
+        )
+
+
+class Normalizer:
+    """
+    Maps a token to its normalized form, or "" if the token is dropped:
+    fold (NFKC + casefold) -> strip emoji modifiers -> alias map -> stem -> blocklist.
+    Aliased tokens are not stemmed. Phrases (space-separated, see app.ngrams) are
+    normalized word by word and dropped if any word is.
+    """
+
+    def __init__(
+        self,
+        unicode_fold: bool = True,
+        strip_emoji_modifiers: bool = True,
+        aliases: Optional[Dict[str, str]] = None,
+        stem_language: Optional[str] = None,
+        blocklist_words: Optional[Set[str]] = None,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ):
+        self.unicode_fold = unicode_fold
+        self.strip_emoji_modifiers = strip_emoji_modifiers
+        self.aliases = {self._fold(k): self._fold(v) for k, v in (aliases or {}).items()}
+        self.stemmer = _stemmer(stem_language) if stem_language else None
+        self.blocklist_words: Set[str] = blocklist_words or set()
+        self.memo_size = memo_size
+        self._memo: Dict[str, str] = {}
+
+    def _fold(self, token: str) -> str:
+        if not self.unicode_fold:
+            return token
+        return unicodedata.normalize("NFKC", token.casefold())
+
+    def _normalize_word(self, token: str) -> str:
+        token = self._fold(token)
+        if self.strip_emoji_modifiers and token in EMOJI_MODIFIERS:
+            return ""
+        alias = self.aliases.get(token)
+        if alias is not None:
+            token = alias
+        elif self.stemmer is not None:
+            token = self.stemmer.stemWord(token)
+        return "" if token in self.blocklist_words else token
+
+    def normalize(self, token: str) -> str:
+        memo = self._memo
+        result = memo.get(token)
+        if result is not None:
+            return result
+        if " " in token:
+            words = [self._normalize_word(word) for word in token.split(" ")]
+            result = " ".join(words) if all(words) else ""
+        else:
+            result = self._normalize_word(token)
+        if len(memo) >= self.memo_size:
+            # Evict the oldest entry (dicts keep insertion order)
+            del memo[next(iter(memo))]
+        memo[token] = result
+        return result
+
+    def normalize_counts(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """
+        Counts keyed by normalized token; counts of merged tokens are summed and
+        dropped tokens are removed. Keys keep the order of their first raw token.
+        """
+        normalize = self.normalize
+        result: Dict[str, int] = {}
+        for token, count in counts.items():
+            key = normalize(token)
+            if key:
+                result[key] = result.get(key, 0) + count
+        return result
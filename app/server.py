@@ -0,0 +1,368 @@
+"""
+Local render service keeping fonts, masks and configured WordCloud objects warm.
+
+Run with:
+    python -m app.server --port 8080 --workers 4
+
+Endpoints:
+- POST /render        JSON body {"counts": {word: count}, <render options>} -> PNG
+- POST /render/chat   raw chat export as body, options as query parameters -> PNG
+                      (input_type and min_word_length select how the chat is counted)
+- GET  /health        JSON with pool size and current load
+
+Rendered PNGs and layouts are cached on disk (see app.wordcloud.render_png), so
+repeated requests for the same cloud skip placement, and palette changes recolor.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from app.analyzer import word_counts_from_texts
+from app.counting import top_counts
+from app.blocklist import load_blocklist_regex, load_blocklist_words
+from app.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES, AnalysisCache
+from app.fonts import detect_default_emoji_font
+from app.layout import (
+    DEFAULT_LAYOUT_QUALITY, DEFAULT_RENDER_SEED, LAYOUT_ENGINES, LAYOUT_QUALITY,
+)
+from app.strategies import get_strategy
+
+
+RENDER_OPTIONS = (
+    "max_word_number", "background_color", "shape_path", "font_path", "palette",
+    "layout", "layout_quality", "shape_width", "seed",
+)
+
+DEFAULT_RENDER_OPTIONS: Dict[str, Any] = {
+    "max_word_number": 124,
+    "background_color": "white",
+    "shape_path": None,
+    "shape_width": None,
+    "font_path": None,
+    "palette": None,
+    "layout": "wordcloud",
+    "layout_quality": DEFAULT_LAYOUT_QUALITY,
+    "seed": DEFAULT_RENDER_SEED,
+}
+
+# Per worker process state, set up by _init_worker
+_wordclouds: "OrderedDict[Tuple, Any]" = OrderedDict()
+_cache_size = 32
+_blocklist_words: Set[str] = set()
+_blocklist_regex: list = []
+_render_cache: Optional[AnalysisCache] = None
+
+
+def parse_options(raw: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate render options from a request and fill in the server defaults.
+    Raises ValueError for unknown options or invalid values.
+    """
+    unknown = set(raw) - set(RENDER_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+    options = {**defaults, **raw}
+    try:
+        options["max_word_number"] = int(options["max_word_number"])
+    except (TypeError, ValueError):
+        raise ValueError("max_word_number must be an integer")
+    if options["max_word_number"] < 1:
+        raise ValueError("max_word_number must be positive")
+    if options.get("layout", "wordcloud") not in LAYOUT_ENGINES:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUT_ENGINES)}")
+    if options.get("layout_quality", DEFAULT_LAYOUT_QUALITY) not in LAYOUT_QUALITY:
+        raise ValueError(f"layout_quality must be one of {', '.join(LAYOUT_QUALITY)}")
+    if options.get("shape_width") is not None:
+        try:
+            options["shape_width"] = int(options["shape_width"])
+        except (TypeError, ValueError):
+            raise ValueError("shape_width must be an integer")
+        if options["shape_width"] < 1:
+            raise ValueError("shape_width must be positive")
+    if options.get("seed") is not None:
+        try:
+            options["seed"] = int(options["seed"])
+        except (TypeError, ValueError):
+            raise ValueError("seed must be an integer")
+    shape_path = options.get("shape_path")
+    if shape_path and not os.path.isfile(shape_path):
+        raise ValueError(f"Shape file not found: {shape_path}")
+    return options
+
+
+def _init_worker(
+    cache_size: int,
+    blocklist_words: Set[str],
+    blocklist_regex: list,
+    render_cache: Optional[AnalysisCache] = None,
+) -> None:
+    global _cache_size, _blocklist_words, _blocklist_regex, _render_cache
+    _cache_size = cache_size
+    _blocklist_words = blocklist_words
+    _blocklist_regex = blocklist_regex
+    _render_cache = render_cache
+
+
+def _cached_wordcloud(options: Dict[str, Any]):
+    # One configured WordCloud (with its loaded mask and font path) per option set,
+    # least recently used instances are dropped beyond _cache_size
+    from app.wordcloud import build_wordcloud
+
+    key = (
+        options["background_color"], options["shape_path"],
+        options["font_path"], options["palette"], options.get("shape_width"),
+        options.get("seed", DEFAULT_RENDER_SEED),
+    )
+    wc = _wordclouds.get(key)
+    if wc is None:
+        wc = build_wordcloud(*key, cache=_render_cache)
+        _wordclouds[key] = wc
+        while len(_wordclouds) > _cache_size:
+            _wordclouds.popitem(last=False)
+    else:
+        _wordclouds.move_to_end(key)
+    return wc
+
+
+def _render_png(counts: Dict[str, int], options: Dict[str, Any]) -> bytes:
+    from app.wordcloud import render_png
+
+    return render_png(
+        top_counts(counts, options["max_word_number"]), options,
+        wc=_cached_wordcloud(options), cache=_render_cache,
+    )
+
+
+def _render_chat_png(
+    data: bytes, input_type: str, min_word_length: int, options: Dict[str, Any]
+) -> bytes:
+    strategy = get_strategy(input_type)
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        counts = word_counts_from_texts(
+            strategy.iter_texts(path), min_word_length, _blocklist_words, _blocklist_regex
+        )
+    finally:
+        os.remove(path)
+    return _render_png(counts, options)
+
+
+class RenderService:
+    """
+    Process pool of warm render workers with a bounded queue.
+    At most workers + queue_size renders are accepted at a time; further
+    submissions are rejected immediately so callers can apply backpressure.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        cache_size: int = 32,
+        blocklist_words: Optional[Set[str]] = None,
+        blocklist_regex: Optional[list] = None,
+        render_cache: Optional[AnalysisCache] = None,
+    ):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache_size, blocklist_words or set(), blocklist_regex or [], render_cache),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_submit(self, fn, *args) -> Optional[Future]:
+        """
+        Submit fn(*args) to the pool, or return None if the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+
+class _PayloadTooLarge(Exception):
+    pass
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    # Set on the handler class by make_server
+    service: RenderService
+    defaults: Dict[str, Any] = DEFAULT_RENDER_OPTIONS
+    max_body_bytes = 256 * 1024 * 1024
+    request_timeout = 300.0
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            return self._error(HTTPStatus.NOT_FOUND, "Not found")
+        self._send(HTTPStatus.OK, "application/json", json.dumps({
+            "status": "ok",
+            "workers": self.service.workers,
+            "capacity": self.service.capacity,
+            "in_flight": self.service.in_flight,
+        }).encode("utf8"))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self._read_body()
+            if url.path == "/render":
+                payload = json.loads(body or b"{}")
+                if not isinstance(payload, dict) or not isinstance(payload.get("counts"), dict):
+                    raise ValueError("Body must be a JSON object with a 'counts' object")
+                counts = {}
+                for word, count in payload.pop("counts").items():
+                    try:
+                        counts[str(word)] = int(count)
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Count of '{word}' must be an integer, got {count!r}")
+                job = (_render_png, counts, parse_options(payload, self.defaults))
+            elif url.path == "/render/chat":
+                input_type = query.pop("input_type", "whatsapp")
+                min_word_length = int(query.pop("min_word_length", 3))
+                get_strategy(input_type)
+                job = (
+                    _render_chat_png, body, input_type, min_word_length,
+                    parse_options(query, self.defaults),
+                )
+            else:
+                return self._error(HTTPStatus.NOT_FOUND, "Not found")
+        except _PayloadTooLarge as e:
+            return self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e))
+        except ValueError as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        future = self.service.try_submit(*job)
+        if future is None:
+            return self._error(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Render queue is full", retry_after=1
+            )
+        try:
+            png = future.result(timeout=self.request_timeout)
+        except Exception as e:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Rendering failed: {e}")
+        self._send(HTTPStatus.OK, "image/png", png)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.max_body_bytes:
+            raise _PayloadTooLarge(f"Body exceeds {self.max_body_bytes} bytes")
+        return self.rfile.read(length)
+
+    def _error(self, status: HTTPStatus, message: str, retry_after: Optional[int] = None):
+        headers = {"Retry-After": str(retry_after)} if retry_after else {}
+        body = json.dumps({"error": message}).encode("utf8")
+        self._send(status, "application/json", body, headers)
+
+    def _send(self, status, content_type: str, body: bytes, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(
+    host: str,
+    port: int,
+    service: RenderService,
+    defaults: Optional[Dict[str, Any]] = None,
+    max_body_bytes: Optional[int] = None,
+) -> ThreadingHTTPServer:
+    handler = type("BoundRenderRequestHandler", (RenderRequestHandler,), {
+        "service": service,
+        "defaults": {**DEFAULT_RENDER_OPTIONS, **(defaults or {})},
+        "max_body_bytes": max_body_bytes or RenderRequestHandler.max_body_bytes,
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve word cloud renders over HTTP.")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Interface to bind (default: localhost only).")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of render worker processes.")
+    parser.add_argument("--queue_size", type=int, default=16,
+                        help="Renders allowed to wait for a worker before requests get 503.")
+    parser.add_argument("--cache_size", type=int, default=32,
+                        help="Configured WordCloud objects kept per worker (LRU).")
+    parser.add_argument("--max_upload_mb", type=int, default=256,
+                        help="Largest accepted request body in MB.")
+    parser.add_argument("--font_path", type=str, default=None,
+                        help="Default font; falls back to the detected emoji font.")
+    parser.add_argument("--blocklist_word_file", type=str, help="Word blocklist for chat uploads.")
+    parser.add_argument("--blocklist_regex_file", type=str,
+                        help="Regex blocklist for chat uploads.")
+    parser.add_argument("--no_cache", "--no-cache", action="store_true",
+                        help="Neither read nor write the render cache.")
+    parser.add_argument("--cache_dir", type=str, default=DEFAULT_CACHE_DIR,
+                        help="Directory of the render cache (shared with main.py).")
+    parser.add_argument("--cache_max_mb", type=int,
+                        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+                        help="Size limit of the cache in MB.")
+    args = parser.parse_args()
+
+    service = RenderService(
+        args.workers,
+        args.queue_size,
+        args.cache_size,
+        load_blocklist_words(args.blocklist_word_file),
+        load_blocklist_regex(args.blocklist_regex_file),
+        None if args.no_cache else AnalysisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024),
+    )
+    server = make_server(
+        args.host,
+        args.port,
+        service,
+        defaults={"font_path": args.font_path or detect_default_emoji_font()},
+        max_body_bytes=args.max_upload_mb * 1024 * 1024,
+    )
+    print(f"Serving word clouds on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,71 @@
-from typing import Dict
+import importlib
+from typing import Dict, Optional, Tuple, Type
+
 from app.strategies.base import InputSourceStrategy
-from app.strategies.whatsapp_strategy import WhatsAppStrategy
 
 
-AVAILABLE_INPUT_TYPES = ("whatsapp",)
+# input_type -> (module, class name); a strategy's module is only imported when requested
+STRATEGY_MODULES: Dict[str, Tuple[str, str]] = {
+    "whatsapp": ("app.strategies.whatsapp_strategy", "WhatsAppStrategy"),
+    "telegram": ("app.strategies.telegram_strategy", "TelegramStrategy"),
+    "text": ("app.strategies.text_strategy", "PlainTextStrategy"),
+    "csv": ("app.strategies.csv_strategy", "CsvStrategy"),
+    "mbox": ("app.strategies.mbox_strategy", "MboxStrategy"),
+}
+
+AVAILABLE_INPUT_TYPES = tuple(STRATEGY_MODULES)
+
+# Third-party packages can add input types through entry points in this group,
+# e.g. in pyproject.toml: [project.entry-points."word_cloud.strategies"] slack = "pkg.mod:Cls"
+ENTRY_POINT_GROUP = "word_cloud.strategies"
+
+# Strategies are stateless, so one instance per input_type is shared
+_instances: Dict[str, InputSourceStrategy] = {}
+
+
+def register_strategy(input_type: str, module: str, class_name: str) -> None:
+    """
+    Make an InputSourceStrategy subclass available as input_type without importing it yet.
+    """
+    STRATEGY_MODULES[input_type.lower()] = (module, class_name)
+    _instances.pop(input_type.lower(), None)
+
+
+def _strategy_class(name: str) -> Optional[Type[InputSourceStrategy]]:
+    if name in STRATEGY_MODULES:
+        module, class_name = STRATEGY_MODULES[name]
+        return getattr(importlib.import_module(module), class_name)
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name.lower() == name:
+            return entry_point.load()
+    return None
 
 
 def get_strategy(input_type: str) -> InputSourceStrategy:
     """
-    Return an instance of a strategy for the given input_type.
-    Currently supported: 'whatsapp'
+    Return the strategy for the given input_type, importing its module on first use.
+    An option can follow the name after a colon, e.g. 'csv:body' selects the CSV column.
+    Supported: see AVAILABLE_INPUT_TYPES (plus entry points in ENTRY_POINT_GROUP).
     """
-    strategies: Dict[str, InputSourceStrategy] = {
-        "whatsapp": WhatsAppStrategy(),
-    }
-    try:
-        return strategies[input_type.lower()]
-    except KeyError:
-        raise ValueError(f"Unsupported input_type '{input_type}'. Supported types: {', '.join(AVAILABLE_INPUT_TYPES)}")
\ No newline at end of file
+    key = input_type.lower()
+    strategy = _instances.get(key)
+    if strategy is not None:
+        return strategy
+    name, _, option = key.partition(":")
+    cls = _strategy_class(name)
+    if cls is None:
+        raise ValueError(
+            f"Unsupported input_type '{input_type}'. "
+            f"Supported types: {', '.join(AVAILABLE_INPUT_TYPES)}"
+        )
+    if option:
+        try:
+            strategy = cls(option)
+        except TypeError:
+            raise ValueError(f"Input type '{name}' takes no option (got '{option}')")
+    else:
+        strategy = cls()
+    _instances[key] = strategy
+    return strategy
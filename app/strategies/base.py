@@ -1,8 +1,26 @@
+import datetime
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+class ChatMessage:
+    # timestamp is None if the source's date could not be parsed
+    def __init__(self, timestamp: Optional[datetime.datetime], username: str, message: str):
+        self.timestamp = timestamp
+        self.username = username
+        self.message = message
 
 
 class InputSourceStrategy(ABC):
+    # Suffixes of uncompressed input files, used when a directory is given as input
+    file_suffixes: Tuple[str, ...] = (".txt",)
+    # Whether iter_texts_with_offsets is implemented (enables checkpointed re-analysis)
+    supports_offsets = False
+    # Whether iter_structured_messages is implemented (enables grouped counting)
+    supports_structured_messages = False
+    # Whether split_byte_ranges/iter_texts_in_range are implemented (enables parallel parsing)
+    supports_byte_ranges = False
+
     @abstractmethod
     def extract_texts(self, input_source: str) -> List[str]:
         """
@@ -10,3 +28,47 @@ class InputSourceStrategy(ABC):
         Implementations should return a list of message strings (without metadata).
         """
         pass
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        """
+        Yield plain text snippets one at a time.
+        Strategies that can parse incrementally should override this so the
+        counting pipeline runs in bounded memory; the default wraps extract_texts.
+        """
+        return iter(self.extract_texts(input_source))
+
+    def is_compressed(self, input_source: str) -> bool:
+        """
+        Whether the input is a compressed file that is decompressed while streaming.
+        Byte offsets and ranges refer to the raw file, so they are unavailable then.
+        """
+        return False
+
+    def iter_texts_with_offsets(
+        self, input_source: str, start_offset: int = 0
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (byte offset where the snippet starts, snippet) pairs from start_offset on.
+        Only available for strategies with supports_offsets = True.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support byte offsets")
+
+    def iter_structured_messages(self, input_source: str) -> Iterator[Any]:
+        """
+        Yield message objects exposing timestamp (datetime or None), username and message.
+        Only available for strategies with supports_structured_messages = True.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not expose message metadata")
+
+    def split_byte_ranges(self, input_source: str, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the input into independently parseable [start, end) byte ranges.
+        Only available for strategies with supports_byte_ranges = True.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support byte ranges")
+
+    def iter_texts_in_range(self, input_source: str, start: int, end: int) -> Iterator[str]:
+        """
+        Yield the snippets of one range returned by split_byte_ranges.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support byte ranges")
@@ -0,0 +1,80 @@
+import csv
+import datetime
+import os
+from typing import IO, Iterator, List, Optional
+
+from app.strategies.base import ChatMessage, InputSourceStrategy
+from app.utils.file_utils import open_text_file as util_open_text_file
+
+
+class CsvStrategy(InputSourceStrategy):
+    """
+    CSV corpora with a header row (optionally compressed), streamed row by row.
+    The text column is given as input type 'csv:<column>'; by default it is the first
+    of TEXT_COLUMNS present, else the last column. Author and date columns, if found,
+    make the rows available for grouping.
+    """
+    supports_structured_messages = True
+    file_suffixes = (".csv",)
+
+    TEXT_COLUMNS = ("text", "message", "body", "content")
+    AUTHOR_COLUMNS = ("author", "from", "sender", "username", "user", "name")
+    DATE_COLUMNS = ("date", "timestamp", "datetime", "time", "created_at")
+
+    def __init__(self, column: Optional[str] = None):
+        self.column = column
+
+    @staticmethod
+    def open_file(path: str) -> IO[str]:
+        # Untranslated newlines, so the csv module keeps those inside quoted fields
+        return util_open_text_file(path, base_dir=os.path.dirname(__file__), newline="")
+
+    def extract_texts(self, input_source: str) -> List[str]:
+        return list(self.iter_texts(input_source))
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        for message in self.iter_structured_messages(input_source):
+            yield message.message
+
+    def iter_structured_messages(self, input_source: str) -> Iterator[ChatMessage]:
+        with self.open_file(input_source) as handle:
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = [name.strip().lower() for name in header]
+            text = self._text_column(columns, input_source)
+            author = self._find(columns, self.AUTHOR_COLUMNS)
+            date = self._find(columns, self.DATE_COLUMNS)
+            for row in reader:
+                if len(row) <= text or not row[text].strip():
+                    continue
+                yield ChatMessage(
+                    self._parse_date(row[date]) if date is not None and date < len(row) else None,
+                    row[author] if author is not None and author < len(row) else "",
+                    row[text],
+                )
+
+    def _text_column(self, columns: List[str], input_source: str) -> int:
+        if self.column is None:
+            found = self._find(columns, self.TEXT_COLUMNS)
+            return len(columns) - 1 if found is None else found
+        if self.column.lower() not in columns:
+            raise ValueError(f"Column '{self.column}' not found in {input_source}")
+        return columns.index(self.column.lower())
+
+    @staticmethod
+    def _find(columns: List[str], candidates: tuple) -> Optional[int]:
+        for name in candidates:
+            if name in columns:
+                return columns.index(name)
+        return None
+
+    @staticmethod
+    def _parse_date(value: str) -> Optional[datetime.datetime]:
+        try:
+            timestamp = datetime.datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+        # Naive like the other strategies' timestamps, so date ranges can compare them
+        return timestamp.replace(tzinfo=None)
@@ -0,0 +1,90 @@
+import datetime
+import email
+import email.policy
+import email.utils
+from email.message import EmailMessage
+import os
+import re
+from typing import IO, Iterator, List, Optional
+
+from app.strategies.base import ChatMessage, InputSourceStrategy
+from app.utils.file_utils import open_binary_file as util_open_binary_file
+
+
+class MboxStrategy(InputSourceStrategy):
+    """
+    mbox mailboxes (optionally compressed), streamed one message at a time.
+    The text of a mail is its subject plus its plain text body (or, without one, its
+    HTML body with tags removed); attachments are skipped.
+    """
+    supports_structured_messages = True
+    file_suffixes = (".mbox",)
+
+    TAG_REGEX = re.compile(r"<[^>]+>")
+
+    @staticmethod
+    def open_binary_file(path: str) -> IO[bytes]:
+        return util_open_binary_file(path, base_dir=os.path.dirname(__file__), decompress=True)
+
+    def extract_texts(self, input_source: str) -> List[str]:
+        return list(self.iter_texts(input_source))
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        for message in self.iter_structured_messages(input_source):
+            yield message.message
+
+    def iter_structured_messages(self, input_source: str) -> Iterator[ChatMessage]:
+        with self.open_binary_file(input_source) as handle:
+            for raw in self.iter_raw_messages(handle):
+                mail = email.message_from_bytes(raw, policy=email.policy.default)
+                text = self._text(mail)
+                if text:
+                    yield ChatMessage(self._date(mail), self._sender(mail), text)
+
+    @staticmethod
+    def iter_raw_messages(lines: IO[bytes]) -> Iterator[bytes]:
+        """
+        Split an mbox stream at its "From " separator lines (after an empty line).
+        """
+        current: List[bytes] = []
+        previous_blank = True
+        for line in lines:
+            if previous_blank and line.startswith(b"From "):
+                if current:
+                    yield b"".join(current)
+                current = []
+            else:
+                # Undo mboxrd quoting of body lines that start with "From "
+                if line.startswith(b">") and line.lstrip(b">").startswith(b"From "):
+                    line = line[1:]
+                current.append(line)
+            previous_blank = not line.strip()
+        if current:
+            yield b"".join(current)
+
+    def _text(self, mail: EmailMessage) -> str:
+        parts = [str(mail.get("subject", "") or "")]
+        body = mail.get_body(preferencelist=("plain", "html"))
+        if body is not None:
+            try:
+                content = body.get_content()
+            except (LookupError, ValueError):
+                content = ""
+            if body.get_content_subtype() == "html":
+                content = self.TAG_REGEX.sub(" ", content)
+            parts.append(content)
+        return "\n".join(part for part in parts if part.strip())
+
+    @staticmethod
+    def _sender(mail: EmailMessage) -> str:
+        name, address = email.utils.parseaddr(str(mail.get("from", "") or ""))
+        return name or address
+
+    @staticmethod
+    def _date(mail: EmailMessage) -> Optional[datetime.datetime]:
+        try:
+            timestamp = email.utils.parsedate_to_datetime(str(mail.get("date", "")))
+        except (TypeError, ValueError, IndexError):
+            return None
+        # Naive local time of the sender, comparable with the other strategies' timestamps
+        return timestamp.replace(tzinfo=None)
@@ -0,0 +1,116 @@
+import datetime
+import json
+import os
+import re
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from app.strategies.base import ChatMessage, InputSourceStrategy
+from app.utils.file_utils import open_text_file as util_open_text_file
+
+
+class TelegramStrategy(InputSourceStrategy):
+    """
+    Telegram Desktop JSON exports (result.json of one chat, or of a full export with
+    chats.list), optionally zipped or compressed. Messages are decoded one at a time
+    from a sliding buffer instead of loading the whole document with json.load.
+    """
+    supports_structured_messages = True
+    file_suffixes = (".json",)
+
+    # Characters read per refill; grows while a single message exceeds the buffer
+    CHUNK_SIZE = 1024 * 1024
+
+    MESSAGES_KEY_REGEX = re.compile(r'"messages"\s*:\s*\[')
+
+    _decoder = json.JSONDecoder()
+
+    @staticmethod
+    def open_file(path: str) -> IO[str]:
+        return util_open_text_file(path, base_dir=os.path.dirname(__file__))
+
+    def extract_texts(self, input_source: str) -> List[str]:
+        return list(self.iter_texts(input_source))
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        with self.open_file(input_source) as handle:
+            for message in self.iter_raw_messages(handle):
+                if message.get("type", "message") == "message":
+                    text = self.message_text(message.get("text", ""))
+                    if text:
+                        yield text
+
+    def iter_structured_messages(self, input_source: str) -> Iterator[ChatMessage]:
+        with self.open_file(input_source) as handle:
+            for message in self.iter_raw_messages(handle):
+                if message.get("type", "message") != "message":
+                    continue
+                text = self.message_text(message.get("text", ""))
+                if text:
+                    yield ChatMessage(
+                        self._parse_date(message.get("date")), message.get("from") or "", text
+                    )
+
+    @staticmethod
+    def message_text(value: Any) -> str:
+        # Plain strings, or lists mixing strings and entities such as {"type": "link", "text": ...}
+        if isinstance(value, str):
+            return value
+        if isinstance(value, list):
+            return "".join(
+                part if isinstance(part, str) else str(part.get("text", ""))
+                for part in value if isinstance(part, (str, dict))
+            )
+        return ""
+
+    @staticmethod
+    def _parse_date(value: Any) -> Optional[datetime.datetime]:
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
+    def iter_raw_messages(self, handle: IO[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the elements of every "messages" array in the document as dicts.
+        Only the current message and the unread rest of one chunk are held in memory.
+        """
+        buffer = ""
+        pos = 0
+        eof = False
+        in_array = False
+        while True:
+            if not in_array:
+                match = self.MESSAGES_KEY_REGEX.search(buffer, pos)
+                if match is not None:
+                    pos = match.end()
+                    in_array = True
+                    continue
+                if eof:
+                    return
+                # Keep a tail in case the key is split across chunks
+                buffer = buffer[max(pos, len(buffer) - 64):]
+                pos = 0
+            else:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer):
+                    if buffer[pos] == "]":
+                        pos += 1
+                        in_array = False
+                        continue
+                    try:
+                        message, pos = self._decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise ValueError("Malformed or truncated Telegram export")
+                    else:
+                        if isinstance(message, dict):
+                            yield message
+                        continue
+                elif eof:
+                    raise ValueError("Truncated Telegram export")
+                buffer = buffer[pos:]
+                pos = 0
+            chunk = handle.read(max(self.CHUNK_SIZE, len(buffer)))
+            eof = not chunk
+            buffer += chunk
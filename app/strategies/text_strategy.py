@@ -0,0 +1,91 @@
+import mmap
+import os
+from typing import IO, Iterable, Iterator, List, Tuple
+
+from app.strategies.base import InputSourceStrategy
+from app.utils.file_utils import (
+    compression_format as util_compression_format,
+    open_binary_file as util_open_binary_file,
+    open_text_file as util_open_text_file,
+)
+
+
+class PlainTextStrategy(InputSourceStrategy):
+    """
+    Plain text corpora (optionally compressed): every non-empty line is one text.
+    """
+    supports_offsets = True
+    supports_byte_ranges = True
+
+    @staticmethod
+    def open_file(path: str) -> IO[str]:
+        return util_open_text_file(path, base_dir=os.path.dirname(__file__))
+
+    @staticmethod
+    def open_binary_file(path: str) -> IO[bytes]:
+        return util_open_binary_file(path, base_dir=os.path.dirname(__file__))
+
+    def is_compressed(self, input_source: str) -> bool:
+        with self.open_binary_file(input_source) as handle:
+            return util_compression_format(handle) is not None
+
+    def extract_texts(self, input_source: str) -> List[str]:
+        return list(self.iter_texts(input_source))
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        with self.open_file(input_source) as handle:
+            yield from self.iter_lines(handle)
+
+    @staticmethod
+    def iter_lines(lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if line.strip():
+                yield line
+
+    def iter_texts_with_offsets(
+        self, input_source: str, start_offset: int = 0
+    ) -> Iterator[Tuple[int, str]]:
+        with self.open_binary_file(input_source) as handle:
+            handle.seek(start_offset)
+            offset = start_offset
+            for raw in handle:
+                line = raw.decode("utf8", errors="ignore").rstrip("\r\n")
+                if line.strip():
+                    yield offset, line
+                offset += len(raw)
+
+    def split_byte_ranges(self, input_source: str, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the file into up to `parts` [start, end) byte ranges starting at line starts.
+        """
+        with self.open_binary_file(input_source) as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size == 0:
+                return []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                starts = [0]
+                for i in range(1, max(1, parts)):
+                    target = size * i // parts
+                    if target <= starts[-1]:
+                        continue
+                    newline = mm.find(b"\n", target - 1)
+                    if newline == -1 or newline + 1 >= size:
+                        break
+                    if newline + 1 > starts[-1]:
+                        starts.append(newline + 1)
+        return list(zip(starts, starts[1:] + [size]))
+
+    def iter_texts_in_range(self, input_source: str, start: int, end: int) -> Iterator[str]:
+        with self.open_binary_file(input_source) as handle:
+            if start >= end:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = start
+                while pos < end:
+                    newline = mm.find(b"\n", pos, end)
+                    line_end = end if newline == -1 else newline + 1
+                    line = mm[pos:line_end].decode("utf8", errors="ignore").rstrip("\r\n")
+                    if line.strip():
+                        yield line
+                    pos = line_end
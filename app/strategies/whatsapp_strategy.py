@@ -1,19 +1,30 @@
+import io
+import mmap
 import os
 import re
 import datetime
-from typing import List
-from app.strategies.base import InputSourceStrategy
-from app.utils.file_utils import get_file_content as util_get_file_content, get_absolute_path as util_get_absolute_path
+from itertools import chain, islice
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+from app.strategies.base import ChatMessage, InputSourceStrategy
+from app.timestamps import TimestampParser
+from app.utils.file_utils import (
+    get_file_content as util_get_file_content,
+    get_absolute_path as util_get_absolute_path,
+    compression_format as util_compression_format,
+    open_binary_file as util_open_binary_file,
+    open_text_file as util_open_text_file,
+)
 
 
-class WhatsAppMessage:
-    def __init__(self, timestamp: datetime.datetime, username: str, message: str):
-        self.timestamp = timestamp
-        self.username = username
-        self.message = message
+class WhatsAppMessage(ChatMessage):
+    pass
 
 
 class WhatsAppStrategy(InputSourceStrategy):
+    supports_offsets = True
+    supports_structured_messages = True
+    supports_byte_ranges = True
+
     # Embedded URL regex
     URL_REGEX = r"(?:(?:https?|ftp):\/\/)?[\w/\-?=%.]+\.[\w/\-?=%.]+"
 
@@ -22,16 +33,39 @@ class WhatsAppStrategy(InputSourceStrategy):
     (?# contains the regex statement to parse whatsapp messages)
     (?# make sure re lib is configure with re.VERBOSE and re.MULTILINE)
     ^
-    (?P<datetime>\d{1,2}\/\d{1,2}\/\d{2}[^-]+)\s+-\s+
+    (?P<datetime>\d{1,2}[./]\d{1,2}[./]\d{2}[^-]+)\s+-\s+
     (?P<name>[^:]+):\s+
     (?P<message>[\s\S]+?)
-    (?=^\d{1,2}\/\d{1,2}\/\d{2}[^-]|\Z)
+    (?=^\d{1,2}[./]\d{1,2}[./]\d{2}[^-]|\Z)
     """
 
+    # Line-oriented equivalents used by the streaming parser:
+    # a header line starts a new message, any other line continues the current one.
+    # Lines that look like a timestamp but are no chat message (e.g. system notices)
+    # terminate the current message without starting a new one.
+    MESSAGE_START_REGEX = re.compile(r"^\d{1,2}[./]\d{1,2}[./]\d{2}[^-]")
+    HEADER_REGEX = re.compile(
+        r"^(?P<datetime>\d{1,2}[./]\d{1,2}[./]\d{2}[^-]+?)\s+-\s+"
+        r"(?P<name>[^:]+):\s+(?P<message>.*)$",
+        flags=re.DOTALL,
+    )
+    MEDIA_PLACEHOLDER = "<Media omitted>"
+
+    # Byte-level equivalents used to split and parse memory-mapped exports without
+    # decoding them as a whole; only message payloads are decoded
+    MESSAGE_START_BYTES_REGEX = re.compile(rb"^\d{1,2}[./]\d{1,2}[./]\d{2}[^-]", flags=re.MULTILINE)
+    HEADER_BYTES_REGEX = re.compile(
+        rb"(?P<datetime>\d{1,2}[./]\d{1,2}[./]\d{2}[^-]+?)\s+-\s+"
+        rb"(?P<name>[^:]+):\s+(?P<message>.*)",
+        flags=re.DOTALL,
+    )
+
     REGEX_PATTERN_MEMBER_TIMESTAMP = "datetime"
     REGEX_PATTERN_MEMBER_MESSAGE = "message"
     REGEX_PATTERN_MEMBER_NAME = "name"
-    WHATSAPP_DATE_PATTERN = "%x, %H:%M"
+
+    # Messages read ahead to detect an export's date order (D/M/Y or M/D/Y)
+    DATE_ORDER_SAMPLE = 1000
 
     @staticmethod
     def get_absolute_path(path: str) -> str:
@@ -59,9 +93,8 @@ class WhatsAppStrategy(InputSourceStrategy):
 
     @staticmethod
     def parse_datetime(string_representation: str) -> datetime.datetime:
-        return datetime.datetime.strptime(
-            string_representation, WhatsAppStrategy.WHATSAPP_DATE_PATTERN
-        )
+        # A parser per call: its memo of the last format is not safe to share across threads
+        return TimestampParser().parse(string_representation)
 
     def extract_texts_from_string(self, text: str) -> str:
         """
@@ -72,20 +105,182 @@ class WhatsAppStrategy(InputSourceStrategy):
             return text
         return text.replace("<Media omitted>", "").replace("<Media omitted>", "")
 
+    @staticmethod
+    def open_file(path: str) -> IO[str]:
+        """
+        Open a chat backup for streaming, using the same path resolution as get_file_content.
+        """
+        script_dir = os.path.dirname(__file__)
+        return util_open_text_file(path, base_dir=script_dir)
+
+    @staticmethod
+    def open_binary_file(path: str) -> IO[bytes]:
+        script_dir = os.path.dirname(__file__)
+        return util_open_binary_file(path, base_dir=script_dir)
+
+    def is_compressed(self, input_source: str) -> bool:
+        with self.open_binary_file(input_source) as handle:
+            return util_compression_format(handle) is not None
+
     def extract_texts(self, input_source: str) -> List[str]:
         """
         Extract message texts from a WhatsApp exported chat backup file.
         Returns a list of message strings.
         """
-        backup_text = self.get_file_content(input_source)
-        return self._parse_messages_from_string(backup_text)
+        return list(self.iter_texts(input_source))
+
+    def iter_texts(self, input_source: str) -> Iterator[str]:
+        """
+        Stream message texts from a WhatsApp exported chat backup file, which may be
+        compressed or the zip produced by "Export chat" (decompressed while reading).
+        Only the message currently being assembled is held in memory.
+        """
+        with self.open_file(input_source) as handle:
+            yield from self.iter_messages(handle)
+
+    def iter_messages(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Parse messages line by line from a file handle (or any iterable of lines).
+        Continuation lines are appended to the message they follow.
+        """
+        for _, _, text in self._iter_records((0, line) for line in lines):
+            yield text
+
+    def iter_structured_messages(self, input_source: str) -> Iterator[WhatsAppMessage]:
+        """
+        Stream messages with their metadata (timestamp, username, text).
+        The date order of the export is detected from its first DATE_ORDER_SAMPLE messages.
+        """
+        with self.open_file(input_source) as handle:
+            records = self._iter_records((0, line) for line in handle)
+            head = list(islice(records, self.DATE_ORDER_SAMPLE))
+            parser = TimestampParser.for_values(
+                header.group(self.REGEX_PATTERN_MEMBER_TIMESTAMP) for _, header, _ in head
+            )
+            for _, header, text in chain(head, records):
+                yield self._to_message(header, text, parser)
+
+    def _to_message(
+        self, header: re.Match, text: str, parser: TimestampParser
+    ) -> WhatsAppMessage:
+        try:
+            timestamp: Optional[datetime.datetime] = parser.parse(
+                header.group(self.REGEX_PATTERN_MEMBER_TIMESTAMP)
+            )
+        except ValueError:
+            timestamp = None
+        return WhatsAppMessage(timestamp, header.group(self.REGEX_PATTERN_MEMBER_NAME), text)
+
+    def iter_texts_with_offsets(
+        self, input_source: str, start_offset: int = 0
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Stream (byte offset of the message's header line, message text) pairs,
+        starting at start_offset, which must be the beginning of a line.
+        Used for checkpointed, incremental re-analysis of growing exports.
+        """
+        with self.open_binary_file(input_source) as handle:
+            handle.seek(start_offset)
+            for offset, _, text in self._iter_records(self._decoded_lines(handle, start_offset)):
+                yield offset, text
+
+    @staticmethod
+    def _decoded_lines(handle: IO[bytes], offset: int) -> Iterator[Tuple[int, str]]:
+        # Mirrors text-mode reading (utf8, errors ignored, "\r\n" -> "\n") while tracking
+        # the byte offset at which each line starts
+        for raw in handle:
+            line = raw.decode("utf8", errors="ignore")
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            yield offset, line
+            offset += len(raw)
+
+    def _iter_records(
+        self, lines: Iterable[Tuple[int, str]]
+    ) -> Iterator[Tuple[int, re.Match, str]]:
+        # Core line-oriented parser: yields (offset, header match, text) per message
+        current: List[str] = []
+        header: Optional[re.Match] = None
+        header_offset = 0
+        for offset, line in lines:
+            if self.MESSAGE_START_REGEX.match(line):
+                if header is not None:
+                    yield header_offset, header, self._finish_message(current)
+                    current = []
+                header = self.HEADER_REGEX.match(line)
+                header_offset = offset
+                if header is not None:
+                    current.append(header.group(self.REGEX_PATTERN_MEMBER_MESSAGE))
+            elif header is not None:
+                current.append(line)
+        if header is not None:
+            yield header_offset, header, self._finish_message(current)
+
+    def split_byte_ranges(self, input_source: str, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the export into up to `parts` contiguous [start, end) byte ranges that
+        each begin at a message-start line, so they can be parsed independently.
+        """
+        with self.open_binary_file(input_source) as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size == 0:
+                return []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                starts = [0]
+                for i in range(1, max(1, parts)):
+                    target = size * i // parts
+                    if target <= starts[-1]:
+                        continue
+                    newline = mm.find(b"\n", target - 1)
+                    if newline == -1:
+                        break
+                    match = self.MESSAGE_START_BYTES_REGEX.search(mm, newline + 1)
+                    if match is None:
+                        break
+                    if match.start() > starts[-1]:
+                        starts.append(match.start())
+        return list(zip(starts, starts[1:] + [size]))
+
+    def iter_texts_in_range(self, input_source: str, start: int, end: int) -> Iterator[str]:
+        """
+        Stream the message texts of one byte range from split_byte_ranges via mmap.
+        Concatenating all ranges yields exactly the messages of iter_texts.
+        """
+        with self.open_binary_file(input_source) as handle:
+            if start >= end:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from self._iter_mapped_texts(mm, start, end)
+
+    def _iter_mapped_texts(self, mm: mmap.mmap, start: int, end: int) -> Iterator[str]:
+        is_start = self.MESSAGE_START_BYTES_REGEX.match
+        header_match = self.HEADER_BYTES_REGEX.match
+        parts: List[bytes] = []
+        in_message = False
+        pos = start
+        while pos < end:
+            newline = mm.find(b"\n", pos, end)
+            line_end = end if newline == -1 else newline + 1
+            if is_start(mm, pos, line_end):
+                if in_message:
+                    yield self._finish_payload(parts)
+                    parts = []
+                header = header_match(mm, pos, line_end)
+                in_message = header is not None
+                if header is not None:
+                    parts.append(mm[header.start(self.REGEX_PATTERN_MEMBER_MESSAGE):line_end])
+            elif in_message:
+                parts.append(mm[pos:line_end])
+            pos = line_end
+        if in_message:
+            yield self._finish_payload(parts)
+
+    def _finish_payload(self, parts: List[bytes]) -> str:
+        text = b"".join(parts).decode("utf8", errors="ignore").replace("\r\n", "\n")
+        return text.replace(self.MEDIA_PLACEHOLDER, "")
+
+    def _finish_message(self, parts: List[str]) -> str:
+        return "".join(parts).replace(self.MEDIA_PLACEHOLDER, "")
 
     def _parse_messages_from_string(self, input_string: str) -> List[str]:
-        # Compile and parse messages using embedded regex
-        pattern = re.compile(self.REGEX_PATTERN, flags=re.MULTILINE | re.VERBOSE)
-        texts: List[str] = []
-        for match in pattern.finditer(input_string):
-            message = match.groupdict().get(self.REGEX_PATTERN_MEMBER_MESSAGE)
-            if message is not None:
-                texts.append(message.replace("<Media omitted>", ""))
-        return texts
+        return list(self.iter_messages(io.StringIO(input_string)))
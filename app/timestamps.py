@@ -0,0 +1,116 @@
+"""
+Fast parsing of chat export timestamps such as "9/24/16, 01:02", "24.09.2016, 01:02"
+or "9/24/16, 1:02 PM", independent of the process locale.
+
+The field order of the date (month/day/year, day/month/year or year first) cannot be
+told from a single ambiguous date, so it is detected once per export with
+detect_date_order; 12/24 hour clocks and 2/4 digit years are recognized per value.
+TimestampParser matches the fields with precompiled patterns and remembers the last
+date prefix, so consecutive messages of the same day only parse the time.
+"""
+import datetime
+import re
+from typing import Iterable, Optional, Tuple
+
+DATE_ORDERS = ("mdy", "dmy", "ymd")
+
+# Order of ambiguous dates without evidence either way (the C locale's %x)
+DEFAULT_DATE_ORDER = "mdy"
+
+# Date prefix including the separator to the time, so it always ends in a non-digit
+DATE_REGEX = re.compile(r"\s*(\d{1,4})([./-])(\d{1,2})\2(\d{2,4})(?:,\s*|\s+)")
+TIME_REGEX = re.compile(
+    r"(\d{1,2})[:.](\d{2})(?:[:.](\d{2}))?(?:\s*([AaPp])\.?\s*[Mm]\.?)?\s*\Z"
+)
+
+
+def _expand_year(year: str) -> int:
+    value = int(year)
+    if len(year) > 2:
+        return value
+    # Same pivot as strptime's %y
+    return value + (2000 if value < 69 else 1900)
+
+
+def detect_date_order(values: Iterable[str]) -> Optional[str]:
+    """
+    Detect the date field order from sample timestamps of one export. A first or second
+    field above 12 decides it; otherwise the field that changes more often between
+    consecutive dates is taken to be the day. None if the samples don't tell.
+    """
+    first_changes = second_changes = 0
+    previous: Optional[Tuple[int, int]] = None
+    for value in values:
+        match = DATE_REGEX.match(value)
+        if match is None:
+            continue
+        if len(match.group(1)) > 2:
+            return "ymd"
+        first, second = int(match.group(1)), int(match.group(3))
+        if first > 12:
+            return "dmy"
+        if second > 12:
+            return "mdy"
+        if previous is not None:
+            first_changes += first != previous[0]
+            second_changes += second != previous[1]
+        previous = (first, second)
+    if first_changes == second_changes:
+        return None
+    return "dmy" if first_changes > second_changes else "mdy"
+
+
+class TimestampParser:
+    """
+    Parses timestamps of one export into naive datetimes, raising ValueError for
+    anything else. With order None, each date's order is inferred from the date alone
+    (falling back to DEFAULT_DATE_ORDER). Not thread-safe: use one parser per stream.
+    """
+
+    def __init__(self, order: Optional[str] = None):
+        if order is not None and order not in DATE_ORDERS:
+            raise ValueError(f"Unknown date order '{order}', expected one of {DATE_ORDERS}")
+        self.order = order
+        self._last_prefix = None
+        self._last_date: Optional[datetime.date] = None
+
+    @classmethod
+    def for_values(cls, values: Iterable[str]) -> "TimestampParser":
+        return cls(detect_date_order(values))
+
+    def parse(self, value: str) -> datetime.datetime:
+        prefix = self._last_prefix
+        if prefix is not None and value.startswith(prefix):
+            date = self._last_date
+            time_match = TIME_REGEX.match(value, len(prefix))
+        else:
+            match = DATE_REGEX.match(value)
+            if match is None:
+                raise ValueError(f"Unrecognized timestamp '{value}'")
+            date = self._date(match.group(1), match.group(3), match.group(4))
+            self._last_prefix = match.group(0)
+            self._last_date = date
+            time_match = TIME_REGEX.match(value, match.end())
+        if time_match is None:
+            raise ValueError(f"Unrecognized timestamp '{value}'")
+        hour_text, minute, second, meridiem = time_match.groups()
+        hour = int(hour_text)
+        if meridiem is not None:
+            if not 1 <= hour <= 12:
+                raise ValueError(f"Invalid 12-hour time in '{value}'")
+            hour = hour % 12 + (12 if meridiem in "Pp" else 0)
+        return datetime.datetime(
+            date.year, date.month, date.day, hour, int(minute), int(second or 0)
+        )
+
+    def _date(self, first: str, second: str, third: str) -> datetime.date:
+        if len(first) > 2:
+            return datetime.date(int(first), int(second), int(third))
+        order = self.order
+        if order is None:
+            order = "dmy" if int(first) > 12 else DEFAULT_DATE_ORDER
+        if order == "dmy":
+            return datetime.date(_expand_year(third), int(second), int(first))
+        if order == "mdy":
+            return datetime.date(_expand_year(third), int(first), int(second))
+        raise ValueError(f"Date '{first}/{second}/{third}' does not start with a year")
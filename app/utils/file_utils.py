@@ -1,5 +1,24 @@
+import bz2
+import gzip
+import io
+import lzma
 import os
-from typing import Optional
+import zipfile
+from typing import IO, Callable, List, Optional
+
+# Leading bytes of the compressed formats open_text_file decompresses on the fly
+COMPRESSION_MAGIC = (
+    (b"PK\x03\x04", "zip"),
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zst"),
+)
+
+# Names of the chat file in zipped exports (WhatsApp "Export chat", Telegram Desktop);
+# archives without one must hold exactly one file ending in ZIP_TEXT_SUFFIXES
+ZIP_CHAT_NAMES = ("_chat.txt", "result.json")
+ZIP_TEXT_SUFFIXES = (".txt", ".json", ".csv", ".mbox")
 
 
 def get_absolute_path(base_dir: str, path: str) -> str:
@@ -10,15 +29,13 @@ def get_absolute_path(base_dir: str, path: str) -> str:
     return os.path.join(base_dir, path)
 
 
-def get_file_content(
+def _candidate_paths(
     path: str,
-    *,
-    base_dir: Optional[str] = None,
-    project_root: Optional[str] = None,
-    encoding: str = "utf8",
-) -> str:
+    base_dir: Optional[str],
+    project_root: Optional[str],
+) -> List[str]:
     """
-    Read text content from a file. Tries multiple locations for relative paths:
+    Return the locations tried for a (possibly relative) path, in order:
     - As provided (current working directory)
     - Relative to base_dir (typically the caller's module directory)
     - Under project_root (defaults to two levels above base_dir if not provided)
@@ -33,16 +50,139 @@ def get_file_content(
                 project_root = os.path.abspath(os.path.join(base_dir, "..", ".."))
         if project_root:
             candidates.append(os.path.join(project_root, path))
+    return candidates
+
+
+def open_text_file(
+    path: str,
+    *,
+    base_dir: Optional[str] = None,
+    project_root: Optional[str] = None,
+    encoding: str = "utf8",
+    newline: Optional[str] = None,
+) -> IO[str]:
+    """
+    Open a text file for line-wise reading, resolving relative paths like get_file_content.
+    zip/gzip/bz2/xz/zst files (see COMPRESSION_MAGIC) are decompressed while reading;
+    of a zip only the chat text entry is read (see open_decompressed).
+    newline is passed on to io.TextIOWrapper (e.g. "" for the csv module).
+    The caller is responsible for closing the returned handle.
+    """
+    return _open_first(
+        _candidate_paths(path, base_dir, project_root),
+        lambda p: io.TextIOWrapper(
+            open_decompressed(p), encoding=encoding, errors="ignore", newline=newline
+        ),
+        path,
+    )
+
+
+def open_binary_file(
+    path: str,
+    *,
+    base_dir: Optional[str] = None,
+    project_root: Optional[str] = None,
+    decompress: bool = False,
+) -> IO[bytes]:
+    """
+    Open a file in binary mode (e.g. to track byte offsets), resolving relative
+    paths like get_file_content. With decompress, compressed files are decompressed
+    while reading (see open_decompressed). The caller is responsible for closing the handle.
+    """
+    return _open_first(
+        _candidate_paths(path, base_dir, project_root),
+        open_decompressed if decompress else lambda p: open(p, "rb"),
+        path,
+    )
+
 
+def compression_format(handle: IO[bytes]) -> Optional[str]:
+    """
+    Name of the compressed format of a binary handle positioned at its start, or None
+    for plain files. The handle is left at its start.
+    """
+    head = handle.read(6)
+    handle.seek(0)
+    for magic, name in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_decompressed(path: str) -> IO[bytes]:
+    """
+    Open a file for binary reading, decompressing it on the fly if it is compressed.
+    Plain files are returned as is. Of a zip archive only the chat entry (see
+    ZIP_CHAT_NAMES) is streamed; other entries such as media are never read.
+    """
+    handle = open(path, "rb")
+    try:
+        kind = compression_format(handle)
+        if kind is None:
+            return handle
+        if kind in ("zip", "gzip", "bz2", "xz"):
+            # Opened by name, since these don't close a file object handed to them
+            handle.close()
+        if kind == "zip":
+            return _open_zip_chat(path)
+        if kind in ("gzip", "bz2", "xz"):
+            return {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}[kind](path, "rb")
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(f"Reading zstd compressed {path} needs the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(handle, closefd=True)
+    except BaseException:
+        handle.close()
+        raise
+
+
+def _open_zip_chat(path: str) -> IO[bytes]:
+    archive = zipfile.ZipFile(path)
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    chats = [n for n in names if os.path.basename(n) in ZIP_CHAT_NAMES]
+    if not chats:
+        chats = [n for n in names if n.lower().endswith(ZIP_TEXT_SUFFIXES)]
+    if len(chats) != 1:
+        archive.close()
+        raise ValueError(
+            f"Expected one chat file ({', '.join(ZIP_CHAT_NAMES)} or a single "
+            f"{'/'.join(ZIP_TEXT_SUFFIXES)} file) in {path}, found {len(chats)}"
+        )
+    entry = archive.open(chats[0])
+    # The entry keeps the archive's file open until it is closed itself
+    archive.close()
+    return entry
+
+
+def _open_first(candidates: List[str], opener: Callable[[str], IO], path: str) -> IO:
     last_error: Optional[Exception] = None
     for p in candidates:
         try:
-            with open(p, "r", encoding=encoding, errors="ignore") as file:
-                return file.read()
+            return opener(p)
         except FileNotFoundError as e:
             last_error = e
             continue
 
     if last_error:
         raise last_error
-    raise FileNotFoundError(f"File not found: {path}")
\ No newline at end of file
+    raise FileNotFoundError(f"File not found: {path}")
+
+
+def get_file_content(
+    path: str,
+    *,
+    base_dir: Optional[str] = None,
+    project_root: Optional[str] = None,
+    encoding: str = "utf8",
+) -> str:
+    """
+    Read text content from a file. Tries multiple locations for relative paths:
+    - As provided (current working directory)
+    - Relative to base_dir (typically the caller's module directory)
+    - Under project_root (defaults to two levels above base_dir if not provided)
+    """
+    with open_text_file(
+        path, base_dir=base_dir, project_root=project_root, encoding=encoding
+    ) as file:
+        return file.read()
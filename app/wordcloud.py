@@ -1,12 +1,40 @@
-from wordcloud import WordCloud
+from wordcloud import WordCloud, __version__ as wordcloud_version
+import io
 import os
+import random
+from functools import lru_cache
 from typing import Dict, Optional, Any, Callable
+from app.cache import AnalysisCache
+from app.counting import top_counts
+from app.layout import DEFAULT_LAYOUT_QUALITY, DEFAULT_RENDER_SEED, layout_wordcloud
+from app.metrics import Metrics
 try:
-    import numpy as np
-    from PIL import Image
+    from app.masks import load_prepared_mask
 except ImportError:
-    np = None
-    Image = None
+    # numpy/PIL missing
+    load_prepared_mask = None
+
+
+@lru_cache(maxsize=16)
+def load_mask(
+    shape_path: str, width: Optional[int] = None, cache: Optional[AnalysisCache] = None
+):
+    """
+    Load a shape image (PNG, JPEG, SVG, ...) as mask array scaled to width, or None if
+    unavailable. Cached per process, and as prepared .npy in cache if given (see app.masks).
+    """
+    if load_prepared_mask is None:
+        print(
+            "Shape path provided but numpy/PIL not available. Proceeding without mask."
+        )
+    elif not os.path.exists(shape_path):
+        print(f"Shape file not found: {shape_path}. Proceeding without mask.")
+    else:
+        try:
+            return load_prepared_mask(shape_path, width, cache=cache)
+        except Exception as e:
+            print(f"Failed to load shape mask from {shape_path}: {e}")
+    return None
 
 
 def generate_wordcloud(
@@ -17,28 +45,138 @@ def generate_wordcloud(
     shape_path: Optional[str] = None,
     font_path: Optional[str] = None,
     palette: Optional[str] = None,
+    metrics: Optional[Metrics] = None,
+    layout: str = "wordcloud",
+    layout_quality: str = DEFAULT_LAYOUT_QUALITY,
+    shape_width: Optional[int] = None,
+    seed: int = DEFAULT_RENDER_SEED,
+    cache: Optional[AnalysisCache] = None,
 ):
-    # Limit the number of words to max_word_number
-    limited_word_count = dict(
-        sorted(word_count.items(), key=lambda item: item[1], reverse=True)[
-            : max_word_number
-        ]
-    )
+    # Limit the number of words to max_word_number (heap selection, same order as a full sort)
+    limited_word_count = top_counts(word_count, max_word_number)
 
-    mask = None
+    options = {
+        "max_word_number": max_word_number,
+        "background_color": background_color,
+        "shape_path": shape_path,
+        "shape_width": shape_width,
+        "font_path": font_path,
+        "palette": palette,
+        "layout": layout,
+        "layout_quality": layout_quality,
+        "seed": seed,
+    }
+    png = render_png(limited_word_count, options, cache=cache, metrics=metrics)
+
+    # Ensure output directory exists
+    out_dir = os.path.dirname(output_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(output_path, "wb") as f:
+        f.write(png)
+    (metrics or Metrics(enabled=False)).set("render_bytes", len(png))
+
+
+def render_png(
+    counts: Dict[str, int],
+    options: Dict[str, Any],
+    wc: Optional[WordCloud] = None,
+    cache: Optional[AnalysisCache] = None,
+    metrics: Optional[Metrics] = None,
+) -> bytes:
+    """
+    Render counts (already limited to the words shown) with the render options of
+    generate_wordcloud into PNG bytes; wc may be a matching build_wordcloud instance.
+    With a cache, a stored PNG of the same counts and options is returned as is, and
+    a stored layout of the same counts and placement options is reused (recolored if
+    the palette differs), skipping word placement.
+    """
+    metrics = metrics or Metrics(enabled=False)
+    render_key = layout_key = None
+    if cache is not None:
+        with metrics.stage("render_cache_lookup"):
+            render_key, layout_key = cache.render_keys(
+                counts, {**options, "wordcloud": wordcloud_version}
+            )
+            png = cache.get_render(render_key)
+        if png is not None:
+            metrics.set("render_source", "cache")
+            return png
+
+    shape_path = options.get("shape_path")
+    shape_width = options.get("shape_width")
+    seed = options.get("seed", DEFAULT_RENDER_SEED)
     if shape_path:
-        if np is None or Image is None:
-            print(
-                "Shape path provided but numpy/PIL not available. Proceeding without mask."
+        # Warms the per-process mask cache that build_wordcloud reads from
+        with metrics.stage("mask_loading"):
+            load_mask(shape_path, shape_width, cache)
+
+    if wc is None:
+        with metrics.stage("render_setup"):
+            wc = build_wordcloud(
+                options["background_color"], shape_path, options.get("font_path"),
+                options.get("palette"), shape_width, seed, cache,
             )
-        elif not os.path.exists(shape_path):
-            print(f"Shape file not found: {shape_path}. Proceeding without mask.")
-        else:
-            try:
-                # Convert image to grayscale array for mask
-                mask = np.array(Image.open(shape_path).convert("L"))
-            except Exception as e:
-                print(f"Failed to load shape mask from {shape_path}: {e}")
+
+    stored = cache.get_layout(layout_key) if cache is not None else None
+    if stored is not None:
+        wc.words_ = dict(stored["words"])
+        wc.layout_ = [
+            ((word, freq), size, tuple(position), orientation, color)
+            for (word, freq), size, position, orientation, color in stored["layout"]
+        ]
+        if stored["palette"] != options.get("palette"):
+            with metrics.stage("recolor"):
+                wc.recolor(random_state=seed)
+        metrics.set("render_source", "layout_cache")
+    else:
+        with metrics.stage("layout"):
+            layout_wordcloud(
+                wc, counts, options.get("layout", "wordcloud"),
+                options.get("layout_quality", DEFAULT_LAYOUT_QUALITY),
+            )
+        metrics.set("render_source", "layout")
+        if cache is not None:
+            cache.put_layout(layout_key, {
+                "palette": options.get("palette"),
+                "words": [(word, float(freq)) for word, freq in wc.words_.items()],
+                # Plain ints: the library's positions are numpy integers
+                "layout": [
+                    ((word, float(freq)), int(size), (int(position[0]), int(position[1])),
+                     None if orientation is None else int(orientation), color)
+                    for (word, freq), size, position, orientation, color in wc.layout_
+                ],
+            })
+
+    with metrics.stage("write_png"):
+        buffer = io.BytesIO()
+        wc.to_image().save(buffer, format="PNG", optimize=True)
+        png = buffer.getvalue()
+    metrics.set("render_words", len(wc.layout_))
+    metrics.set("render_size", f"{wc.width}x{wc.height}")
+    if cache is not None:
+        cache.put_render(render_key, png)
+    return png
+
+
+def build_wordcloud(
+    background_color: str,
+    shape_path: Optional[str] = None,
+    font_path: Optional[str] = None,
+    palette: Optional[str] = None,
+    shape_width: Optional[int] = None,
+    seed: int = DEFAULT_RENDER_SEED,
+    cache: Optional[AnalysisCache] = None,
+) -> WordCloud:
+    """
+    Create a configured (not yet generated) WordCloud for the given render options.
+    The instance can be reused for several generate_from_frequencies calls.
+    With a shape, the canvas is the shape scaled to shape_width (default: its own size).
+    Placement is drawn from a random.Random seeded with seed per generation; colors
+    depend only on the word and seed (see _word_seeded). With a cache, the prepared
+    mask is stored in it (see load_mask).
+    """
+    mask = load_mask(shape_path, shape_width, cache) if shape_path else None
 
     # Determine color function based on palette input
     color_func: Optional[Callable[..., str]] = None
@@ -74,14 +212,13 @@ def generate_wordcloud(
 
         colors = _resolve_colors(palette)
         if colors:
-            import random as _random
-
-            def _color_func(*args, **kwargs):
-                return _random.choice(colors)
+            def _color_func(*args, random_state, **kwargs):
+                # The WordCloud's seeded generator, so colors are reproducible
+                return random_state.choice(colors)
             color_func = _color_func
 
     # Build kwargs to avoid passing None-typed values when unset (type-checker friendly)
-    kwargs: Dict[str, Any] = {"background_color": background_color}
+    kwargs: Dict[str, Any] = {"background_color": background_color, "random_state": seed}
     if font_path is not None:
         kwargs["font_path"] = font_path
     if mask is not None:
@@ -89,11 +226,13 @@ def generate_wordcloud(
     if color_func is not None:
         kwargs["color_func"] = color_func
     wc = WordCloud(**kwargs)
+    wc.color_func = _word_seeded(wc.color_func, seed)
+    return wc
 
-    wordcloud = wc.generate_from_frequencies(limited_word_count)
-
-    # Ensure output directory exists
-    out_dir = os.path.dirname(output_path) or "."
-    os.makedirs(out_dir, exist_ok=True)
 
-    wordcloud.to_file(output_path)
+def _word_seeded(color_func: Callable[..., str], seed: int) -> Callable[..., str]:
+    # Hands color_func a generator seeded per word instead of the placement generator,
+    # so a recolored cached layout gets exactly the colors of a fresh render
+    def seeded(word, *args, random_state=None, **kwargs):
+        return color_func(word, *args, random_state=random.Random(f"{seed}:{word}"), **kwargs)
+    return seeded
@@ -0,0 +1,66 @@
+"""
+Benchmark for regex blocklist filtering as the pattern count grows: the previous
+per-occurrence any() scan over all patterns versus one combined alternation
+applied once per distinct token.
+
+Run from the repository root:
+    python -m benchmarks.bench_blocklist --messages 100000 --patterns 10 100 1000 2000
+"""
+import argparse
+import re
+import time
+from typing import Dict, List
+
+from app.analyzer import Analyzer
+from app.blocklist import combine_regex_patterns
+from benchmarks.bench_analyzer import synthetic_corpus
+
+
+def synthetic_patterns(count: int) -> List[re.Pattern]:
+    # Mix of anchored literals and character classes, none of which hit the corpus
+    return [
+        re.compile(rf"^bad{i}word$" if i % 2 else rf"spam{i}\d+")
+        for i in range(count)
+    ]
+
+
+def per_occurrence_counts(
+    analyzer: Analyzer, texts: List[str], patterns: List[re.Pattern]
+) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for msg in texts:
+        for w in analyzer.candidate_tokens(msg):
+            if any(p.search(w) for p in patterns):
+                continue
+            counts[w] = counts.get(w, 0) + 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark regex blocklist filtering.")
+    parser.add_argument("--messages", type=int, default=100_000,
+                        help="Number of synthetic messages to count.")
+    parser.add_argument("--patterns", type=int, nargs="+", default=[10, 100, 1000, 2000],
+                        help="Pattern counts to benchmark.")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.messages)
+    print(f"{'patterns':>8} {'before':>10} {'after':>10} {'speedup':>8}")
+    for n in args.patterns:
+        patterns = synthetic_patterns(n)
+
+        start = time.perf_counter()
+        before = per_occurrence_counts(Analyzer(3), corpus, patterns)
+        before_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after = Analyzer(3, blocklist_regex=combine_regex_patterns(patterns)).count(corpus)
+        after_s = time.perf_counter() - start
+
+        if before != after:
+            raise SystemExit(f"Combined blocklist result differs at {n} patterns")
+        print(f"{n:>8} {before_s:>9.2f}s {after_s:>9.2f}s {before_s / after_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of word placement: the wordcloud library's layout versus the vectorized
+engine in app.fast_layout, on square canvases of growing size shaped by a mask.
+
+Run from the repository root (needs wordcloud, numpy and PIL):
+    python -m benchmarks.bench_layout --sizes 1000 4000 8000 --words 200
+
+The library layout takes minutes at 8k; leave it out with --engines fast.
+"""
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+from wordcloud import WordCloud
+
+from app.analyzer import word_counts_from_texts
+from app.counting import top_counts
+from app.layout import DEFAULT_LAYOUT_QUALITY, LAYOUT_QUALITY, layout_wordcloud
+from benchmarks.bench_analyzer import synthetic_corpus
+
+DEFAULT_MASK = "input/heart.png"
+
+
+def scaled_mask(path: str, size: int) -> np.ndarray:
+    return np.array(Image.open(path).convert("L").resize((size, size), Image.NEAREST))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark word cloud layout engines.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 8000],
+                        help="Canvas edge lengths in pixels.")
+    parser.add_argument("--words", type=int, default=200,
+                        help="Number of words to place.")
+    parser.add_argument("--mask", type=str, default=DEFAULT_MASK,
+                        help="Shape image scaled to each canvas size.")
+    parser.add_argument("--engines", nargs="+", default=["wordcloud", "fast"],
+                        choices=("wordcloud", "fast"))
+    parser.add_argument("--qualities", nargs="+", default=list(LAYOUT_QUALITY),
+                        choices=tuple(LAYOUT_QUALITY),
+                        help="Presets of the fast engine to run.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts = top_counts(word_counts_from_texts(synthetic_corpus(20_000), 3, None, None), args.words)
+    runs = [("wordcloud", None)] if "wordcloud" in args.engines else []
+    if "fast" in args.engines:
+        runs += [("fast", quality) for quality in args.qualities]
+
+    print(f"{'size':>6} {'engine':<16} {'time':>9} {'placed':>7}")
+    for size in args.sizes:
+        mask = scaled_mask(args.mask, size)
+        for engine, quality in runs:
+            wc = WordCloud(mask=mask, random_state=args.seed, max_words=args.words)
+            start = time.perf_counter()
+            layout_wordcloud(wc, counts, engine, quality or DEFAULT_LAYOUT_QUALITY)
+            elapsed = time.perf_counter() - start
+            name = engine if quality is None else f"{engine}/{quality}"
+            print(f"{size:>6} {name:<16} {elapsed:>8.2f}s {len(wc.layout_):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Stage-level benchmark of the whole pipeline with a regression gate.
+
+Each stage runs in a fresh process on a deterministic synthetic export, so its
+peak RSS is measured in isolation:
+- extract_texts:          streaming the export through WhatsAppStrategy.iter_texts
+- word_counts_from_texts: counting pre-parsed messages
+- blocklist_loading:      loading word and regex blocklist files
+- generate_wordcloud:     rendering the counts (skipped if wordcloud is not installed)
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --messages 200000 --save_baseline
+    python -m benchmarks.bench_pipeline --messages 200000 --check
+
+--check exits with status 1 if a stage's throughput dropped, or its peak RSS grew,
+by more than --threshold compared to the baseline JSON.
+"""
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from app.metrics import peak_rss_mb
+from benchmarks.synthetic import ExportSpec, vocabulary, write_synthetic_export
+
+STAGES = ("extract_texts", "word_counts_from_texts", "blocklist_loading", "generate_wordcloud")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _stage_extract_texts(workdir: str, spec: ExportSpec) -> Dict[str, Any]:
+    from app.strategies.whatsapp_strategy import WhatsAppStrategy
+
+    path = os.path.join(workdir, "chat.txt")
+    start = time.perf_counter()
+    messages = sum(1 for _ in WhatsAppStrategy().iter_texts(path))
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "throughput": messages / seconds, "unit": "messages/s"}
+
+
+def _stage_word_counts(workdir: str, spec: ExportSpec) -> Dict[str, Any]:
+    from app.analyzer import word_counts_from_texts
+    from app.strategies.whatsapp_strategy import WhatsAppStrategy
+
+    texts = WhatsAppStrategy().extract_texts(os.path.join(workdir, "chat.txt"))
+    start = time.perf_counter()
+    word_counts_from_texts(texts, 3, set(), [])
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "throughput": len(texts) / seconds, "unit": "messages/s"}
+
+
+def _stage_blocklist_loading(workdir: str, spec: ExportSpec) -> Dict[str, Any]:
+    from app.blocklist import load_blocklist_regex, load_blocklist_words
+
+    entries = 0
+    for name in ("words.txt", "regex.txt"):
+        with open(os.path.join(workdir, name), "r", encoding="utf8") as f:
+            entries += sum(1 for line in f if line.strip())
+    start = time.perf_counter()
+    load_blocklist_words(os.path.join(workdir, "words.txt"))
+    load_blocklist_regex(os.path.join(workdir, "regex.txt"))
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "throughput": entries / seconds, "unit": "entries/s"}
+
+
+def _stage_generate_wordcloud(workdir: str, spec: ExportSpec) -> Dict[str, Any]:
+    from app.analyzer import word_counts_from_texts
+    from app.strategies.whatsapp_strategy import WhatsAppStrategy
+    from app.wordcloud import generate_wordcloud
+
+    counts = word_counts_from_texts(
+        WhatsAppStrategy().iter_texts(os.path.join(workdir, "chat.txt")), 3, set(), []
+    )
+    start = time.perf_counter()
+    generate_wordcloud(counts, os.path.join(workdir, "cloud.png"), 124, "white")
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "throughput": 1 / seconds, "unit": "renders/s"}
+
+
+_STAGE_FUNCTIONS = {
+    "extract_texts": _stage_extract_texts,
+    "word_counts_from_texts": _stage_word_counts,
+    "blocklist_loading": _stage_blocklist_loading,
+    "generate_wordcloud": _stage_generate_wordcloud,
+}
+
+
+def _run_stage(stage: str, workdir: str, spec: ExportSpec) -> Dict[str, Any]:
+    result = _STAGE_FUNCTIONS[stage](workdir, spec)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def prepare_inputs(workdir: str, spec: ExportSpec, blocklist_size: int) -> None:
+    write_synthetic_export(os.path.join(workdir, "chat.txt"), spec)
+    words = vocabulary(spec.vocabulary, spec.seed)
+    with open(os.path.join(workdir, "words.txt"), "w", encoding="utf8") as f:
+        f.write("\n".join(words[:blocklist_size]))
+    with open(os.path.join(workdir, "regex.txt"), "w", encoding="utf8") as f:
+        f.write("\n".join(rf"^{w}\d*$" for w in words[-blocklist_size:]))
+
+
+def run_benchmarks(spec: ExportSpec, blocklist_size: int, stages: List[str]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    # Fresh interpreter per stage so peak RSS is not inherited from earlier stages
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_inputs(workdir, spec, blocklist_size)
+        for stage in stages:
+            if stage == "generate_wordcloud" and importlib.util.find_spec("wordcloud") is None:
+                print(f"{stage:<24} skipped (wordcloud not installed)")
+                continue
+            with context.Pool(1) as pool:
+                results[stage] = pool.apply(_run_stage, (stage, workdir, spec))
+            r = results[stage]
+            rss = "n/a" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.1f} MB"
+            print(f"{stage:<24} {r['seconds']:8.3f}s {r['throughput']:>14,.1f} {r['unit']:<12} "
+                  f"peak RSS {rss}")
+    return results
+
+
+def check_regressions(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Return a message per stage whose throughput fell, or whose peak RSS rose, by more
+    than threshold (a fraction) relative to the baseline.
+    """
+    failures = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = results.get(stage)
+        if current is None:
+            continue
+        if current["throughput"] < base["throughput"] * (1 - threshold):
+            failures.append(
+                f"{stage}: throughput {current['throughput']:,.1f} {current['unit']} "
+                f"< baseline {base['throughput']:,.1f} - {threshold:.0%}"
+            )
+        if current.get("peak_rss_mb") and base.get("peak_rss_mb"):
+            if current["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+                failures.append(
+                    f"{stage}: peak RSS {current['peak_rss_mb']:.1f} MB "
+                    f"> baseline {base['peak_rss_mb']:.1f} MB + {threshold:.0%}"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage.")
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--min_words", type=int, default=3)
+    parser.add_argument("--max_words", type=int, default=15)
+    parser.add_argument("--emoji_density", type=float, default=0.2)
+    parser.add_argument("--url_density", type=float, default=0.05)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--blocklist_size", type=int, default=500,
+                        help="Entries in each of the generated word and regex blocklists.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline JSON file to compare against or write.")
+    parser.add_argument("--save_baseline", action="store_true",
+                        help="Write the results as the new baseline.")
+    parser.add_argument("--check", action="store_true",
+                        help="Fail if a stage regressed beyond --threshold.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative regression (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    if args.check and not args.save_baseline and not os.path.exists(args.baseline):
+        raise SystemExit(
+            f"No baseline at {args.baseline}; run with --save_baseline (make bench-baseline) first"
+        )
+
+    spec = ExportSpec(
+        messages=args.messages,
+        min_words=args.min_words,
+        max_words=args.max_words,
+        emoji_density=args.emoji_density,
+        url_density=args.url_density,
+        vocabulary=args.vocabulary,
+        seed=args.seed,
+    )
+    results = run_benchmarks(spec, args.blocklist_size, args.stages)
+    document = {"spec": spec._asdict(), "blocklist_size": args.blocklist_size, "stages": results}
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to: {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, "r", encoding="utf8") as f:
+            baseline = json.load(f)
+        if baseline.get("spec") != document["spec"]:
+            raise SystemExit("Baseline was recorded with different benchmark parameters")
+        failures = check_regressions(results, baseline, args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            raise SystemExit(1)
+        print("No regressions beyond threshold.")
+
+
+if __name__ == "__main__":
+    main()
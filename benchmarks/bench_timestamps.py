@@ -0,0 +1,56 @@
+"""
+Benchmark WhatsApp timestamp parsing: datetime.strptime with the locale's "%x, %H:%M"
+(the previous parse_datetime) versus TimestampParser, which detects the date order
+once and memoizes the date prefix shared by consecutive messages.
+
+Run from the repository root:
+    python -m benchmarks.bench_timestamps --messages 1000000
+"""
+import argparse
+import datetime
+import random
+import time
+from typing import List
+
+from app.strategies.whatsapp_strategy import WhatsAppStrategy
+from app.timestamps import TimestampParser
+
+STRPTIME_PATTERN = "%x, %H:%M"
+
+
+def synthetic_timestamps(messages: int, seed: int = 42) -> List[str]:
+    # Same header timestamps as benchmarks.synthetic ("M/D/YY, HH:MM"), without the texts
+    rng = random.Random(seed)
+    timestamp = datetime.datetime(2018, 1, 1, 8, 0)
+    values = []
+    for _ in range(messages):
+        timestamp += datetime.timedelta(minutes=rng.randint(0, 90))
+        values.append(f"{timestamp.month}/{timestamp.day}/{timestamp:%y}, {timestamp:%H:%M}")
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timestamp parsing.")
+    parser.add_argument("--messages", type=int, default=1_000_000,
+                        help="Number of synthetic message timestamps to parse.")
+    args = parser.parse_args()
+
+    values = synthetic_timestamps(args.messages)
+
+    start = time.perf_counter()
+    before = [datetime.datetime.strptime(v, STRPTIME_PATTERN) for v in values]
+    before_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    timestamp_parser = TimestampParser.for_values(values[:WhatsAppStrategy.DATE_ORDER_SAMPLE])
+    after = [timestamp_parser.parse(v) for v in values]
+    after_s = time.perf_counter() - start
+
+    if before != after:
+        raise SystemExit("TimestampParser result differs from strptime")
+    print(f"{'messages':>10} {'strptime':>10} {'parser':>10} {'speedup':>8}")
+    print(f"{len(values):>10} {before_s:>9.2f}s {after_s:>9.2f}s {before_s / after_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
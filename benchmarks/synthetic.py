@@ -0,0 +1,74 @@
+"""
+Deterministic synthetic WhatsApp exports for benchmarks.
+The same parameters and seed always produce byte-identical output.
+"""
+import datetime
+import random
+from typing import Iterator, List, NamedTuple
+
+EMOJIS = ["😱", "😂", "🥯", "❤", "👍", "🎉", "🙈", "🔥"]
+URLS = [
+    "https://goo.gl/maps/8EFnTNtYL5A2",
+    "www.example.com/a?b=c",
+    "https://www.instagram.com/p/BqtLe45gs8v/",
+]
+AUTHORS = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank"]
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "zen", "bar", "qui", "dor"]
+
+
+class ExportSpec(NamedTuple):
+    messages: int = 100_000
+    min_words: int = 3
+    max_words: int = 15
+    emoji_density: float = 0.2  # probability per message to contain an emoji
+    url_density: float = 0.05  # probability per message to contain a URL
+    multiline_density: float = 0.05  # probability per message to get a continuation line
+    vocabulary: int = 5000
+    seed: int = 42
+
+
+def vocabulary(size: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+def synthetic_messages(spec: ExportSpec) -> Iterator[str]:
+    """
+    Yield message bodies. Word frequencies follow a Zipf-like distribution over the vocabulary.
+    """
+    rng = random.Random(spec.seed)
+    words = vocabulary(spec.vocabulary, spec.seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    for _ in range(spec.messages):
+        parts = rng.choices(words, weights, k=rng.randint(spec.min_words, spec.max_words))
+        if rng.random() < spec.emoji_density:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(EMOJIS))
+        if rng.random() < spec.url_density:
+            parts.append(rng.choice(URLS))
+        text = " ".join(parts).capitalize()
+        if rng.random() < spec.multiline_density:
+            text += "\n" + " ".join(rng.choices(words, weights, k=spec.min_words))
+        yield text
+
+
+def synthetic_export_lines(spec: ExportSpec) -> Iterator[str]:
+    """
+    Yield the lines of a WhatsApp export ("M/D/YY, HH:MM - Name: text").
+    """
+    rng = random.Random(spec.seed + 1)
+    timestamp = datetime.datetime(2018, 1, 1, 8, 0)
+    for text in synthetic_messages(spec):
+        timestamp += datetime.timedelta(minutes=rng.randint(0, 90))
+        header = (
+            f"{timestamp.month}/{timestamp.day}/{timestamp:%y}, {timestamp:%H:%M} - "
+            f"{rng.choice(AUTHORS)}: "
+        )
+        yield header + text + "\n"
+
+
+def write_synthetic_export(path: str, spec: ExportSpec) -> None:
+    with open(path, "w", encoding="utf8", newline="\n") as f:
+        f.writelines(synthetic_export_lines(spec))
@@ -1,49 +1,469 @@
 import argparse
 import os
-from app.strategies import get_strategy
+import re
+from itertools import chain
+from typing import Any, Dict, List, Optional
+from app.strategies import AVAILABLE_INPUT_TYPES, get_strategy
 from app.blocklist import load_blocklist_words, load_blocklist_regex
-from app.analyzer import word_counts_from_texts
-from app.wordcloud import generate_wordcloud
+from app.analyzer import (
+    Analyzer, merge_counts, new_stats, word_counts_from_ranges, word_counts_from_texts,
+)
+from app.counting import COUNTER_BACKENDS, DEFAULT_SPACESAVING_CAPACITY
+from app.dedup import DEFAULT_DEDUP_EXACT_SIZE, DEFAULT_DEDUP_MIN_TOKENS, Deduplicator
+from app.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES, AnalysisCache, file_fingerprint
+from app.incremental import incremental_word_counts
+from app.animation import (
+    ANIMATION_MODES, ANIMATION_PERIODS, DEFAULT_ANIMATION_WINDOW, DEFAULT_FRAME_DURATION,
+    frame_counts, render_animation,
+)
+from app.batch import load_job_spec, render_jobs
+from app.grouping import grouped_word_counts, parse_date_range
+from app.export import write_counts
+from app.ingest import expand_inputs, ingest_files
+from app.fonts import detect_default_emoji_font
+from app.metrics import Metrics
+from app.normalize import Normalizer, load_alias_map
+from app.layout import (
+    DEFAULT_LAYOUT_QUALITY, DEFAULT_RENDER_SEED, LAYOUT_ENGINES, LAYOUT_QUALITY,
+)
+from app.ngrams import (
+    DEFAULT_MIN_NGRAM_COUNT, DEFAULT_MIN_PMI, DEFAULT_NGRAM_CAPACITY, PhraseCounter,
+    parse_ngram_sizes,
+)
 
+# The rendering stack (wordcloud, numpy, PIL, matplotlib) is imported only once
+# rendering starts, so --help, argument errors, missing inputs and --counts_only
+# never pay for it.
 
-def detect_default_emoji_font():
-    import platform
-    import os
-    try:
-        system = platform.system().lower()
-    except Exception:
-        system = ""
-    candidates = []
-    if "windows" in system:
-        # Windows default: Segoe UI Emoji
-        candidates.append(r"C:\Windows\Fonts\seguiemj.ttf")
+
+def counts_variant(args) -> str:
+    # Exact (dict) counts have no variant suffix
+    variant = ""
+    if args.ngrams:
+        variant = (f"ngrams:{','.join(map(str, args.ngrams))}:{args.min_ngram_count}:"
+                   f"{args.min_pmi}:{args.ngram_capacity}")
+    elif args.counter_backend == "spacesaving":
+        variant = f"spacesaving:{args.spacesaving_capacity}"
+    if args.dedup:
+        variant += f"|dedup:{args.dedup_min_tokens}:{args.dedup_exact_size}"
+    return variant
+
+
+def dedup_options(args) -> Optional[Dict[str, Any]]:
+    # Deduplicator keyword arguments, None without --dedup
+    if not args.dedup:
+        return None
+    return {"exact_size": args.dedup_exact_size, "min_tokens": args.dedup_min_tokens}
+
+
+def build_deduplicator(args) -> Optional[Deduplicator]:
+    options = dedup_options(args)
+    return Deduplicator(**options) if options is not None else None
+
+
+def report_dedup(stats: Dict[str, float]) -> None:
+    if stats.get("dedup_messages_suppressed"):
+        print(f"Suppressed {stats['dedup_messages_suppressed']} repeated message(s) "
+              f"({stats['dedup_tokens_suppressed']} tokens)")
+
+
+def analyze(args, input_source: str, input_type: str, metrics: Optional[Metrics] = None):
+    """
+    Parse the input and count words, reusing cached messages/counts unless --no_cache is set.
+    Stage timings and filter statistics are recorded in metrics if given.
+    """
+    metrics = metrics or Metrics(enabled=False)
+
+    # Resolve strategy for the given input type
+    strategy = get_strategy(input_type)
+
+    # Load blocklists
+    with metrics.stage("load_blocklists"):
+        blocklist_words = load_blocklist_words(args.blocklist_word_file)
+        blocklist_regex = load_blocklist_regex(args.blocklist_regex_file)
+
+    cache = None
+    fingerprint = None
+    if not args.no_cache:
+        fingerprint = file_fingerprint(input_source)
+        if fingerprint is not None:
+            cache = AnalysisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+    counts_key = None
+    if cache is not None:
+        counts_key = cache.counts_key(
+            fingerprint, input_type, args.min_word_length, blocklist_words, blocklist_regex,
+            variant=counts_variant(args),
+        )
+        with metrics.stage("cache_lookup"):
+            counts = cache.get_counts(counts_key)
+        if counts is not None:
+            metrics.set("counts_source", "cache")
+            return counts
+
+    # Filter statistics are only collected when requested (slower tokenizer path)
+    stats = new_stats() if metrics.enabled else None
+
+    # Compressed inputs can only be streamed from the start
+    compressed = strategy.is_compressed(input_source)
+
+    # Repeats are found across the whole input, so it is parsed as one stream
+    deduplicator = build_deduplicator(args)
+
+    if args.incremental:
+        if args.counter_backend == "spacesaving":
+            print("Incremental analysis needs exact counts. Parsing the full input.")
+        elif deduplicator is not None:
+            print("Incremental analysis is not available with --dedup. Parsing the full input.")
+        elif compressed:
+            print("Incremental analysis needs an uncompressed export. Parsing the full input.")
+        elif cache is None or not strategy.supports_offsets:
+            print(f"Incremental analysis unavailable for '{input_type}' without cache. "
+                  "Parsing the full input.")
+        else:
+            with metrics.stage("count"):
+                counts = incremental_word_counts(
+                    strategy, input_source, cache, args.min_word_length,
+                    blocklist_words, blocklist_regex, input_type, workers=args.workers,
+                )
+            metrics.set("counts_source", "incremental")
+            cache.put_counts(counts_key, counts)
+            return counts
+
+    if args.workers > 1 and strategy.supports_byte_ranges and not compressed and not deduplicator:
+        # Workers parse their own byte ranges of the file; nothing to stream through here
+        with metrics.stage("parse_and_count"):
+            counts = word_counts_from_ranges(
+                strategy, input_source, args.min_word_length, blocklist_words, blocklist_regex,
+                args.workers, backend=args.counter_backend, capacity=args.spacesaving_capacity,
+                stats=stats,
+            )
+        metrics.set("counts_source", "byte_ranges")
+        metrics.update(stats or {})
+        if cache is not None:
+            cache.put_counts(counts_key, counts)
+        return counts
+
+    # Stream texts via strategy (consumed lazily by the counter)
+    if cache is not None:
+        messages_key = cache.messages_key(fingerprint, input_type)
+        texts = cache.iter_messages(messages_key)
+        if texts is None:
+            texts = cache.record_messages(messages_key, strategy.iter_texts(input_source))
     else:
-        # Ubuntu/Linux: try Symbola bundled with wordcloud (if present), then common system paths
+        texts = strategy.iter_texts(input_source)
+    if deduplicator is not None:
+        texts = deduplicator.filter(texts)
+
+    # Compute word counts; parsing is interleaved with counting and timed separately
+    with metrics.stage("parse_and_count"):
+        counts = word_counts_from_texts(
+            metrics.timed_iter("parse", texts), args.min_word_length, blocklist_words,
+            blocklist_regex, workers=args.workers, backend=args.counter_backend,
+            capacity=args.spacesaving_capacity, stats=stats,
+        )
+    metrics.set("counts_source", "parse")
+    metrics.update(stats or {})
+    if deduplicator is not None:
+        metrics.update(deduplicator.stats)
+        report_dedup(deduplicator.stats)
+    if cache is not None:
+        cache.put_counts(counts_key, counts)
+    return counts
+
+
+def build_normalizer(args) -> Optional[Normalizer]:
+    """
+    Normalizer configured by --normalize, --stem and --alias_file; None if all are unset.
+    Normalized tokens that are on the word blocklist are dropped as well.
+    """
+    if not (args.normalize or args.stem or args.alias_file):
+        return None
+    try:
+        return Normalizer(
+            unicode_fold=args.normalize,
+            strip_emoji_modifiers=args.normalize,
+            aliases=load_alias_map(args.alias_file),
+            stem_language=args.stem,
+            blocklist_words=load_blocklist_words(args.blocklist_word_file),
+        )
+    except (RuntimeError, ValueError) as e:
+        raise SystemExit(str(e))
+
+
+def per_file_counts_path(directory: str, input_path: str) -> str:
+    safe = re.sub(r"[^\w\-]+", "_", os.path.splitext(input_path)[0]).strip("_") or "input"
+    return os.path.join(directory, f"{safe}.json")
+
+
+def analyze_many(
+    args,
+    inputs: List[str],
+    input_type: str,
+    metrics: Metrics,
+    normalizer: Optional[Normalizer] = None,
+):
+    """
+    Count words of several inputs file by file (in parallel with --workers) and merge
+    the counts in input order. Failing inputs are reported and skipped.
+    Per-file counts are written normalized if a normalizer is given; the merged
+    counts are returned as counted.
+    """
+    with metrics.stage("load_blocklists"):
+        blocklist_words = load_blocklist_words(args.blocklist_word_file)
+        blocklist_regex = load_blocklist_regex(args.blocklist_regex_file)
+    cache = None
+    if not args.no_cache:
+        cache = AnalysisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+    dedup_stats: Dict[str, float] = {}
+    with metrics.stage("ingest"):
+        results = ingest_files(
+            inputs, input_type, args.min_word_length, blocklist_words, blocklist_regex,
+            workers=args.workers, backend=args.counter_backend,
+            capacity=args.spacesaving_capacity, cache=cache, variant=counts_variant(args),
+            dedup=dedup_options(args), stats=dedup_stats,
+        )
+    metrics.update(dedup_stats)
+    report_dedup(dedup_stats)
+
+    counts: dict = {}
+    failed = 0
+    for path, file_counts, error in results:
+        if error is not None:
+            failed += 1
+            continue
+        merge_counts(counts, file_counts)
+        if args.per_file_counts:
+            if normalizer is not None:
+                file_counts = normalizer.normalize_counts(file_counts)
+            write_counts(file_counts, per_file_counts_path(args.per_file_counts, path))
+    metrics.set("inputs", len(inputs))
+    metrics.set("inputs_failed", failed)
+    if failed == len(inputs):
+        raise SystemExit("All inputs failed")
+    if failed:
+        print(f"{failed} of {len(inputs)} input(s) failed and were skipped")
+    if args.per_file_counts:
+        print(f"Per-file word counts saved to: {args.per_file_counts}")
+    return counts
+
+
+def analyze_phrases(args, inputs: List[str], input_type: str, metrics: Metrics):
+    """
+    Count phrases (--ngrams) of all inputs in one serial pass and keep those passing
+    --min_ngram_count and --min_pmi. The counts cache is used for a single input only.
+    """
+    strategy = get_strategy(input_type)
+    with metrics.stage("load_blocklists"):
+        blocklist_words = load_blocklist_words(args.blocklist_word_file)
+        blocklist_regex = load_blocklist_regex(args.blocklist_regex_file)
+
+    cache = None
+    counts_key = None
+    fingerprint = file_fingerprint(inputs[0]) if len(inputs) == 1 and not args.no_cache else None
+    if fingerprint is not None:
+        cache = AnalysisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+        counts_key = cache.counts_key(
+            fingerprint, input_type, args.min_word_length, blocklist_words, blocklist_regex,
+            variant=counts_variant(args),
+        )
+        with metrics.stage("cache_lookup"):
+            counts = cache.get_counts(counts_key)
+        if counts is not None:
+            metrics.set("counts_source", "cache")
+            return counts
+
+    counter = PhraseCounter(
+        Analyzer(args.min_word_length, blocklist_words, blocklist_regex),
+        args.ngrams, args.ngram_capacity,
+    )
+    texts = chain.from_iterable(strategy.iter_texts(path) for path in inputs)
+    deduplicator = build_deduplicator(args)
+    if deduplicator is not None:
+        texts = deduplicator.filter(texts)
+    with metrics.stage("parse_and_count"):
+        counter.update(metrics.timed_iter("parse", texts))
+        counts = counter.counts(
+            args.min_ngram_count, args.min_pmi, include_unigrams=1 in args.ngrams
+        )
+    metrics.set("counts_source", "parse")
+    if deduplicator is not None:
+        metrics.update(deduplicator.stats)
+        report_dedup(deduplicator.stats)
+    if cache is not None:
+        cache.put_counts(counts_key, counts)
+    return counts
+
+
+def render_defaults(args):
+    """
+    Render options shared by all outputs of a run; resolves the default emoji font.
+    """
+    # Auto-select default emoji-capable font if none provided
+    if not args.font_path:
+        auto_font = detect_default_emoji_font()
+        if auto_font:
+            args.font_path = auto_font
+    return {
+        "max_word_number": args.max_word_number,
+        "background_color": args.background_color,
+        "shape_path": args.shape_path,
+        "shape_width": args.shape_width,
+        "font_path": args.font_path,
+        "palette": args.palette,
+        "layout": args.layout,
+        "layout_quality": args.layout_quality,
+        "seed": args.seed,
+    }
+
+
+def render_cache(args) -> Optional[AnalysisCache]:
+    # Rendered PNGs and layouts share the analysis cache directory and size limit
+    if args.no_cache:
+        return None
+    return AnalysisCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+
+
+def group_output_path(output_path: str, group: str) -> str:
+    stem, ext = os.path.splitext(output_path)
+    safe = re.sub(r"[^\w\-]+", "_", group).strip("_") or "group"
+    return f"{stem}_{safe}{ext or '.png'}"
+
+
+def render_groups(args, inputs: List[str], input_type: str, metrics: Metrics) -> None:
+    """
+    Count words per group in one pass over all inputs and render one word cloud per group.
+    """
+    strategy = get_strategy(input_type)
+    if not strategy.supports_structured_messages:
+        raise SystemExit(f"Input type '{input_type}' does not support --group_by")
+    dimensions = [d.strip().lower() for d in args.group_by.split(",") if d.strip()]
+    date_ranges = [parse_date_range(r) for r in args.date_range or []]
+    normalizer = build_normalizer(args)
+    with metrics.stage("load_blocklists"):
+        analyzer = Analyzer(
+            args.min_word_length,
+            load_blocklist_words(args.blocklist_word_file),
+            load_blocklist_regex(args.blocklist_regex_file),
+        )
+    messages = chain.from_iterable(strategy.iter_structured_messages(path) for path in inputs)
+    deduplicator = build_deduplicator(args)
+    if deduplicator is not None:
+        messages = (m for m in messages if not deduplicator.seen(m.message))
+    with metrics.stage("parse_and_count"):
+        table = grouped_word_counts(messages, analyzer, dimensions, date_ranges)
+    metrics.set("groups", len(table))
+    if deduplicator is not None:
+        metrics.update(deduplicator.stats)
+        report_dedup(deduplicator.stats)
+    if not len(table):
+        print("No messages matched any group.")
+        return
+
+    def group_counts(group):
+        counts = table.counts_for(group)
+        return normalizer.normalize_counts(counts) if normalizer is not None else counts
+
+    if args.counts_only:
+        with metrics.stage("write_counts"):
+            for group in table:
+                path = group_output_path(args.counts_only, group)
+                write_counts(group_counts(group), path)
+                print(f"Word counts saved to: {path}")
+        return
+    with metrics.stage("normalize" if normalizer is not None else "group_counts"):
+        jobs = [
+            {"output": group_output_path(args.output, group), "counts": group_counts(group)}
+            for group in table
+        ]
+    with metrics.stage("render"):
+        results = render_jobs(
+            {}, jobs, render_defaults(args), workers=args.workers, cache=render_cache(args)
+        )
+    report_jobs(results, len(jobs))
+
+
+def animate(args, inputs: List[str], input_type: str, metrics: Metrics) -> None:
+    """
+    Count words per month/week in one pass over all inputs and render one frame per
+    period with the cumulative or sliding-window counts.
+    """
+    strategy = get_strategy(input_type)
+    if not strategy.supports_structured_messages:
+        raise SystemExit(f"Input type '{input_type}' does not support --animate")
+    normalizer = build_normalizer(args)
+    with metrics.stage("load_blocklists"):
+        analyzer = Analyzer(
+            args.min_word_length,
+            load_blocklist_words(args.blocklist_word_file),
+            load_blocklist_regex(args.blocklist_regex_file),
+        )
+    messages = chain.from_iterable(strategy.iter_structured_messages(path) for path in inputs)
+    deduplicator = build_deduplicator(args)
+    if deduplicator is not None:
+        messages = (m for m in messages if not deduplicator.seen(m.message))
+    with metrics.stage("parse_and_count"):
+        table = grouped_word_counts(messages, analyzer, [args.animate_period])
+    if deduplicator is not None:
+        metrics.update(deduplicator.stats)
+        report_dedup(deduplicator.stats)
+    if not len(table):
+        print("No timestamped messages to animate.")
+        return
+    with metrics.stage("frame_counts"):
+        period_counts = {}
+        for period in table:
+            counts = table.counts_for(period)
+            period_counts[period] = (
+                normalizer.normalize_counts(counts) if normalizer is not None else counts
+            )
         try:
-            import wordcloud as wc
-            d = os.path.dirname(wc.__file__)
-            candidates.append(os.path.join(d, "fonts", "Symbola", "Symbola.ttf"))
-        except Exception:
-            pass
-        candidates.extend([
-            "/usr/share/fonts/truetype/ttf-symbola/Symbola.ttf",
-            "/usr/share/fonts/truetype/ancient-scripts/Symbola.ttf",
-            "/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf",
-        ])
-    for p in candidates:
-        if p and os.path.exists(p):
-            return p
-    return None
+            frames = frame_counts(
+                period_counts, args.animate_period, args.animate, args.animate_window,
+                args.max_word_number,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+    metrics.set("frames", len(frames))
+    paths = render_animation(
+        [counts for _, counts in frames], args.output, render_defaults(args),
+        workers=args.workers, duration=args.frame_duration, metrics=metrics,
+        cache=render_cache(args),
+    )
+    for (period, _), path in zip(frames, paths):
+        print(f"Frame {period} saved to: {path}")
+    if args.output.lower().endswith(".gif"):
+        print(f"Animation saved to: {args.output}")
+
+
+def report_jobs(results, total: int) -> None:
+    failed = 0
+    for job_output, error in results:
+        if error:
+            failed += 1
+            print(f"Failed to render {job_output}: {error}")
+        else:
+            print(f"Word cloud saved to: {job_output}")
+    if failed:
+        raise SystemExit(f"{failed} of {total} job(s) failed")
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Analyze input sources and generate word clouds."
     )
-    parser.add_argument("input_source", type=str,
-                        help="Path to the source file.")
+    parser.add_argument("input_source", type=str, nargs="+",
+                        help=(
+                            "Path to the source file (plain, or zip/gz/bz2/xz/zst compressed). "
+                            "Several files, directories and (quoted) glob patterns such as "
+                            "'exports/**/*.zip' are counted file by file and merged."
+                        ))
     parser.add_argument("--input_type", type=str, default="whatsapp",
-                        help="Type of input source (e.g., 'whatsapp').")
+                        help=(
+                            f"Type of input source: {', '.join(AVAILABLE_INPUT_TYPES)}. "
+                            "'csv:COLUMN' selects the CSV text column."
+                        ))
     parser.add_argument(
         "--blocklist_word_file", required=False, type=str, help="Path to the word blocklist file."
     )
@@ -77,7 +497,19 @@ def main():
     parser.add_argument(
         "--shape_path",
         type=str,
-        help="Optional path to an image file used as a mask/shape for the word cloud.",
+        help=(
+            "Optional path to an image file (PNG, JPEG, ... or SVG) used as a mask/shape "
+            "for the word cloud; white and transparent areas stay empty."
+        ),
+    )
+    parser.add_argument(
+        "--shape_width",
+        type=int,
+        default=None,
+        help=(
+            "Width in pixels the shape is scaled (or an SVG rasterized) to, keeping its aspect "
+            "ratio; defaults to the image's own size. Prepared masks are cached on disk."
+        ),
     )
     parser.add_argument(
         "--font_path",
@@ -95,38 +527,349 @@ def main():
             "or 'mono-#RRGGBB' for a single color (e.g., 'mono-#333333')."
         ),
     )
+    parser.add_argument(
+        "--layout",
+        type=str,
+        choices=LAYOUT_ENGINES,
+        default="wordcloud",
+        help=(
+            "Word placement engine: 'wordcloud' (the library's own) or 'fast' (vectorized "
+            "coarse-to-fine search, much faster on large canvases and detailed masks)."
+        ),
+    )
+    parser.add_argument(
+        "--layout_quality",
+        type=str,
+        choices=tuple(LAYOUT_QUALITY),
+        default=DEFAULT_LAYOUT_QUALITY,
+        help="Speed/quality trade-off of the 'fast' layout: 'draft', 'balanced' or 'fine'.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_RENDER_SEED,
+        help="Seed of word placement and colors; the same input and options give the same image.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes used for parsing and counting words "
+            "(1 = single process)."
+        ),
+    )
+    parser.add_argument(
+        "--no_cache",
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the cache of parsed messages, word counts and renders.",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of the parsed message/word count/render cache.",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size limit of the cache in MB; least recently used entries are evicted.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Checkpoint the parse position and counts so the next run over the same, "
+            "grown export only parses the appended messages."
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help=(
+            "Path to a JSON/TOML job spec with a 'jobs' list; renders one PNG per job "
+            "from a single analysis. Options not set in a job default to the CLI values "
+            "(--output is ignored)."
+        ),
+    )
+    parser.add_argument(
+        "--group_by",
+        type=str,
+        default=None,
+        help=(
+            "Render one word cloud per group instead of one overall, grouping by a "
+            "comma-separated combination of 'author', 'month', 'week' and 'range' "
+            "(e.g. 'author,month'). Files are named after --output with the group appended."
+        ),
+    )
+    parser.add_argument(
+        "--animate",
+        type=str,
+        choices=ANIMATION_MODES,
+        default=None,
+        help=(
+            "Render a time-lapse with one frame per --animate_period instead of one cloud: "
+            "'cumulative' shows all messages up to the period, 'window' the last "
+            "--animate_window periods. Frames are numbered PNGs named after --output; an "
+            "--output ending in .gif also gets an animated GIF. Words are placed by the "
+            "'fast' layout (regardless of --layout) and keep their place between frames."
+        ),
+    )
+    parser.add_argument(
+        "--animate_period",
+        type=str,
+        choices=ANIMATION_PERIODS,
+        default="month",
+        help="Period of one --animate frame.",
+    )
+    parser.add_argument(
+        "--animate_window",
+        type=int,
+        default=DEFAULT_ANIMATION_WINDOW,
+        help="Periods per frame of --animate window.",
+    )
+    parser.add_argument(
+        "--frame_duration",
+        type=int,
+        default=DEFAULT_FRAME_DURATION,
+        help="Display time of one GIF frame in milliseconds.",
+    )
+    parser.add_argument(
+        "--date_range",
+        type=str,
+        action="append",
+        help="Custom date range for --group_by range as LABEL:YYYY-MM-DD:YYYY-MM-DD (repeatable).",
+    )
+    parser.add_argument(
+        "--counts_only",
+        "--counts-only",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Write word frequencies to PATH (.csv for CSV, otherwise JSON) instead of "
+            "rendering; the rendering libraries are never imported."
+        ),
+    )
+    parser.add_argument(
+        "--per_file_counts",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Also write the word counts of every input file as JSON into DIR.",
+    )
+    parser.add_argument(
+        "--counter_backend",
+        type=str,
+        choices=COUNTER_BACKENDS,
+        default="dict",
+        help=(
+            "Word counter: 'dict' (exact) or 'spacesaving' (approximate top words, "
+            "bounded memory)."
+        ),
+    )
+    parser.add_argument(
+        "--spacesaving_capacity",
+        type=int,
+        default=DEFAULT_SPACESAVING_CAPACITY,
+        help="Number of words tracked by the 'spacesaving' counter backend.",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help=(
+            "Skip repeated messages (forwarded chain messages, boilerplate): messages of at "
+            "least --dedup_min_tokens words that equal an earlier one up to case, spacing and "
+            "punctuation. With several inputs, repeats are found within each file."
+        ),
+    )
+    parser.add_argument(
+        "--dedup_min_tokens",
+        type=int,
+        default=DEFAULT_DEDUP_MIN_TOKENS,
+        help="Shorter messages (e.g. 'ok', 'haha') are never skipped as repeats.",
+    )
+    parser.add_argument(
+        "--dedup_exact_size",
+        type=int,
+        default=DEFAULT_DEDUP_EXACT_SIZE,
+        help=(
+            "Number of distinct messages remembered exactly; beyond that a Bloom filter "
+            "bounds memory (rarely, a new message is mistaken for a repeat)."
+        ),
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help=(
+            "Merge Unicode variants of a word (NFKC + casefold, e.g. 'Straße'/'strasse') "
+            "and emojis with their skin tone variants."
+        ),
+    )
+    parser.add_argument(
+        "--stem",
+        type=str,
+        default=None,
+        metavar="LANGUAGE",
+        help=(
+            "Merge inflected forms by stemming words in LANGUAGE (e.g. 'german' merges "
+            "'Haus', 'Hauses' and 'Häuser'); needs the snowballstemmer package."
+        ),
+    )
+    parser.add_argument(
+        "--alias_file",
+        type=str,
+        default=None,
+        help=(
+            "Path to an alias file with one 'canonical: alias, alias' line per word, "
+            "e.g. 'haha: hahaha, lol'."
+        ),
+    )
+    parser.add_argument(
+        "--ngrams",
+        type=parse_ngram_sizes,
+        default=None,
+        metavar="SIZES",
+        help=(
+            "Count phrases instead of single words: comma-separated n-gram sizes such as "
+            "'2,3' (bigrams and trigrams); add 1 to mix in single words (e.g. '1,2')."
+        ),
+    )
+    parser.add_argument(
+        "--min_pmi",
+        type=float,
+        default=DEFAULT_MIN_PMI,
+        help=(
+            "Minimum pointwise mutual information (log2) of a phrase; higher values keep "
+            "only words that occur together far more often than by chance."
+        ),
+    )
+    parser.add_argument(
+        "--min_ngram_count",
+        type=int,
+        default=DEFAULT_MIN_NGRAM_COUNT,
+        help="Minimum number of occurrences of a phrase.",
+    )
+    parser.add_argument(
+        "--ngram_capacity",
+        type=int,
+        default=DEFAULT_NGRAM_CAPACITY,
+        help=(
+            "Number of phrases tracked per n-gram size; rarer candidates are pruned while "
+            "counting, which bounds memory on large chats."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Print per-stage wall/CPU time and peak memory plus message/token statistics "
+            "(collecting token statistics slows counting down)."
+        ),
+    )
+    parser.add_argument(
+        "--metrics_json",
+        "--metrics-json",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Write the --profile stage timings and statistics to PATH as JSON.",
+    )
+    parser.add_argument(
+        "--profile_stage",
+        type=str,
+        default="parse_and_count",
+        help="Stage profiled with cProfile when --pstats is set (e.g. 'layout').",
+    )
+    parser.add_argument(
+        "--pstats",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="Dump cProfile stats of --profile_stage to PATH (inspect with python -m pstats).",
+    )
 
     args = parser.parse_args()
 
-    # Auto-select default emoji-capable font if none provided
-    if not args.font_path:
-        auto_font = detect_default_emoji_font()
-        if auto_font:
-            args.font_path = auto_font
-
-    input_source = args.input_source
+    inputs = expand_inputs(args.input_source, args.input_type)
+    if not inputs:
+        raise SystemExit(f"No input files found for: {', '.join(args.input_source)}")
     input_type = args.input_type
     output_path = args.output
 
+    metrics = Metrics(
+        enabled=bool(args.profile or args.metrics_json or args.pstats),
+        profile_stage=args.profile_stage,
+        pstats_path=args.pstats,
+    )
+    try:
+        if args.animate:
+            animate(args, inputs, input_type, metrics)
+        elif args.group_by:
+            render_groups(args, inputs, input_type, metrics)
+        else:
+            run(args, inputs, input_type, output_path, metrics)
+    finally:
+        if args.profile:
+            print(metrics.report())
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json)
+
+
+def run(args, inputs: List[str], input_type: str, output_path: str, metrics: Metrics) -> None:
+    # Validate the job spec before the (expensive) analysis
+    jobs = load_job_spec(args.batch) if args.batch else None
+    normalizer = build_normalizer(args)
+
+    if args.incremental:
+        if args.ngrams:
+            print("Incremental analysis is not available with --ngrams. Parsing the full input.")
+        elif args.per_file_counts:
+            print("Incremental analysis is not available with --per_file_counts. "
+                  "Parsing the full input.")
+        elif len(inputs) > 1:
+            print("Incremental analysis needs a single input. Parsing the full input.")
+
+    if args.ngrams:
+        counts = analyze_phrases(args, inputs, input_type, metrics)
+    elif len(inputs) == 1 and not args.per_file_counts:
+        counts = analyze(args, inputs[0], input_type, metrics)
+    else:
+        counts = analyze_many(args, inputs, input_type, metrics, normalizer)
+    if normalizer is not None:
+        # Once per distinct token; the counts cache keeps the counts as counted
+        with metrics.stage("normalize"):
+            counts = normalizer.normalize_counts(counts)
+    metrics.set("tokens_counted", sum(counts.values()))
+    metrics.set("distinct_tokens", len(counts))
+
+    if args.counts_only:
+        with metrics.stage("write_counts"):
+            write_counts(counts, args.counts_only)
+        print(f"Word counts saved to: {args.counts_only}")
+        return
+
+    if jobs is not None:
+        with metrics.stage("render"):
+            results = list(render_jobs(
+                counts, jobs, render_defaults(args), workers=args.workers,
+                cache=render_cache(args),
+            ))
+        report_jobs(results, len(jobs))
+        return
+
+    render_defaults(args)
+
     # Ensure output directory exists (also handled in generate_wordcloud, but done here per requirement)
     out_dir = os.path.dirname(output_path) or "."
     if not os.path.exists(out_dir):
         os.makedirs(out_dir, exist_ok=True)
 
-    # Resolve strategy for the given input type
-    strategy = get_strategy(input_type)
-
-    # Extract texts via strategy
-    texts = strategy.extract_texts(input_source)
-
-    # Load blocklists
-    blocklist_words = load_blocklist_words(args.blocklist_word_file)
-    blocklist_regex = load_blocklist_regex(args.blocklist_regex_file)
-
-    # Compute word counts
-    counts = word_counts_from_texts(
-        texts, args.min_word_length, blocklist_words, blocklist_regex
-    )
+    with metrics.stage("import_renderer"):
+        from app.wordcloud import generate_wordcloud
 
     # Generate and save word cloud
     generate_wordcloud(
@@ -135,8 +878,14 @@ def main():
         args.max_word_number,
         background_color=args.background_color,
         shape_path=args.shape_path,
+        shape_width=args.shape_width,
         font_path=args.font_path,
         palette=args.palette,
+        metrics=metrics,
+        layout=args.layout,
+        layout_quality=args.layout_quality,
+        seed=args.seed,
+        cache=render_cache(args),
     )
     print(f"Word cloud will be saved to: {output_path}")
 
@@ -0,0 +1,27 @@
+import unittest
+
+from app.analyzer import Analyzer, remove_urls, tokenize
+
+
+class TestAnalyzer(unittest.TestCase):
+    def test_tokenize_splits_words_and_emojis(self):
+        self.assertEqual(tokenize("hi😱there 🥯"), ["hi", "😱", "there", "🥯"])
+
+    def test_remove_urls_strips_all_urls(self):
+        text = remove_urls("see https://goo.gl/m/8 and www.example.com now")
+        self.assertNotIn("goo", text)
+        self.assertNotIn("example", text)
+
+    def test_tokens_apply_length_and_blocklist_rules(self):
+        analyzer = Analyzer(min_word_length=3, blocklist_words={"world"})
+        tokens = list(analyzer.tokens("Hi Hello World 😱 " + "x" * 46))
+        self.assertEqual(tokens, ["hello", "😱"])
+
+    def test_count_adds_to_existing_counts(self):
+        analyzer = Analyzer(min_word_length=1)
+        counts = analyzer.count(["a b", "", "a"], counts={"b": 1})
+        self.assertEqual(counts, {"b": 2, "a": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
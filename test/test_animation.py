@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+from wordcloud import WordCloud
+
+from app.animation import frame_counts, frame_path, period_range, render_animation
+from app.fast_layout import generate_incremental
+
+
+class TestAnimation(unittest.TestCase):
+    def test_period_range_fills_gaps(self):
+        self.assertEqual(
+            period_range(["2020-02", "2019-11"], "month"),
+            ["2019-11", "2019-12", "2020-01", "2020-02"],
+        )
+        self.assertEqual(
+            period_range(["2021-W01", "2020-W52"], "week"), ["2020-W52", "2020-W53", "2021-W01"]
+        )
+        with self.assertRaises(ValueError):
+            period_range(["2020-01-01"], "day")
+
+    def test_cumulative_and_window_frames(self):
+        counts = {"2020-01": {"a": 2, "b": 1}, "2020-03": {"b": 2, "c": 5}}
+        cumulative = frame_counts(counts, "month")
+        self.assertEqual([period for period, _ in cumulative], ["2020-01", "2020-02", "2020-03"])
+        self.assertEqual(cumulative[1][1], {"a": 2, "b": 1})
+        self.assertEqual(cumulative[2][1], {"c": 5, "b": 3, "a": 2})
+        window = frame_counts(counts, "month", "window", window=2)
+        self.assertEqual([c for _, c in window], [{"a": 2, "b": 1}, {"a": 2, "b": 1},
+                                                  {"b": 2, "c": 5}])
+        self.assertEqual(frame_counts(counts, "month", max_words=1)[2][1], {"c": 5})
+
+    def test_incremental_layout_keeps_positions(self):
+        first = {f"word{i}": 100 - i for i in range(30)}
+        second = {**first, "newcomer": 50}
+        wc = WordCloud(width=300, height=200, random_state=1)
+        layouts = generate_incremental(wc, [first, {}, first, second])
+        self.assertEqual(layouts[1], [])
+        placed = {entry[0][0]: entry[1:4] for entry in layouts[0]}
+        self.assertGreater(len(placed), 10)
+        # Unchanged frequencies: every word stays where it was
+        self.assertEqual({entry[0][0]: entry[1:4] for entry in layouts[2]}, placed)
+        kept = {entry[0][0]: entry[1:4] for entry in layouts[3]}
+        self.assertIn("newcomer", kept)
+        moved = [word for word in placed if kept.get(word) != placed[word]]
+        self.assertLess(len(moved), len(placed) // 4)
+
+    def test_render_animation_writes_frames_and_gif(self):
+        frames = [{"alpha": 3}, {"alpha": 3, "beta": 2}]
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "chat.gif")
+            paths = render_animation(frames, output, {"background_color": "white"})
+            self.assertEqual(paths, [frame_path(output, 0), frame_path(output, 1)])
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+            with Image.open(output) as gif:
+                self.assertEqual(gif.n_frames, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
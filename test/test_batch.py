@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app import batch
+from app.batch import load_job_spec, render_jobs
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, "w", encoding="utf8") as f:
+            f.write(content)
+        return path
+
+    def test_load_json_and_toml_specs(self):
+        jobs = [{"output": "out/a.png", "palette": "pastel"}, {"output": "out/b.png"}]
+        json_path = self._write("jobs.json", json.dumps({"jobs": jobs}))
+        toml_path = self._write(
+            "jobs.toml",
+            '[[jobs]]\noutput = "out/a.png"\npalette = "pastel"\n\n'
+            '[[jobs]]\noutput = "out/b.png"\n',
+        )
+        self.assertEqual(load_job_spec(json_path), jobs)
+        self.assertEqual(load_job_spec(toml_path), jobs)
+
+    def test_load_spec_rejects_unknown_options(self):
+        path = self._write("jobs.json", json.dumps([{"output": "a.png", "colour": "red"}]))
+        with self.assertRaises(ValueError):
+            load_job_spec(path)
+
+    def test_render_jobs_isolates_failing_jobs(self):
+        counts = {"alpha": 5, "beta": 3, "gamma": 1}
+        good = os.path.join(self._tmp.name, "out", "good.png")
+        bad = os.path.join(self._tmp.name, "out", "bad.png")
+        results = render_jobs(
+            counts,
+            [{"output": good}, {"output": bad, "layout": "other", "max_word_number": 1}],
+            {"max_word_number": 2, "background_color": "white"},
+            workers=1,
+        )
+        self.assertEqual(results[0], (good, None))
+        self.assertEqual(results[1][0], bad)
+        self.assertIn("other", results[1][1])
+        self.assertTrue(os.path.exists(good))
+        self.assertFalse(os.path.exists(bad))
+        # The counts are handed over once, trimmed to the largest max_word_number
+        self.assertEqual(batch._worker_counts, {"alpha": 5, "beta": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from app.strategies.whatsapp_strategy import WhatsAppStrategy
+from benchmarks.bench_pipeline import check_regressions
+from benchmarks.synthetic import ExportSpec, synthetic_export_lines
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_synthetic_export_is_deterministic_and_parseable(self):
+        spec = ExportSpec(messages=200, multiline_density=0.5)
+        lines = list(synthetic_export_lines(spec))
+        self.assertEqual(lines, list(synthetic_export_lines(spec)))
+        messages = list(WhatsAppStrategy().iter_messages(lines))
+        self.assertEqual(len(messages), 200)
+
+    def test_check_regressions_flags_slower_and_larger_stages(self):
+        baseline = {"stages": {
+            "a": {"throughput": 100.0, "peak_rss_mb": 50.0, "unit": "messages/s"},
+            "b": {"throughput": 100.0, "peak_rss_mb": 50.0, "unit": "messages/s"},
+        }}
+        results = {
+            "a": {"throughput": 85.0, "peak_rss_mb": 55.0, "unit": "messages/s"},
+            "b": {"throughput": 70.0, "peak_rss_mb": 70.0, "unit": "messages/s"},
+        }
+        failures = check_regressions(results, baseline, threshold=0.2)
+        self.assertEqual(len(failures), 2)
+        self.assertTrue(all(f.startswith("b:") for f in failures))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import re
+import tempfile
+import unittest
+
+from app.analyzer import word_counts_from_texts
+from app.blocklist import combine_regex_patterns, load_blocklist_regex
+
+
+class TestBlocklist(unittest.TestCase):
+    def test_combine_merges_into_single_pattern(self):
+        patterns = [re.compile(p) for p in ["^foo", "bar$", r"\d+"]]
+        combined = combine_regex_patterns(patterns)
+        self.assertEqual(len(combined), 1)
+        for token in ["foobar", "xbar", "a1", "baz"]:
+            expected = any(p.search(token) for p in patterns)
+            self.assertEqual(bool(combined[0].search(token)), expected, token)
+
+    def test_combine_keeps_backreferences_separate(self):
+        patterns = [re.compile(p) for p in [r"(a)\1", "^z", "(?P<n>x)", "(?P<n>y)"]]
+        combined = combine_regex_patterns(patterns)
+        self.assertIn(patterns[0], combined)
+        for token in ["aa", "ab", "zed", "x", "y", "q"]:
+            expected = any(p.search(token) for p in patterns)
+            self.assertEqual(any(p.search(token) for p in combined), expected, token)
+
+    def test_load_blocklist_regex_combines_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "regex.txt")
+            with open(path, "w", encoding="utf8") as f:
+                f.write("# comment\n^ha+$\n\nlol\n")
+            patterns = load_blocklist_regex(path)
+        self.assertEqual(len(patterns), 1)
+        counts = word_counts_from_texts(
+            texts=["haaa lolz hello", "hello"],
+            min_word_length=2,
+            blocklist_words=set(),
+            blocklist_regex=patterns,
+        )
+        self.assertEqual(counts, {"hello": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import re
+import tempfile
+import unittest
+
+from app.cache import AnalysisCache, file_fingerprint
+
+TEST_BACKUP_FILE_TXT = os.path.join(os.path.dirname(__file__), "test_backup_file.txt")
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_counts_round_trip(self):
+        counts = {"hello": 3, "😱": 1}
+        self.cache.put_counts("k", counts)
+        self.assertEqual(list(self.cache.get_counts("k").items()), list(counts.items()))
+        self.assertIsNone(self.cache.get_counts("other"))
+
+    def test_messages_published_only_after_full_consumption(self):
+        texts = ["a\nb", "", "c"]
+        recorder = self.cache.record_messages("m", iter(texts))
+        next(recorder)
+        recorder.close()
+        self.assertIsNone(self.cache.iter_messages("m"))
+        self.assertEqual(list(self.cache.record_messages("m", iter(texts))), texts)
+        self.assertEqual(list(self.cache.iter_messages("m")), texts)
+
+    def test_counts_key_depends_on_blocklist(self):
+        fp = file_fingerprint(TEST_BACKUP_FILE_TXT)
+        a = AnalysisCache.counts_key(fp, "whatsapp", 3, set(), [])
+        b = AnalysisCache.counts_key(fp, "whatsapp", 3, set(), [re.compile("x")])
+        c = AnalysisCache.counts_key(fp, "whatsapp", 4, set(), [])
+        self.assertEqual(len({a, b, c}), 3)
+
+    def test_evicts_least_recently_used(self):
+        cache = AnalysisCache(self._tmp.name, max_bytes=1)
+        cache.put_counts("old", {"a": 1})
+        self.assertIsNone(cache.get_counts("old"))
+        cache.max_bytes = 10 ** 6
+        cache.put_counts("old", {"a": 1})
+        os.utime(cache._path("old", "counts"), ns=(0, 0))
+        cache.put_counts("new", {"b": 1})
+        cache.max_bytes = os.path.getsize(cache._path("new", "counts"))
+        cache.evict()
+        self.assertIsNone(cache.get_counts("old"))
+        self.assertEqual(cache.get_counts("new"), {"b": 1})
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(self._tmp.name)
+        self.counts = {f"word{i}": 60 - i for i in range(40)}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_render_keys(self):
+        options = {"palette": "pastel", "background_color": "white", "seed": 1}
+        render, layout = AnalysisCache.render_keys(self.counts, options)
+        recolored = AnalysisCache.render_keys(self.counts, {**options, "palette": "orange"})
+        self.assertNotEqual(recolored[0], render)
+        self.assertEqual(recolored[1], layout)
+        reseeded = AnalysisCache.render_keys(self.counts, {**options, "seed": 2})
+        self.assertNotEqual(reseeded[1], layout)
+        reordered = dict(reversed(list(self.counts.items())))
+        self.assertNotEqual(AnalysisCache.render_keys(reordered, options)[1], layout)
+
+    def test_cached_and_recolored_renders_match_fresh_ones(self):
+        from app.metrics import Metrics
+        from app.wordcloud import render_png
+
+        options = {"background_color": "white", "palette": "pastel", "layout": "fast"}
+        fresh = {
+            p: render_png(self.counts, {**options, "palette": p}) for p in ("pastel", "orange")
+        }
+        sources = []
+        for palette in ("pastel", "pastel", "orange"):
+            metrics = Metrics(enabled=True)
+            png = render_png(
+                self.counts, {**options, "palette": palette}, cache=self.cache, metrics=metrics
+            )
+            self.assertEqual(png, fresh[palette])
+            sources.append(metrics.to_dict()["counters"]["render_source"])
+        self.assertEqual(sources, ["layout", "cache", "layout_cache"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import random
+import unittest
+
+from app.analyzer import word_counts_from_texts
+from app.counting import SpaceSaving, top_counts
+
+
+class TestCounting(unittest.TestCase):
+    def test_top_counts_matches_sorted_selection(self):
+        counts = {"a": 1, "b": 3, "c": 3, "d": 2, "e": 1}
+        expected = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)[:3])
+        self.assertEqual(list(top_counts(counts, 3).items()), list(expected.items()))
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        rng = random.Random(1)
+        rare = [f"rare{rng.randint(0, 5000)}" for _ in range(2000)]
+        stream = ["hot"] * 500 + ["warm"] * 300 + rare
+        rng.shuffle(stream)
+        summary = SpaceSaving(capacity=50)
+        summary.update(stream)
+        top = summary.top_k(2)
+        self.assertEqual([w for w, _ in top], ["hot", "warm"])
+        for w, c in top:
+            self.assertGreaterEqual(c, stream.count(w))
+            self.assertLessEqual(c - summary.error(w), stream.count(w))
+        self.assertLessEqual(len(summary.to_dict()), 50)
+
+    def test_backends_agree_on_exact_counts(self):
+        texts = ["Hello world hello", "world again", "😱 hello"] * 20
+        expected = word_counts_from_texts(texts, 3, set(), [])
+        approx = word_counts_from_texts(texts, 3, set(), [], backend="spacesaving", capacity=10)
+        self.assertEqual(approx, expected)
+        with self.assertRaises(ValueError):
+            word_counts_from_texts(texts, 3, set(), [], backend="bogus")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import datetime
+import io
 import unittest
 
 from app.strategies.whatsapp_strategy import WhatsAppStrategy
+from app.timestamps import TimestampParser, detect_date_order
 
 
 class TestDateParsing(unittest.TestCase):
@@ -27,5 +30,42 @@ class TestDateParsing(unittest.TestCase):
         self.assertEqual(test_datetime.day, 24)
 
 
+class TestTimestampParser(unittest.TestCase):
+    def test_formats(self):
+        cases = {
+            ("dmy", "24.09.2016, 01:02"): datetime.datetime(2016, 9, 24, 1, 2),
+            ("mdy", "9/24/16, 1:02 PM"): datetime.datetime(2016, 9, 24, 13, 2),
+            ("mdy", "9/24/16, 12:05\u202fa.m."): datetime.datetime(2016, 9, 24, 0, 5),
+            ("dmy", "03/04/16 18:30:15"): datetime.datetime(2016, 4, 3, 18, 30, 15),
+            (None, "2016-09-24, 01:02"): datetime.datetime(2016, 9, 24, 1, 2),
+        }
+        for (order, value), expected in cases.items():
+            self.assertEqual(TimestampParser(order).parse(value), expected, value)
+
+    def test_memoized_prefix_follows_day_changes(self):
+        parser = TimestampParser("mdy")
+        days = [parser.parse(v).day for v in ["9/2/16, 23:59", "9/2/16, 23:59", "9/24/16, 00:01"]]
+        self.assertEqual(days, [2, 2, 24])
+        for invalid in ["9/2/16, 25:00", "9/2/16, 13:00 PM", "2/30/16, 10:00", "soon"]:
+            with self.assertRaises(ValueError):
+                parser.parse(invalid)
+
+    def test_detect_date_order(self):
+        self.assertEqual(detect_date_order(["1/2/16, 10:00", "1/13/16, 10:00"]), "mdy")
+        self.assertEqual(detect_date_order(["13/1/16, 10:00"]), "dmy")
+        # Without a field above 12, the day is the field that changes more often
+        dotted = ["1.2.16, 10:00", "2.2.16, 9:00", "3.2.16, 9:00"]
+        self.assertEqual(detect_date_order(dotted), "dmy")
+        self.assertIsNone(detect_date_order(["1/2/16, 10:00"]))
+
+    def test_structured_messages_detect_order_per_export(self):
+        export = "03.04.16, 10:00 - Anna: hallo\n14.04.16, 11:00 - Ben: tschüss\n"
+        strategy = WhatsAppStrategy()
+        strategy.open_file = lambda path: io.StringIO(export)
+        messages = list(strategy.iter_structured_messages("export.txt"))
+        self.assertEqual([m.timestamp.month for m in messages], [4, 4])
+        self.assertEqual([m.message for m in messages], ["hallo\n", "tschüss\n"])
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
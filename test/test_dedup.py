@@ -0,0 +1,46 @@
+import hashlib
+import unittest
+
+from app.dedup import BloomFilter, Deduplicator
+
+
+def digest(i: int) -> bytes:
+    return hashlib.blake2b(str(i).encode(), digest_size=16).digest()
+
+
+class TestDeduplicator(unittest.TestCase):
+    def test_repeats_are_suppressed_up_to_case_and_punctuation(self):
+        texts = [
+            "Forward this to ten friends today!",
+            "forward this to   ten friends, today",
+            "ok", "ok",
+            "Something else entirely here",
+            "FORWARD THIS TO TEN FRIENDS TODAY",
+        ]
+        deduplicator = Deduplicator(min_tokens=2)
+        kept = list(deduplicator.filter(texts))
+        self.assertEqual(kept, [texts[0], "ok", "ok", texts[4]])
+        self.assertEqual(deduplicator.stats, {
+            "dedup_messages_checked": 4,
+            "dedup_messages_suppressed": 2,
+            "dedup_tokens_suppressed": 12,
+        })
+
+    def test_bloom_filter_beyond_exact_size(self):
+        deduplicator = Deduplicator(exact_size=2, min_tokens=1, bloom_capacity=1000)
+        texts = [f"message number {i}" for i in range(200)]
+        self.assertEqual(list(deduplicator.filter(texts)), texts)
+        self.assertEqual(len(deduplicator._exact), 2)
+        self.assertEqual(list(deduplicator.filter(texts)), [])
+        self.assertEqual(deduplicator.stats["dedup_messages_suppressed"], 200)
+
+    def test_bloom_false_positive_rate(self):
+        bloom = BloomFilter(10000, 0.01)
+        self.assertLess(sum(bloom.add(digest(i)) for i in range(10000)), 100)
+        self.assertTrue(all(bloom.add(digest(i)) for i in range(10000)))
+        false_positives = sum(bloom.add(digest(i)) for i in range(10000, 11000))
+        self.assertLess(false_positives, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import datetime
+import os
+import re
+import unittest
+
+from app.analyzer import Analyzer
+from app.grouping import grouped_word_counts, group_labels, parse_date_range
+from app.strategies.whatsapp_strategy import WhatsAppMessage, WhatsAppStrategy
+
+TEST_BACKUP_FILE_TXT = os.path.join(os.path.dirname(__file__), "test_backup_file.txt")
+
+
+def _message(day, username, text):
+    return WhatsAppMessage(datetime.datetime(2020, 1, day, 12, 0), username, text)
+
+
+class TestGrouping(unittest.TestCase):
+    def test_group_labels_combine_dimensions(self):
+        message = _message(6, "Alice", "hi")
+        self.assertEqual(group_labels(message, ["author", "month"]), ["Alice/2020-01"])
+        self.assertEqual(group_labels(message, ["week"]), ["2020-W02"])
+        ranges = [parse_date_range("a:2020-01-01:2020-01-06"),
+                  parse_date_range("b:2020-01-06:2020-02-01"),
+                  parse_date_range("c:2020-02-01:2020-03-01")]
+        self.assertEqual(group_labels(message, ["range"], ranges), ["a", "b"])
+
+    def test_parse_date_range_rejects_invalid_input(self):
+        with self.assertRaises(ValueError):
+            parse_date_range("2020-01-01:2020-02-01")
+        with self.assertRaises(ValueError):
+            parse_date_range("x:2020-02-01:2020-01-01")
+
+    def test_grouped_counts_per_author(self):
+        messages = [
+            _message(1, "Alice", "hello world"),
+            _message(2, "Bob", "hello there"),
+            _message(3, "Alice", "world blocked"),
+        ]
+        analyzer = Analyzer(3, blocklist_regex=[re.compile("^block")])
+        table = grouped_word_counts(messages, analyzer, ["author"])
+        self.assertEqual(list(table), ["Alice", "Bob"])
+        self.assertEqual(list(table.counts_for("Alice").items()), [("hello", 1), ("world", 2)])
+        self.assertEqual(table.counts_for("Bob"), {"hello": 1, "there": 1})
+
+    def test_structured_messages_from_backup(self):
+        strategy = WhatsAppStrategy()
+        messages = list(strategy.iter_structured_messages(TEST_BACKUP_FILE_TXT))
+        table = grouped_word_counts(messages, Analyzer(3), ["author", "month"])
+        self.assertEqual(sorted(table), ["TestA/2018-11", "TestA/2018-12",
+                                         "TestB/2018-11", "TestB/2018-12"])
+        self.assertEqual(table.counts_for("TestB/2018-12"), {"still": 1, "often": 1, "waiting": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
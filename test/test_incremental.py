@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from app.analyzer import word_counts_from_texts
+from app.cache import AnalysisCache
+from app.incremental import incremental_word_counts
+from app.strategies.whatsapp_strategy import WhatsAppStrategy
+
+
+class TestIncrementalWordCounts(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(os.path.join(self._tmp.name, "cache"))
+        self.chat = os.path.join(self._tmp.name, "chat.txt")
+        self.strategy = WhatsAppStrategy()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _append(self, text):
+        with open(self.chat, "a", encoding="utf8") as f:
+            f.write(text)
+
+    def _counts(self):
+        return incremental_word_counts(
+            self.strategy, self.chat, self.cache, 3, set(), [], "whatsapp"
+        )
+
+    def _full_counts(self):
+        return word_counts_from_texts(self.strategy.iter_texts(self.chat), 3, set(), [])
+
+    def test_appended_messages_match_full_parse(self):
+        self._append("1/2/20, 10:00 - TestA: hello world\n1/2/20, 10:01 - TestB: hello\n")
+        self.assertEqual(self._counts(), self._full_counts())
+        self._append("1/3/20, 09:00 - TestA: another hello\n")
+        self.assertEqual(self._counts(), self._full_counts())
+
+    def test_continuation_of_last_message_is_counted(self):
+        self._append("1/2/20, 10:00 - TestA: hello\n1/2/20, 10:01 - TestB: first\n")
+        self._counts()
+        self._append("continued line\n1/3/20, 09:00 - TestA: done\n")
+        counts = self._counts()
+        self.assertEqual(counts, self._full_counts())
+        self.assertEqual(counts["continued"], 1)
+
+    def test_rewritten_file_falls_back_to_full_parse(self):
+        self._append("1/2/20, 10:00 - TestA: hello world\n1/2/20, 10:01 - TestB: bye\n")
+        self._counts()
+        with open(self.chat, "w", encoding="utf8") as f:
+            f.write("1/2/20, 10:00 - TestA: other words\n1/2/20, 10:01 - TestB: bye\n")
+        self.assertEqual(self._counts(), self._full_counts())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from app.cache import AnalysisCache
+from app.ingest import expand_inputs, ingest_files
+
+TEST_BACKUP_FILE_TXT = os.path.join(os.path.dirname(__file__), "test_backup_file.txt")
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.exports = os.path.join(self.tmp.name, "exports")
+        os.makedirs(os.path.join(self.exports, "b"))
+        self.first = os.path.join(self.exports, "a.txt")
+        self.second = os.path.join(self.exports, "b", "chat.txt")
+        shutil.copy(TEST_BACKUP_FILE_TXT, self.first)
+        shutil.copy(TEST_BACKUP_FILE_TXT, self.second)
+        with open(os.path.join(self.exports, "b", "photo.jpg"), "wb") as f:
+            f.write(b"\xff\xd8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand_inputs_walks_directories_and_globs(self):
+        self.assertEqual(expand_inputs([self.exports]), [self.first, self.second])
+        pattern = os.path.join(self.exports, "**", "*.txt")
+        self.assertEqual(expand_inputs([self.second, pattern]), [self.second, self.first])
+
+    def test_expand_inputs_picks_files_of_the_input_type(self):
+        telegram = os.path.join(self.exports, "b", "result.json")
+        table = os.path.join(self.exports, "a.csv")
+        for path in (telegram, table):
+            with open(path, "w", encoding="utf8") as f:
+                f.write("{}")
+        self.assertEqual(expand_inputs([self.exports], "telegram"), [telegram])
+        self.assertEqual(expand_inputs([self.exports], "csv:body"), [table])
+
+    def test_failing_file_does_not_stop_the_others(self):
+        missing = os.path.join(self.exports, "missing.txt")
+        messages = []
+        for workers in (1, 2):
+            results = ingest_files(
+                [self.first, missing, self.second], "whatsapp", 3, set(), [],
+                workers=workers, progress=messages.append,
+            )
+            self.assertEqual([path for path, _, _ in results], [self.first, missing, self.second])
+            self.assertEqual(results[0][1], results[2][1])
+            self.assertIsNone(results[1][1])
+            self.assertIsNotNone(results[1][2])
+        self.assertEqual(len(messages), 6)
+
+    def test_cached_counts_are_reused(self):
+        cache = AnalysisCache(os.path.join(self.tmp.name, "cache"))
+        first = ingest_files([self.first], "whatsapp", 3, set(), [], cache=cache,
+                             progress=lambda message: None)
+        with mock.patch("app.ingest._count_file", side_effect=AssertionError("parsed")):
+            second = ingest_files([self.first], "whatsapp", 3, set(), [], cache=cache,
+                                  progress=lambda message: None)
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from wordcloud import WordCloud
+
+from app.fast_layout import OccupancyPyramid, text_extent
+from app.layout import layout_wordcloud
+
+
+class TestFastLayout(unittest.TestCase):
+    def test_pyramid_finds_only_free_boxes(self):
+        occupied = np.zeros((40, 40), dtype=bool)
+        occupied[:, :30] = True
+        pyramid = OccupancyPyramid(occupied, [8, 4, 2, 1])
+        rng = random.Random(0)
+        # The free strip is 10 px wide, but only 8 px of it are cell aligned at cell size 8
+        self.assertIsNone(pyramid.find(8, 10, 10, rng))
+        row, col = pyramid.find(1, 10, 10, rng)
+        self.assertFalse(occupied[row:row + 10, col:col + 10].any())
+        pyramid.update(0, 30, np.ones((40, 10), dtype=bool))
+        self.assertIsNone(pyramid.find(1, 1, 1, rng))
+        self.assertTrue(pyramid.grids[8].all())
+
+    def test_layout_stays_inside_mask_without_overlaps(self):
+        mask = np.full((200, 300), 255, dtype=np.uint8)
+        mask[20:180, 20:280] = 0
+        counts = {f"word{i}": 100 - i for i in range(40)}
+        wc = WordCloud(mask=mask, random_state=3, max_words=40, margin=0)
+        layout_wordcloud(wc, counts, "fast", "fine")
+        self.assertGreater(len(wc.layout_), 10)
+        ink = np.zeros(mask.shape, dtype=int)
+        for (word, _), size, (top, left), orientation, color in wc.layout_:
+            height, width = text_extent(wc.font_path, size, orientation, word)
+            self.assertIsNotNone(color)
+            self.assertTrue((mask[top:top + height, left:left + width] == 0).all())
+            glyph = Image.new("L", (mask.shape[1], mask.shape[0]))
+            font = ImageFont.TransposedFont(
+                ImageFont.truetype(wc.font_path, size), orientation=orientation
+            )
+            ImageDraw.Draw(glyph).text((left, top), word, fill="white", font=font)
+            ink += np.asarray(glyph) > 0
+        self.assertLessEqual(ink.max(), 1)
+        self.assertEqual(wc.to_array().shape[:2], mask.shape)
+
+    def test_unknown_engine_and_quality_are_rejected(self):
+        wc = WordCloud(width=100, height=100)
+        with self.assertRaises(ValueError):
+            layout_wordcloud(wc, {"word": 1}, "other")
+        with self.assertRaises(ValueError):
+            layout_wordcloud(wc, {"word": 1}, "fast", "ultra")
+
+
+if __name__ == "__main__":
+    unittest.main()
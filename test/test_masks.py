@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from app.cache import AnalysisCache
+from app.masks import load_prepared_mask
+
+
+class TestMasks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        self.cache = AnalysisCache(self.cache_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _shape(self, image: Image.Image) -> str:
+        path = os.path.join(self.tmp.name, "shape.png")
+        image.save(path)
+        return path
+
+    def test_mask_is_thresholded_scaled_and_cached(self):
+        pixels = np.full((40, 80), 255, dtype=np.uint8)
+        pixels[10:30, 20:60] = 0
+        pixels[0, 0] = 200
+        path = self._shape(Image.fromarray(pixels))
+
+        mask = load_prepared_mask(path, cache=self.cache)
+        self.assertEqual(sorted(np.unique(mask)), [0, 255])
+        # Like the wordcloud library, only pure white is masked out
+        self.assertEqual(mask[0, 0], 0)
+        self.assertEqual(mask[0, 1], 255)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        cached = load_prepared_mask(path, cache=self.cache)
+        self.assertIsInstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, mask)
+
+        scaled = load_prepared_mask(path, width=40, cache=self.cache)
+        self.assertEqual(scaled.shape, (20, 40))
+        self.assertEqual(scaled[10, 20], 0)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_masks_count_towards_the_cache_size_limit(self):
+        path = self._shape(Image.new("L", (200, 100), "white"))
+        load_prepared_mask(path, cache=AnalysisCache(self.cache_dir, max_bytes=1000))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        load_prepared_mask(path, cache=None)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_transparent_areas_are_masked_out(self):
+        image = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+        image.paste((0, 0, 0, 255), (2, 2, 8, 8))
+        mask = load_prepared_mask(self._shape(image))
+        self.assertEqual(mask[0, 0], 255)
+        self.assertEqual(mask[5, 5], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
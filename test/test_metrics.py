@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app.analyzer import new_stats, word_counts_from_texts
+from app.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_stages_and_counters_are_recorded(self):
+        metrics = Metrics()
+        with metrics.stage("count"):
+            items = list(metrics.timed_iter("parse", ["a", "b"]))
+        metrics.update({"messages": 2})
+        metrics.update({"messages": 3})
+        self.assertEqual(items, ["a", "b"])
+        self.assertEqual(set(metrics.stages), {"count", "parse"})
+        self.assertEqual(metrics.counters["messages"], 5)
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics = Metrics(enabled=False)
+        with metrics.stage("count"):
+            list(metrics.timed_iter("parse", ["a"]))
+        metrics.set("messages", 1)
+        self.assertEqual(metrics.to_dict(), {"stages": {}, "counters": {}})
+
+    def test_write_json_and_pstats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pstats_path = os.path.join(tmp, "count.prof")
+            metrics = Metrics(profile_stage="count", pstats_path=pstats_path)
+            with metrics.stage("count"):
+                sum(range(100))
+            metrics.write_json(os.path.join(tmp, "metrics.json"))
+            with open(os.path.join(tmp, "metrics.json"), encoding="utf8") as f:
+                self.assertIn("count", json.load(f)["stages"])
+            self.assertTrue(os.path.exists(pstats_path))
+
+    def test_filter_stats_do_not_change_counts(self):
+        texts = ["ab hello hello world", "spam 😀 " + "x" * 50]
+        stats = new_stats()
+        counts = word_counts_from_texts(texts, 3, {"spam"}, None, stats=stats)
+        self.assertEqual(counts, word_counts_from_texts(texts, 3, {"spam"}, None))
+        self.assertEqual(stats["messages"], 2)
+        self.assertEqual(stats["tokens_seen"], 7)
+        self.assertEqual(stats["dropped_too_short"], 1)
+        self.assertEqual(stats["dropped_too_long"], 1)
+        self.assertEqual(stats["dropped_blocklist_word"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
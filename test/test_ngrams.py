@@ -0,0 +1,47 @@
+import re
+import unittest
+
+from app.analyzer import Analyzer
+from app.ngrams import PhraseCounter, parse_ngram_sizes, phrase_counts
+
+
+class TestPhraseCounting(unittest.TestCase):
+    def setUp(self):
+        filler = [f"the {w} was there and the {w} left" for w in ("dog", "cat", "man", "car")]
+        self.texts = ["Happy birthday Anna!", "happy birthday to you"] * 3 + filler * 3
+
+    def test_collocations_pass_common_pairs_do_not(self):
+        counter = PhraseCounter(Analyzer(3, {"and"}), sizes=(2,))
+        counter.update(self.texts)
+        phrases = {phrase: count for phrase, count, _ in counter.scored_phrases(3, 3.0)}
+        self.assertEqual(phrases["happy birthday"], 6)
+        # "the" is too frequent for "the dog" to be a collocation
+        self.assertNotIn("the dog", phrases)
+        self.assertLess(counter.pmi("the dog", 6), counter.pmi("happy birthday", 6))
+
+    def test_phrases_never_span_dropped_tokens(self):
+        counter = PhraseCounter(Analyzer(3, {"skip"}, [re.compile(r"^bad")]), sizes=(2, 3))
+        counter.add("green to apple skip pie badword tree 😀 house")
+        self.assertEqual(dict(counter.ngrams[2].items()), {})
+        counter.add("one two three four")
+        self.assertEqual(set(dict(counter.ngrams[3].items())), {"one two three", "two three four"})
+        self.assertEqual(counter.total, 10)
+
+    def test_bounded_capacity_and_unigrams(self):
+        counter = PhraseCounter(Analyzer(1), sizes=(2,), capacity=5)
+        counter.update(f"w{i} w{i + 1}" for i in range(100))
+        self.assertLessEqual(len(dict(counter.ngrams[2].items())), 5)
+        counts = phrase_counts(self.texts, Analyzer(3, {"and"}), sizes=(1, 2))
+        self.assertEqual(counts["happy birthday"], 6)
+        self.assertEqual(counts["happy"], 6)
+
+    def test_parse_ngram_sizes(self):
+        self.assertEqual(parse_ngram_sizes("3, 2,2"), (2, 3))
+        with self.assertRaises(ValueError):
+            parse_ngram_sizes("0,2")
+        with self.assertRaises(ValueError):
+            parse_ngram_sizes("two")
+
+
+if __name__ == "__main__":
+    unittest.main()
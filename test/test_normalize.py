@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+from app.normalize import Normalizer, load_alias_map
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+
+class TestNormalizer(unittest.TestCase):
+    def test_folding_modifiers_and_aliases(self):
+        normalizer = Normalizer(aliases={"LOL": "haha", "hahaha": "haha"}, blocklist_words={"meh"})
+        counts = {"straße": 2, "strasse": 1, "ﬁne": 1, "👍": 3, "🏽": 2, "lol": 1,
+                  "hahaha": 4, "meh": 5, "happy lol": 2, "happy 🏽": 1}
+        self.assertEqual(normalizer.normalize_counts(counts), {
+            "strasse": 3, "fine": 1, "👍": 3, "haha": 5, "happy haha": 2,
+        })
+
+    def test_memo_is_bounded(self):
+        normalizer = Normalizer(memo_size=2)
+        normalizer.normalize_counts({"a": 1, "b": 1, "c": 1})
+        self.assertEqual(list(normalizer._memo), ["b", "c"])
+
+    @unittest.skipIf(snowballstemmer is None, "snowballstemmer not installed")
+    def test_stemming(self):
+        normalizer = Normalizer(stem_language="german", aliases={"häuschen": "haus"})
+        counts = normalizer.normalize_counts({"haus": 1, "häuser": 2, "hauses": 3, "häuschen": 4})
+        self.assertEqual(counts, {"haus": 10})
+        with self.assertRaises(ValueError):
+            Normalizer(stem_language="klingon")
+
+    def test_load_alias_map(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "aliases.txt")
+            with open(path, "w", encoding="utf8") as f:
+                f.write("# comment\nHaha: hahaha, LOL ,\n\nno separator\n")
+            self.assertEqual(load_alias_map(path), {"hahaha": "haha", "lol": "haha"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import http.client
+import json
+import threading
+import time
+import unittest
+
+from app.server import RenderService, make_server, parse_options
+
+
+class TestRenderServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = RenderService(workers=1, queue_size=0)
+        cls.server = make_server("127.0.0.1", 0, cls.service)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.shutdown()
+
+    def _request(self, method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=10)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        data = response.read()
+        conn.close()
+        return response.status, data
+
+    def test_health(self):
+        status, data = self._request("GET", "/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(data)["workers"], 1)
+
+    def test_invalid_requests_are_rejected(self):
+        self.assertEqual(self._request("POST", "/render", b"[]")[0], 400)
+        body = json.dumps({"counts": {"a": 1}, "colour": "red"}).encode()
+        self.assertEqual(self._request("POST", "/render", body)[0], 400)
+        for count in (None, [1], {"n": 1}, "many"):
+            body = json.dumps({"counts": {"a": count}}).encode()
+            self.assertEqual(self._request("POST", "/render", body)[0], 400)
+        self.assertEqual(self._request("POST", "/render/chat?input_type=fax", b"")[0], 400)
+        self.assertEqual(self._request("POST", "/unknown", b"")[0], 404)
+
+    def test_full_queue_rejects_submissions(self):
+        future = self.service.try_submit(time.sleep, 0.5)
+        self.assertIsNotNone(future)
+        self.assertIsNone(self.service.try_submit(time.sleep, 0))
+        future.result()
+        time.sleep(0.05)
+        self.assertEqual(self.service.in_flight, 0)
+
+    def test_parse_options_fills_defaults(self):
+        options = parse_options({"max_word_number": "10"}, {"max_word_number": 5, "palette": None})
+        self.assertEqual(options, {"max_word_number": 10, "palette": None})
+        with self.assertRaises(ValueError):
+            parse_options({"shape_path": "missing.png"}, {"max_word_number": 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
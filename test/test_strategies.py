@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from app.strategies import STRATEGY_MODULES, get_strategy, register_strategy
+from app.strategies.telegram_strategy import TelegramStrategy
+
+TELEGRAM_EXPORT = """{
+ "name": "Group",
+ "messages": [
+  {"id": 1, "type": "service", "date": "2024-01-01T10:00:00", "actor": "Bob"},
+  {"id": 2, "type": "message", "date": "2024-01-01T10:01:00", "from": "Alice",
+   "text": "Hello \\"messages\\": [ world"},
+  {"id": 3, "type": "message", "date": "2024-02-01T10:02:00", "from": "Bob",
+   "text": ["see ", {"type": "link", "text": "https://example.com"}, " later"]}
+ ]
+}"""
+
+MBOX = (
+    "From alice@example.com Mon Jan  1 10:00:00 2024\n"
+    "From: Alice <alice@example.com>\n"
+    "Date: Mon, 01 Jan 2024 10:00:00 +0100\n"
+    "Subject: Lunch\n"
+    "\n"
+    "Pizza tomorrow?\n"
+    ">From the office\n"
+    "\n"
+    "From bob@example.com Mon Jan  1 11:00:00 2024\n"
+    "From: bob@example.com\n"
+    "Content-Type: text/html\n"
+    "\n"
+    "<p>Sure</p>\n"
+)
+
+
+class TestStrategies(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf8", newline="") as f:
+            f.write(content)
+        return path
+
+    def test_strategy_modules_are_imported_on_request(self):
+        register_strategy("broken", "app.strategies.does_not_exist", "Missing")
+        try:
+            with self.assertRaises(ImportError):
+                get_strategy("broken")
+        finally:
+            del STRATEGY_MODULES["broken"]
+        self.assertIs(get_strategy("whatsapp"), get_strategy("WhatsApp"))
+        with self.assertRaises(ValueError):
+            get_strategy("unknown")
+
+    def test_telegram_export_is_decoded_across_chunks(self):
+        path = self._write("result.json", TELEGRAM_EXPORT)
+        strategy = TelegramStrategy()
+        strategy.CHUNK_SIZE = 7
+        self.assertEqual(
+            strategy.extract_texts(path),
+            ['Hello "messages": [ world', "see https://example.com later"],
+        )
+        authors = [m.username for m in strategy.iter_structured_messages(path)]
+        self.assertEqual(authors, ["Alice", "Bob"])
+
+    def test_truncated_telegram_export_raises(self):
+        path = self._write("result.json", TELEGRAM_EXPORT[:-20])
+        with self.assertRaises(ValueError):
+            get_strategy("telegram").extract_texts(path)
+
+    def test_mbox_messages(self):
+        path = self._write("mail.mbox", MBOX)
+        messages = list(get_strategy("mbox").iter_structured_messages(path))
+        self.assertEqual([m.username for m in messages], ["Alice", "bob@example.com"])
+        self.assertIn("From the office", messages[0].message)
+        self.assertIn("Sure", messages[1].message)
+        self.assertNotIn("<p>", messages[1].message)
+
+    def test_csv_text_column(self):
+        path = self._write("rows.csv", 'id,author,text\n1,Alice,"two\nlines"\n2,Bob,\n')
+        self.assertEqual(get_strategy("csv").extract_texts(path), ["two\nlines"])
+        self.assertEqual(get_strategy("csv:id").extract_texts(path), ["1", "2"])
+
+    def test_csv_keeps_crlf_inside_quoted_fields(self):
+        path = self._write("rows.csv", 'id,text\r\n1,"two\r\nlines"\r\n2,one line\r\n')
+        self.assertEqual(get_strategy("csv").extract_texts(path), ["two\r\nlines", "one line"])
+
+    def test_text_byte_ranges_match_lines(self):
+        path = self._write("corpus.txt", "".join(f"line {i}\n" for i in range(100)))
+        strategy = get_strategy("text")
+        ranges = strategy.split_byte_ranges(path, 4)
+        self.assertEqual(len(ranges), 4)
+        texts = [t for start, end in ranges for t in strategy.iter_texts_in_range(path, start, end)]
+        self.assertEqual(texts, strategy.extract_texts(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
+import gzip
 import unittest
 import os
+import tempfile
+import zipfile
 
 from app.strategies.whatsapp_strategy import WhatsAppStrategy
-from app.analyzer import word_counts_from_texts
+from app.analyzer import word_counts_from_ranges, word_counts_from_texts
 
 TEST_BACKUP_FILE_TXT = os.path.join(os.path.dirname(__file__), "test_backup_file.txt")
 
@@ -78,6 +81,75 @@ class TestWhatsAppStrategy(unittest.TestCase):
             counts.items(), key=lambda x: x[1], reverse=True)[0][0]
         self.assertEqual("often", top_word)
 
+    def test_iter_texts_is_lazy_generator(self):
+        strategy = WhatsAppStrategy()
+        texts = strategy.iter_texts(TEST_BACKUP_FILE_TXT)
+        self.assertFalse(isinstance(texts, list))
+        self.assertEqual(len(list(texts)), 5)
+
+    def test_iter_messages_joins_continuation_lines(self):
+        lines = [
+            "1/2/20, 10:00 - TestA: first line\n",
+            "second line\n",
+            "1/2/20, 10:01 - Messages are end-to-end encrypted\n",
+            "1/2/20, 10:02 - TestB: other\n",
+        ]
+        strategy = WhatsAppStrategy()
+        texts = list(strategy.iter_messages(lines))
+        self.assertEqual(texts, ["first line\nsecond line\n", "other\n"])
+
+    def test_word_counts_from_generator(self):
+        strategy = WhatsAppStrategy()
+        counts = word_counts_from_texts(
+            texts=strategy.iter_texts(TEST_BACKUP_FILE_TXT),
+            min_word_length=3,
+            blocklist_words=set(),
+            blocklist_regex=[],
+        )
+        self.assertEqual(counts["often"], 3)
+
+    def test_parallel_word_counts_match_serial(self):
+        texts = ["Hello World", "hello https://goo.gl/x again", "😱 world", "x"] * 50
+        kwargs = dict(min_word_length=3, blocklist_words={"again"}, blocklist_regex=[])
+        serial = word_counts_from_texts(texts=texts, **kwargs)
+        parallel = word_counts_from_texts(texts=iter(texts), workers=2, chunk_size=7, **kwargs)
+        self.assertEqual(list(parallel.items()), list(serial.items()))
+
+    def test_byte_ranges_cover_all_messages(self):
+        strategy = WhatsAppStrategy()
+        expected = strategy.extract_texts(TEST_BACKUP_FILE_TXT)
+        for parts in (1, 2, 4, 100):
+            ranges = strategy.split_byte_ranges(TEST_BACKUP_FILE_TXT, parts)
+            texts = [
+                t for start, end in ranges
+                for t in strategy.iter_texts_in_range(TEST_BACKUP_FILE_TXT, start, end)
+            ]
+            self.assertEqual(texts, expected)
+
+    def test_word_counts_from_ranges_match_serial(self):
+        strategy = WhatsAppStrategy()
+        serial = word_counts_from_texts(strategy.iter_texts(TEST_BACKUP_FILE_TXT), 3, set(), [])
+        parallel = word_counts_from_ranges(strategy, TEST_BACKUP_FILE_TXT, 3, set(), [], workers=2)
+        self.assertEqual(list(parallel.items()), list(serial.items()))
+
+    def test_compressed_exports_stream_the_same_messages(self):
+        strategy = WhatsAppStrategy()
+        expected = strategy.extract_texts(TEST_BACKUP_FILE_TXT)
+        with open(TEST_BACKUP_FILE_TXT, "rb") as f:
+            raw = f.read()
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = os.path.join(tmp, "WhatsApp Chat.zip")
+            with zipfile.ZipFile(archive, "w") as z:
+                z.writestr("IMG-20240101-WA0001.jpg", b"\xff\xd8" * 64)
+                z.writestr("_chat.txt", raw)
+            gz = os.path.join(tmp, "chat.txt.gz")
+            with gzip.open(gz, "wb") as f:
+                f.write(raw)
+            for path in (archive, gz):
+                self.assertTrue(strategy.is_compressed(path))
+                self.assertEqual(strategy.extract_texts(path), expected)
+        self.assertFalse(strategy.is_compressed(TEST_BACKUP_FILE_TXT))
+
 
 if __name__ == '__main__':
     unittest.main()